@@ -0,0 +1,122 @@
+"""
+History queries: one JSON snapshot per day (load every file, filter in
+Python) vs the date-partitioned columnar archive (columnar.ColumnarArchive).
+
+Each simulated day is a scored run of --records synthetic airdrops. The
+queries are what a dashboard asks of history: a filter on a low-cardinality
+column over a date range, a selective end-time window (parts whose min/max
+end time misses it are never opened), and a full-history projection of two
+columns.
+
+Usage (from the repo root):
+    python benchmarks/bench_history.py
+    python benchmarks/bench_history.py --days 90 --records 2000 --repeats 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import columnar  # noqa: E402
+import scoring  # noqa: E402
+import synthetic  # noqa: E402
+import transformers  # noqa: E402
+
+FIRST_DAY = date(2025, 9, 1)
+
+
+def make_days(days, records):
+    """{YYYY-MM-DD: scored records scraped that day}, end times drifting forward day by day."""
+    history = {}
+    for day in range(days):
+        scraped = FIRST_DAY + timedelta(days=day)
+        batch = synthetic.records(records, seed=day, offset=day * records)
+        for i, airdrop in enumerate(batch):
+            airdrop['scraped_at'] = f"{scraped.isoformat()}T08:00:00"
+            airdrop['end_timestamp'] = 1756710000 + day * 86400 + (i % 30) * 86400
+        history[scraped.isoformat()] = scoring.score_airdrops(transformers.transform_airdrop_data(batch))
+    return history
+
+
+def json_scan(directory, columns, where, since=None, until=None):
+    """The baseline: parse each day's snapshot whole, filter and project in Python."""
+    rows = []
+    for name in sorted(os.listdir(directory)):
+        day = name[:-len('.json')]
+        if (since and day < since) or (until and day > until):
+            continue
+        with open(os.path.join(directory, name)) as f:
+            for airdrop in json.load(f):
+                if all(columnar._matches(airdrop.get(column, columnar._ABSENT), op, value)
+                       for column, op, value in where):
+                    rows.append({column: airdrop[column] for column in columns if column in airdrop})
+    return rows
+
+
+def timed(fn, repeats):
+    timings, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--records', type=int, default=1000, help='airdrops per daily run')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    history = make_days(args.days, args.records)
+    last_week = (FIRST_DAY + timedelta(days=args.days - 7)).isoformat()
+    window_start = 1756710000 + (args.days - 3) * 86400
+    queries = [
+        ('High risk, last 7 days', ['project_name', 'reward', 'end_timestamp'],
+         [('risk_level', '==', 'High')], last_week),
+        ('ending in 1-day window', ['project_name', 'detail_url'],
+         [('end_timestamp', '>=', window_start), ('end_timestamp', '<', window_start + 86400)], None),
+        ('all rows, 2 columns', ['project_name', 'risk_level'], [], None),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshots = os.path.join(tmp, 'json')
+        os.makedirs(snapshots)
+        for day, records in history.items():
+            with open(os.path.join(snapshots, f'{day}.json'), 'w') as f:
+                json.dump(records, f, ensure_ascii=False)
+        archive = columnar.ColumnarArchive(os.path.join(tmp, 'history'))
+        start = time.perf_counter()
+        for records in history.values():
+            archive.write(records)
+        written = time.perf_counter() - start
+
+        print(f"days={args.days} records/day={args.records} repeats={args.repeats}")
+        print(f"daily JSON {directory_size(snapshots) / 2**20:.1f} MiB, "
+              f"columnar {directory_size(archive.path) / 2**20:.1f} MiB (written in {written:.2f}s)")
+        print(f"{'query':<26}{'rows':>8}{'json ms':>10}{'columnar ms':>13}{'speedup':>9}   parts read / skipped, columns read")
+        for name, columns, where, since in queries:
+            json_time, expected = timed(lambda: json_scan(snapshots, columns, where, since), args.repeats)
+            col_time, rows = timed(lambda: list(archive.scan(columns, where, since)), args.repeats)
+            assert rows == expected, name
+            scan = archive.last_scan
+            print(f"{name:<26}{len(rows):>8}{json_time * 1000:>10.1f}{col_time * 1000:>13.1f}"
+                  f"{json_time / col_time:>8.1f}x   {scan['parts'] - scan['parts_skipped']} / {scan['parts_skipped']}, "
+                  f"{scan['columns_read']}")
+
+
+if __name__ == '__main__':
+    main()
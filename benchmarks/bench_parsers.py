@@ -0,0 +1,64 @@
+"""
+Parser backend benchmark: per-page parse + extraction time and peak memory.
+
+Usage (from the repo root):
+    python benchmarks/bench_parsers.py
+    python benchmarks/bench_parsers.py --listing saved_listing.html --detail saved_detail.html
+
+Without saved pages, pages from benchmarks/synthetic.py are used.
+Peak memory comes from tracemalloc, which only sees Python-level allocations:
+lxml's C tree is invisible to it, so 'lxml-raw' numbers understate its footprint.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import parsing  # noqa: E402
+import synthetic  # noqa: E402
+from scraper import SimpleCointelegraphScraper  # noqa: E402
+
+
+def measure(func, html, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(html)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--listing', help='saved listing page HTML')
+    parser.add_argument('--detail', help='saved detail page HTML')
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    listing = open(args.listing, 'rb').read() if args.listing else synthetic.listing_page().encode()
+    detail = open(args.detail, 'rb').read() if args.detail else synthetic.detail_page().encode()
+
+    print(f"listing page: {len(listing):,} bytes, detail page: {len(detail):,} bytes, repeats={args.repeats}")
+    print(f"{'backend':<15}{'page':<9}{'median ms':>11}{'peak KiB':>11}")
+    for backend in parsing.BACKENDS:
+        scraper = SimpleCointelegraphScraper(parser_backend=backend)
+        for page, func, html in (
+            ('listing', scraper.parse_listing_page, listing),
+            ('detail', scraper.parse_detail_page, detail),
+        ):
+            median, peak = measure(func, html, args.repeats)
+            print(f"{backend:<15}{page:<9}{median * 1000:>11.2f}{peak / 1024:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
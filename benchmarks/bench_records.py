@@ -0,0 +1,93 @@
+"""
+Memory footprint of airdrop collections: dicts vs AirdropRecord vs AirdropColumns.
+
+Each representation is built in its own subprocess from the same synthetic,
+transformed records (generated in chunks, so only the measured form is ever
+fully held) and the growth in resident memory is reported.
+
+Usage (from the repo root):
+    python benchmarks/bench_records.py                 # 1,000,000 records
+    python benchmarks/bench_records.py --count 200000
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import records  # noqa: E402
+import synthetic  # noqa: E402
+import transformers  # noqa: E402
+
+MODES = ('dict', 'record', 'columns')
+
+
+def rss_bytes() -> int:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def chunks(count: int, chunk: int):
+    for offset in range(0, count, chunk):
+        yield transformers.transform_airdrop_data(synthetic.records(min(chunk, count - offset), seed=offset, offset=offset))
+
+
+def measure(mode: str, count: int, chunk: int) -> dict:
+    gc.collect()
+    before = rss_bytes()
+    start = time.perf_counter()
+    if mode == 'dict':
+        held = [airdrop for batch in chunks(count, chunk) for airdrop in batch]
+    elif mode == 'record':
+        held = [records.AirdropRecord.from_dict(airdrop) for batch in chunks(count, chunk) for airdrop in batch]
+    else:
+        held = records.AirdropColumns()
+        for batch in chunks(count, chunk):
+            held.extend(batch)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    grown = rss_bytes() - before
+    assert len(held) == count
+    return {'mode': mode, 'bytes': grown, 'seconds': elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=1_000_000)
+    parser.add_argument('--chunk', type=int, default=50_000)
+    parser.add_argument('--mode', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.count, args.chunk)))
+        return
+
+    # Round-trip check on a sample before measuring
+    sample = transformers.transform_airdrop_data(synthetic.records(2000))
+    assert [records.AirdropRecord.from_dict(a).to_dict() for a in sample] == sample
+    assert list(records.AirdropColumns(sample)) == sample
+
+    results = []
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, '--mode', mode, '--count', str(args.count), '--chunk', str(args.chunk)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    baseline = results[0]['bytes']
+    print(f"records={args.count:,} (round-trip verified)")
+    print(f"{'representation':<16}{'MiB':>10}{'bytes/rec':>12}{'vs dict':>10}{'build s':>10}")
+    for r in results:
+        print(f"{r['mode']:<16}{r['bytes'] / 2 ** 20:>10.1f}{r['bytes'] / args.count:>12.0f}"
+              f"{r['bytes'] / baseline:>10.1%}{r['seconds']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
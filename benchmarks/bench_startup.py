@@ -0,0 +1,85 @@
+"""
+CLI startup benchmark: wall time of short offline commands and which heavy
+modules they load.
+
+Every command runs in a fresh interpreter, like a cron job or a stage of a
+shell pipeline would. `python -c pass` is the interpreter floor and
+`import scraper` is what the old single entry point paid before doing any
+work.
+
+Usage (from the repo root):
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeats 20 --records 500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import synthetic  # noqa: E402
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+CLI = os.path.join(SRC, 'cli.py')
+HEAVY = ('requests', 'bs4', 'lxml', 'tqdm', 'numpy')
+
+
+def run(argv, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=SRC, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), min(timings)
+
+
+def heavy_imports(argv):
+    """Top-level packages from HEAVY that the command imports (via -X importtime)."""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + argv[1:], cwd=SRC,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    loaded = set()
+    for line in result.stderr.splitlines():
+        name = line.rsplit('|', 1)[-1].strip()
+        if name.split('.')[0] in HEAVY:
+            loaded.add(name.split('.')[0])
+    return sorted(loaded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--records', type=int, default=100, help='records in the sample input file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sample = os.path.join(tmp, 'sample.json')
+        with open(sample, 'w') as f:
+            json.dump(synthetic.records(args.records), f)
+        output = os.path.join(tmp, 'out.ndjson')
+
+        py = sys.executable
+        commands = [
+            ('python -c pass', [py, '-c', 'pass']),
+            ('import scraper', [py, '-c', 'import scraper']),
+            ('cli.py --help', [py, CLI, '--help']),
+            ('cli.py validate', [py, CLI, 'validate', sample]),
+            ('cli.py transform', [py, CLI, 'transform', sample, '-o', output]),
+            ('cli.py export', [py, CLI, 'export', sample, '-o', output]),
+        ]
+
+        print(f"repeats={args.repeats} records={args.records}")
+        print(f"{'command':<20}{'median ms':>11}{'min ms':>9}   heavy imports")
+        for name, argv in commands:
+            median, fastest = run(argv, args.repeats)
+            heavy = ', '.join(heavy_imports(argv)) or '-'
+            print(f"{name:<20}{median * 1000:>11.1f}{fastest * 1000:>9.1f}   {heavy}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Streaming vs buffered listing fetch: time to first card, total time and
+bytes actually sent by the server.
+
+A local HTTP server serves a synthetic listing page at a throttled rate
+(--kbps), standing in for a real network. Buffered mode downloads the whole
+page and then parses it (fetch_listing_page + parse_listing_page); streamed
+mode parses while reading and hangs up once `limit` cards are in
+(stream_listing_page).
+
+Usage (from the repo root):
+    python benchmarks/bench_streaming.py
+    python benchmarks/bench_streaming.py --cards 100 --kbps 2000 --limits 1 5 100
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import parsing  # noqa: E402
+import synthetic  # noqa: E402
+from scraper import SimpleCointelegraphScraper  # noqa: E402
+
+WRITE_BYTES = 4096
+
+
+def make_server(page: bytes, kbps: float):
+    sent = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page)))
+            self.end_headers()
+            written = 0
+            try:
+                for i in range(0, len(page), WRITE_BYTES):
+                    block = page[i:i + WRITE_BYTES]
+                    self.wfile.write(block)
+                    self.wfile.flush()
+                    written += len(block)
+                    time.sleep(len(block) / (kbps * 1024))
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Client hung up early
+            sent.append(written)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, sent
+
+
+def measure(scraper, mode, url, limit):
+    """(seconds to first card, seconds to `limit` cards, cards parsed)."""
+    started = time.perf_counter()
+    if mode == 'buffered':
+        response = scraper.fetch_listing_page(url)
+        airdrops, _ = scraper.parse_listing_page(response.content, limit)
+        total = time.perf_counter() - started
+        return total, total, len(airdrops)  # No card before the whole page is parsed
+
+    first_card = []
+    original_feed = parsing.ListingStreamParser.feed
+
+    def feed(self, chunk):
+        pairs = original_feed(self, chunk)
+        if pairs and not first_card:
+            first_card.append(time.perf_counter() - started)
+        return pairs
+
+    parsing.ListingStreamParser.feed = feed
+    try:
+        airdrops, _, _ = scraper.stream_listing_page(url, limit)
+    finally:
+        parsing.ListingStreamParser.feed = original_feed
+    total = time.perf_counter() - started
+    return (first_card[0] if first_card else total), total, len(airdrops)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', type=int, default=30)
+    parser.add_argument('--noise', type=int, default=2000, help='filler elements around the cards (~300 KiB page)')
+    parser.add_argument('--kbps', type=float, default=1000, help='server send rate, KiB/s')
+    parser.add_argument('--limits', type=int, nargs='+', default=[1, 5, 30])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    page = synthetic.listing_page(cards=args.cards, noise=args.noise).encode()
+    server, sent = make_server(page, args.kbps)
+    url = f'http://127.0.0.1:{server.server_address[1]}/crypto-bonus/bonus-category/airdrop/'
+    print(f"page={len(page) / 1024:.0f} KiB cards={args.cards} rate={args.kbps:.0f} KiB/s repeats={args.repeats}")
+    print(f"{'mode':<10}{'limit':>6}{'cards':>7}{'first ms':>10}{'total ms':>10}{'KiB sent':>10}")
+
+    for limit in args.limits:
+        for mode in ('buffered', 'streamed'):
+            # A fresh scraper per run: a closed connection must not be reused
+            firsts, totals, sizes = [], [], []
+            for _ in range(args.repeats):
+                scraper = SimpleCointelegraphScraper(requests_per_second=100, max_requests_per_second=100,
+                                                     parser_backend='lxml-raw',
+                                                     stream_listings=(mode == 'streamed'))
+                first, total, cards = measure(scraper, mode, url, limit)
+                firsts.append(first)
+                totals.append(total)
+                time.sleep(0.05)  # Let the handler notice a hang-up and record what it sent
+                sizes.append(sent[-1])
+            print(f"{mode:<10}{limit:>6}{cards:>7}{statistics.median(firsts) * 1000:>10.1f}"
+                  f"{statistics.median(totals) * 1000:>10.1f}{statistics.median(sizes) / 1024:>10.0f}")
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Offline micro-benchmark suite for the scrape -> transform -> validate stages.
+
+Runs every stage against synthetic pages/records (no network) and reports
+per-stage throughput, latency percentiles and tracemalloc peak memory.
+Results can be saved as a baseline and later runs compared against it;
+any stage whose median latency or peak memory grows past the tolerance is
+flagged and the script exits non-zero.
+
+Usage (from the repo root):
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py                    # compare to benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --backend html.parser --records 50000
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import memo  # noqa: E402
+import parsing  # noqa: E402
+import synthetic  # noqa: E402
+import transformers  # noqa: E402
+import validators  # noqa: E402
+from scraper import SimpleCointelegraphScraper  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    # round: 0.07 * 100 is 7.000000000000001, which would push ceil up a rank
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(round(pct / 100 * len(sorted_values), 6)) - 1))
+    return sorted_values[rank]
+
+
+def run_stage(func: Callable[[], None], items: int, repeats: int,
+              setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """
+    Time `func` `repeats` times (after one warm-up) and measure its peak memory
+    once. `setup`, if given, runs untimed before every call.
+    """
+    setup = setup or (lambda: None)
+    setup()
+    func()
+    latencies = []
+    for _ in range(repeats):
+        setup()
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    setup()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50 = percentile(latencies, 50)
+    return {
+        'items': items,
+        'throughput': items / p50 if p50 else 0.0,
+        'p50_ms': p50 * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'peak_kib': peak / 1024,
+    }
+
+
+def build_stages(args) -> Dict[str, tuple]:
+    """name -> (func, items per call[, untimed setup before each call])."""
+    scraper = SimpleCointelegraphScraper(parser_backend=args.backend)
+    listing = synthetic.listing_page(args.cards).encode()
+    detail = synthetic.detail_page(args.steps, args.links).encode()
+    records = synthetic.records(args.records)
+    transformed = transformers.transform_airdrop_data(records)
+
+    def transform():
+        transformers.AirdropDataTransformer().transform_batch(records)
+
+    stages = {
+        'listing_page': (lambda: scraper.parse_listing_page(listing), args.cards),
+        'detail_page': (lambda: scraper.parse_detail_page(detail), 1),
+        # Cold: memo caches cleared before every run, comparable with pre-memoization baselines
+        'transform_batch': (transform, args.records, memo.clear_caches),
+        # Warm: every normalizer call is a cache hit
+        'transform_warm': (transform, args.records),
+        'validate_batch': (lambda: validators.validate_batch(transformed), args.records),
+        'quality_report': (lambda: validators.quality_report(iter(transformed)), args.records),
+    }
+    if args.backend != 'lxml-raw':
+        # parse_card_simple works on BeautifulSoup cards, so isolate it from page parsing
+        cards = parsing.make_soup(listing, args.backend, page='listing').find_all('div', class_='card')
+        stages['parse_card_simple'] = (lambda: [scraper.parse_card_simple(card) for card in cards], len(cards))
+    return stages
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Names of stages whose p50 latency or peak memory regressed beyond `tolerance`."""
+    regressions = []
+    for stage, current in results.items():
+        previous = baseline.get(stage)
+        if not previous:
+            continue
+        for metric in ('p50_ms', 'peak_kib'):
+            if previous[metric] and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(f"{stage}.{metric}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', default='lxml', choices=parsing.BACKENDS)
+    parser.add_argument('--cards', type=int, default=30)
+    parser.add_argument('--steps', type=int, default=5)
+    parser.add_argument('--links', type=int, default=3)
+    parser.add_argument('--records', type=int, default=5000)
+    parser.add_argument('--repeats', type=int, default=30)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='allowed slowdown before flagging (0.15 = 15%%)')
+    parser.add_argument('--json', help='also write results to this file')
+    args = parser.parse_args()
+
+    results = {}
+    for name, (func, items, *setup) in build_stages(args).items():
+        results[name] = run_stage(func, items, args.repeats, *setup)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"backend={args.backend} cards={args.cards} steps={args.steps} links={args.links} "
+          f"records={args.records} repeats={args.repeats}")
+    print(f"{'stage':<18}{'items/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KiB':>11}{'vs base':>10}")
+    for name, r in results.items():
+        delta = ''
+        if name in baseline and baseline[name]['p50_ms']:
+            delta = f"{(r['p50_ms'] / baseline[name]['p50_ms'] - 1) * 100:+.1f}%"
+        print(f"{name:<18}{r['throughput']:>12,.0f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['peak_kib']:>11.1f}{delta:>10}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ Regressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    if baseline:
+        print(f"✅ No regressions beyond {args.tolerance:.0%} vs {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Synthetic listing/detail page generator for offline benchmarks.
+
+The markup mirrors what the scraper targets on cointelegraph.com:
+listing cards are <a> links wrapping div.card (project-name-title,
+task-name, reward), and detail pages carry single-card-container[data-timer],
+social-container links, task-description-block, step and timer-btn elements,
+surrounded by the usual navigation, related-content and footer noise.
+
+Write a corpus to disk:
+    python benchmarks/synthetic.py out_dir --cards 30 --details 30 --steps 5 --links 3
+"""
+
+import argparse
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+PROJECTS = ['Arkham', 'AITV', 'Almanak', 'GTR', 'Bullpen', 'Lumen', 'Orbiter', 'Kinetic', 'Nova', 'Helix']
+TASKS = [
+    'Sign up for {p} Exchange & get up to {n} USDT bonus',
+    'Engage with {p} agents to earn the ${s} airdrop',
+    'Deposit into {p} vaults to farm points for a future airdrop',
+    'Trade on {p} and claim a share of {n}K ${s}',
+    'Join the {p} quest and invite friends',
+]
+REWARDS = ['{n} USDT', '${s}', 'Token drop', '${n}K pool', '{n}M ${s}', 'Points']
+RISKS = ['Low', 'Medium', 'High']
+
+
+def _symbol(project: str) -> str:
+    return project.upper()[:6]
+
+
+def _noise(count: int, kind: str) -> str:
+    return ''.join(
+        f'<div class="{kind}-item"><a href="/news/{kind}-{i}">{kind.title()} headline {i}</a>'
+        f'<p>Lorem ipsum dolor sit amet {i}, consectetur adipiscing elit.</p></div>'
+        for i in range(count)
+    )
+
+
+def _page(body: str, noise: int) -> str:
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>Crypto bonus</title>'
+        '<script>window.__STATE__ = {"app": "ct", "ready": true};</script>'
+        '<link rel="stylesheet" href="/static/app.css"></head><body>'
+        f'<header><nav>{_noise(noise // 4, "nav")}</nav></header>'
+        f'<main>{body}</main>'
+        f'<aside>{_noise(noise // 2, "related")}</aside>'
+        '<footer><div class="footer-social"><a href="https://x.com/cointelegraph">X</a>'
+        '<a href="https://t.me/cointelegraph">Telegram</a></div>'
+        f'{_noise(noise // 4, "footer")}</footer></body></html>'
+    )
+
+
+def card_slug(index: int) -> str:
+    return f'synthetic-project-{index}'
+
+
+def listing_page(cards: int = 30, noise: int = 80, seed: int = 0, page: int = 1,
+                 next_page: Optional[str] = None) -> str:
+    """A listing page with `cards` airdrop cards."""
+    rng = random.Random(seed * 1000 + page)
+    items = []
+    for i in range(cards):
+        index = (page - 1) * cards + i
+        project = rng.choice(PROJECTS)
+        n = rng.randint(1, 500)
+        symbol = _symbol(project)
+        task = rng.choice(TASKS).format(p=project, n=n, s=symbol)
+        reward = rng.choice(REWARDS).format(n=n, s=symbol)
+        items.append(
+            f'<a href="/crypto-bonus/bonus-page/{card_slug(index)}/" class="card-link">'
+            f'<div class="card"><img src="/img/{index}.png" alt="{project}">'
+            f'<div class="project-name-title"> {project} </div>'
+            f'<div class="task-name">{task}</div>'
+            f'<div class="reward">{reward}</div>'
+            f'<div class="labels"><span>Airdrop</span><span>{rng.choice(RISKS)} risk</span></div>'
+            '</div></a>'
+        )
+    pager = f'<a rel="next" href="{next_page}">Next</a>' if next_page else ''
+    return _page(f'<div class="cards-grid">{"".join(items)}</div>{pager}', noise)
+
+
+def detail_page(steps: int = 5, links: int = 3, noise: int = 80, seed: int = 0,
+                end_timestamp: Optional[int] = None) -> str:
+    """A detail page with `steps` steps and `links` social/project links."""
+    rng = random.Random(seed)
+    project = rng.choice(PROJECTS)
+    if end_timestamp is None:
+        end_timestamp = int(time.time()) + rng.randint(1, 30 * 86400)
+    social = ''.join(f'<a href="https://social{i}.example/{project.lower()}">Link {i}</a>' for i in range(links))
+    step_html = ''.join(
+        f'<div class="step"><span class="step-number">{i + 1}</span><p>Do step {i + 1} for {project}.</p></div>'
+        for i in range(steps)
+    )
+    body = (
+        f'<div class="single-card-container" data-timer="{end_timestamp}">'
+        f'<h1>{project}</h1><div class="social-container">{social}</div>'
+        '<div class="task-description-block">'
+        f'<p>Complete the {project} quest to qualify.</p>\n'
+        f'<p>Time to complete: {rng.randint(2, 30)} minutes</p>\n'
+        f'<p>Risk level: {rng.choice(RISKS)}</p></div>'
+        f'<div class="steps">{step_html}</div>'
+        f'<div class="timer-btn"><a href="https://{project.lower()}.example/claim"><span>Claim bonus</span></a></div>'
+        '</div>'
+    )
+    return _page(body, noise)
+
+
+def records(count: int, seed: int = 0, offset: int = 0) -> List[Dict]:
+    """Scraper-shaped raw records (card + detail fields) for transform/validate stages."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(offset, offset + count):
+        project = rng.choice(PROJECTS)
+        n = rng.randint(1, 500)
+        symbol = _symbol(project)
+        days = rng.randint(0, 30)
+        out.append({
+            'project_name': f'  {project} ',
+            'task_name': rng.choice(TASKS).format(p=project, n=n, s=symbol),
+            'reward': rng.choice(REWARDS).format(n=n, s=symbol),
+            'scraped_at': '2025-09-13T22:14:29.090672',
+            'detail_url': f'https://cointelegraph.com/crypto-bonus/bonus-page/{card_slug(i)}/',
+            'time_left': {'days': str(days), 'hours': str(rng.randint(0, 23)), 'minutes': str(rng.randint(0, 59))},
+            'end_timestamp': 1757800000 + days * 86400,
+            'project_links': [f'https://social{k}.example/{project.lower()}' for k in range(rng.randint(0, 4))],
+            'time_to_complete': f'{rng.randint(2, 30)} minutes',
+            'risk_level': rng.choice(RISKS),
+            'step_count': rng.randint(1, 9),
+            'cta_link': f'https://{project.lower()}.example/claim',
+            'cta_text': 'Claim bonus',
+        })
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('out_dir')
+    parser.add_argument('--pages', type=int, default=1)
+    parser.add_argument('--cards', type=int, default=30)
+    parser.add_argument('--details', type=int, default=30)
+    parser.add_argument('--steps', type=int, default=5)
+    parser.add_argument('--links', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for page in range(1, args.pages + 1):
+        next_page = f'../listing-{page + 1}.html' if page < args.pages else None
+        with open(os.path.join(args.out_dir, f'listing-{page}.html'), 'w') as f:
+            f.write(listing_page(args.cards, seed=args.seed, page=page, next_page=next_page))
+    for index in range(args.details):
+        with open(os.path.join(args.out_dir, f'{card_slug(index)}.html'), 'w') as f:
+            f.write(detail_page(args.steps, args.links, seed=args.seed + index))
+    print(f"Wrote {args.pages} listing page(s) and {args.details} detail page(s) to {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
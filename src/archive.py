@@ -0,0 +1,358 @@
+"""
+Append-only archive of raw listing/detail HTML, with offline replay.
+
+Every page the scraper fetches can be kept here, so an extraction fix can be
+applied to past data without re-crawling. The archive is a directory of
+shards:
+
+- shard-NNNNN.dat  records of [url length][url][compressed body], appended
+- shard-NNNNN.idx  fixed-size entries (url hash, fetch time, offset, length,
+                   kind, codec, status), memory-mapped for random access
+
+Data is written before its index entry, so the index only ever points at
+complete records. A new shard starts once the current one passes
+`max_shard_bytes`.
+
+Besides pages, a crawl records how many cards it took from each listing page
+it parsed (a small 'cards' entry under the listing URL), so a limited crawl
+replays to the same records instead of every card on the page.
+
+replay() runs parse -> transform -> validate over the archive with no
+network, one process per shard:
+
+    with HtmlArchive('data/archive') as archive:
+        scraper = SimpleCointelegraphScraper(archive=archive)
+        ...
+    result = replay('data/archive', processes=4)
+    result['valid']
+
+zstd compression needs the optional `zstandard` package.
+"""
+
+import bisect
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import memo
+import parsing
+import transformers
+import validators
+from exporters import _require_zstd
+from storage import record_key
+
+INDEX_ENTRY = struct.Struct('<8sdQIBBH')
+URL_LENGTH = struct.Struct('<H')
+KINDS = ('listing', 'detail', 'cards')
+PAGE_KINDS = ('listing', 'detail')
+CODECS = ('zlib', 'zstd')
+
+ArchiveEntry = namedtuple('ArchiveEntry', 'shard url_hash fetched_at offset length kind codec status')
+
+
+def url_hash(url: str) -> bytes:
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest()
+
+
+def _compress(body: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        return _require_zstd().ZstdCompressor(level=6).compress(body)
+    return zlib.compress(body, 6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        return _require_zstd().ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class _MappedFile:
+    """Read-only mmap of a file that may still be growing (remapped when it grows)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._map = None
+        self.size = 0
+
+    def view(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size != self.size:
+            # Readers may still hold views of the old map; it is freed with the last of them
+            self._map = None
+            if size:
+                with open(self.path, 'rb') as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.size = size
+        return self._map if self._map is not None else b''
+
+    def close(self) -> None:
+        self._map = None
+        self.size = 0
+
+
+class HtmlArchive:
+    """Sharded, compressed, append-only store of fetched pages keyed by URL and fetch time."""
+
+    def __init__(self, path: str = 'data/archive', max_shard_bytes: int = 256 * 1024 * 1024,
+                 compression: str = 'zlib'):
+        if compression not in CODECS:
+            raise ValueError(f"Unknown compression {compression!r}, expected one of {CODECS}")
+        if compression == 'zstd':
+            _require_zstd()
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_shard_bytes = max_shard_bytes
+        self.compression = compression
+        self._lock = threading.Lock()
+        self._maps: Dict[Tuple[int, str], _MappedFile] = {}
+        self._by_url: Optional[Dict[bytes, List[ArchiveEntry]]] = None
+        shards = self.shards()
+        self._shard = shards[-1] if shards else 0
+        self._data = self._index = None
+
+    # ---------- Layout ----------
+
+    def _shard_path(self, shard: int, suffix: str) -> str:
+        return os.path.join(self.path, f'shard-{shard:05d}.{suffix}')
+
+    def shards(self) -> List[int]:
+        names = glob.glob(os.path.join(self.path, 'shard-*.idx'))
+        return sorted(int(os.path.basename(name)[6:11]) for name in names)
+
+    def _mapped(self, shard: int, suffix: str):
+        key = (shard, suffix)
+        if key not in self._maps:
+            self._maps[key] = _MappedFile(self._shard_path(shard, suffix))
+        return self._maps[key].view()
+
+    # ---------- Writes ----------
+
+    def add(self, url: str, body: bytes, kind: str = 'detail', status: int = 200,
+            fetched_at: Optional[float] = None) -> ArchiveEntry:
+        """Append one fetched page (or, for kind='cards', a card count as from add_cards)."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind {kind!r}, expected one of {KINDS}")
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        url_bytes = url.encode('utf-8')
+        record = URL_LENGTH.pack(len(url_bytes)) + url_bytes + _compress(body, self.compression)
+
+        with self._lock:
+            if self._data is None or self._data.tell() >= self.max_shard_bytes:
+                self._open_shard()
+            offset = self._data.tell()
+            self._data.write(record)
+            self._data.flush()
+            entry = ArchiveEntry(self._shard, url_hash(url), fetched_at, offset, len(record),
+                                 KINDS.index(kind), CODECS.index(self.compression), status)
+            self._index.write(INDEX_ENTRY.pack(*entry[1:]))
+            self._index.flush()
+            if self._by_url is not None:
+                self._by_url.setdefault(entry.url_hash, []).append(entry)
+        return entry
+
+    def add_cards(self, listing_url: str, cards: int, fetched_at: Optional[float] = None) -> ArchiveEntry:
+        """Record that the crawl took the first `cards` cards of its latest fetch of `listing_url`."""
+        return self.add(listing_url, json.dumps({'cards': cards}).encode(), kind='cards', fetched_at=fetched_at)
+
+    def _open_shard(self) -> None:
+        if self._data is not None:
+            self._data.close()
+            self._index.close()
+            self._shard += 1
+        # Reopening an existing shard continues it while it has room
+        while os.path.exists(self._shard_path(self._shard, 'dat')) and \
+                os.path.getsize(self._shard_path(self._shard, 'dat')) >= self.max_shard_bytes:
+            self._shard += 1
+        self._data = open(self._shard_path(self._shard, 'dat'), 'ab')
+        self._index = open(self._shard_path(self._shard, 'idx'), 'ab')
+
+    # ---------- Reads ----------
+
+    def entries(self, shard: Optional[int] = None) -> Iterator[ArchiveEntry]:
+        """Index entries (of one shard, or all of them) in append order."""
+        for number in ([shard] if shard is not None else self.shards()):
+            index = self._mapped(number, 'idx')
+            usable = len(index) - len(index) % INDEX_ENTRY.size
+            for fields in INDEX_ENTRY.iter_unpack(memoryview(index)[:usable]):
+                yield ArchiveEntry(number, *fields)
+
+    def read(self, entry: ArchiveEntry) -> Tuple[str, bytes]:
+        """(url, body) for an index entry."""
+        data = self._mapped(entry.shard, 'dat')
+        record = data[entry.offset:entry.offset + entry.length]
+        (url_length,) = URL_LENGTH.unpack_from(record)
+        url_end = URL_LENGTH.size + url_length
+        url = record[URL_LENGTH.size:url_end].decode('utf-8')
+        return url, _decompress(record[url_end:], CODECS[entry.codec])
+
+    def history(self, url: str, kinds: Tuple[str, ...] = PAGE_KINDS) -> List[ArchiveEntry]:
+        """Every archived fetch of `url` (entries of `kinds`), oldest first."""
+        with self._lock:
+            if self._by_url is None:
+                self._by_url = {}
+                for entry in self.entries():
+                    self._by_url.setdefault(entry.url_hash, []).append(entry)
+            candidates = list(self._by_url.get(url_hash(url), ()))
+        wanted = {KINDS.index(kind) for kind in kinds}
+        matches = [entry for entry in candidates if entry.kind in wanted and self.read(entry)[0] == url]
+        return sorted(matches, key=lambda entry: entry.fetched_at)
+
+    def get(self, url: str, at: Optional[float] = None) -> Optional[bytes]:
+        """Body of the latest fetch of `url` (at or before `at`), or None."""
+        history = self.history(url)
+        if at is not None:
+            history = [entry for entry in history if entry.fetched_at <= at]
+        return self.read(history[-1])[1] if history else None
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.entries())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._data is not None:
+                self._data.close()
+                self._index.close()
+                self._data = self._index = None
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ---------- Replay ----------
+
+def _replay_shard(path: str, shard: int, backend: str):
+    """Parse every archived page of one shard (runs in a worker process)."""
+    from scraper import SimpleCointelegraphScraper
+
+    scraper = SimpleCointelegraphScraper(parser_backend=backend)
+    archive = HtmlArchive(path)
+    listings = []  # (fetched_at, listing url, position on the page, airdrop, detail url)
+    details: Dict[str, List[Tuple[float, Dict[str, Any]]]] = {}
+    cards = []  # (fetched_at, listing url, cards taken)
+    try:
+        for entry in archive.entries(shard):
+            if entry.status != 200:
+                continue
+            url, body = archive.read(entry)
+            if KINDS[entry.kind] == 'listing':
+                airdrops, detail_urls = scraper.parse_listing_page(body)
+                for position, (airdrop, detail_url) in enumerate(zip(airdrops, detail_urls)):
+                    listings.append((entry.fetched_at, url, position, airdrop, detail_url))
+            elif KINDS[entry.kind] == 'cards':
+                cards.append((entry.fetched_at, url, json.loads(body)['cards']))
+            else:
+                # time_left as of the fetch, as the live crawl computed it
+                detail = scraper.parse_detail_page(body, now=entry.fetched_at)
+                details.setdefault(parsing.canonical_url(url), []).append((entry.fetched_at, detail))
+    finally:
+        archive.close()
+    return listings, details, cards
+
+
+def _cards_taken(listings: List[tuple], cards: List[Tuple[float, str, int]]) -> Dict[Tuple[float, str], int]:
+    """
+    (fetch time, listing url) -> cards the crawl took from that listing fetch.
+
+    A card count belongs to the latest fetch of its listing at or before it
+    (a cached listing is counted against the fetch that archived it); when a
+    fetch was parsed more than once the most cards taken wins.
+    """
+    fetches: Dict[str, List[float]] = {}
+    for fetched_at, listing_url, position, _, _ in listings:
+        if position == 0:
+            fetches.setdefault(listing_url, []).append(fetched_at)
+    taken: Dict[Tuple[float, str], int] = {}
+    for counted_at, listing_url, count in cards:
+        times = sorted(fetches.get(listing_url, ()))
+        i = bisect.bisect_right(times, counted_at)
+        if i:
+            key = (times[i - 1], listing_url)
+            taken[key] = max(taken.get(key, 0), count)
+    return taken
+
+
+def _nearest(fetches: List[Tuple[float, Dict[str, Any]]], when: float) -> Dict[str, Any]:
+    """The detail fetched closest in time to the listing it is joined with."""
+    times = [fetched_at for fetched_at, _ in fetches]
+    i = bisect.bisect_left(times, when)
+    candidates = [c for c in (i - 1, i) if 0 <= c < len(fetches)]
+    return fetches[min(candidates, key=lambda c: abs(times[c] - when))][1]
+
+
+def replay(path: str = 'data/archive', processes: Optional[int] = None, backend: str = 'lxml',
+           latest: bool = True, transform_cache: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Rebuild records from the archive and validate them, like a live crawl would.
+
+    Cards come from archived listing pages and are joined with the detail
+    page fetched closest to them; time_left and scraped_at are as of the
+    listing fetch. Only the cards the crawl took from each listing fetch are
+    rebuilt (all of them for pages archived without a card count). latest=True keeps one record per airdrop (its newest
+    listing appearance); latest=False keeps every archived snapshot.
+    transform_cache names a memo cache file to warm-start from and update.
+    Returns validators.validate_and_partition's result.
+    """
+    shards = HtmlArchive(path).shards()
+    if processes and processes > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = list(pool.map(_replay_shard, [path] * len(shards), shards, [backend] * len(shards)))
+    else:
+        parts = [_replay_shard(path, shard, backend) for shard in shards]
+
+    details: Dict[str, List[Tuple[float, Dict[str, Any]]]] = {}
+    listings = []
+    cards = []
+    for shard_listings, shard_details, shard_cards in parts:
+        listings.extend(shard_listings)
+        cards.extend(shard_cards)
+        for url, fetches in shard_details.items():
+            details.setdefault(url, []).extend(fetches)
+    for fetches in details.values():
+        fetches.sort(key=lambda fetch: fetch[0])
+    listings.sort(key=lambda listing: listing[0])
+    taken = _cards_taken(listings, cards)
+
+    records: Dict[Any, Dict[str, Any]] = {}
+    for fetched_at, listing_url, position, airdrop, detail_url in listings:
+        if position >= taken.get((fetched_at, listing_url), position + 1):
+            continue
+        match = parsing.CATEGORY_RE.search(listing_url)
+        categories = [match.group(1)] if match else []
+        airdrop['scraped_at'] = datetime.fromtimestamp(fetched_at).isoformat()
+        if detail_url:
+            detail_url = airdrop['detail_url'] = parsing.canonical_url(detail_url)
+            if detail_url in details:
+                airdrop.update(_nearest(details[detail_url], fetched_at))
+                # Only data-timer pages carry end_timestamp; data-timestamp ones keep
+                # the day-only time_left parsed as of their fetch
+                if 'end_timestamp' in airdrop:
+                    airdrop['time_left'] = parsing.time_left_from_timer(airdrop['end_timestamp'], now=fetched_at)
+        key = record_key(airdrop) if latest else (record_key(airdrop), fetched_at)
+        previous = records.pop(key, None)
+        if previous is not None:
+            categories = previous['bonus_categories'] + [c for c in categories if c not in previous['bonus_categories']]
+        airdrop['bonus_categories'] = categories
+        records[key] = airdrop
+
+    if transform_cache:
+        memo.load_caches(transform_cache)
+    transformed = transformers.transform_airdrop_data(list(records.values()))
+    if transform_cache:
+        memo.save_caches(transform_cache)
+    return validators.validate_and_partition(transformed, processes=processes)
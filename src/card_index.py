@@ -0,0 +1,83 @@
+"""
+Persisted card fingerprint index for incremental crawls.
+
+For every detail URL we remember a hash of the listing card's fields and the
+detail data fetched for it. On the next crawl, a card whose fingerprint is
+unchanged reuses the stored detail data instead of re-fetching the page
+(optionally only while the stored copy is younger than `max_age` seconds).
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import parsing
+
+
+# Fields added at scrape time rather than read from the card itself
+VOLATILE_CARD_FIELDS = ('scraped_at', 'bonus_categories')
+
+
+def card_fingerprint(card_fields: Dict[str, Any]) -> str:
+    """Stable content hash of the card fields parsed by parse_card_simple."""
+    stable = {k: v for k, v in card_fields.items() if k not in VOLATILE_CARD_FIELDS}
+    payload = json.dumps(stable, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CardIndex:
+    """JSON-backed map: detail URL -> {fingerprint, detail, fetched_at}."""
+
+    def __init__(self, path: str = 'data/card_index.json', max_age: Optional[float] = None):
+        self.path = path
+        self.max_age = max_age
+        self.stats = {'reused': 0, 'fetched': 0}
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._entries = json.load(f)
+
+    def lookup(self, url: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Stored detail data if the card is unchanged (and fresh enough), else None."""
+        with self._lock:
+            entry = self._entries.get(url)
+        if not entry or entry['fingerprint'] != fingerprint:
+            return None
+        if self.max_age is not None and time.time() - entry['fetched_at'] > self.max_age:
+            return None
+
+        detail = copy.deepcopy(entry['detail'])
+        # time_left is relative to fetch time; recompute it from the data-timer end
+        # (the only source of end_timestamp, see parsing.assemble_detail)
+        if 'end_timestamp' in detail:
+            detail['time_left'] = parsing.time_left_from_timer(detail['end_timestamp'])
+        self.stats['reused'] += 1
+        return detail
+
+    def store(self, url: str, fingerprint: str, detail: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[url] = {
+                'fingerprint': fingerprint,
+                'detail': copy.deepcopy(detail),
+                'fetched_at': time.time(),
+            }
+        self.stats['fetched'] += 1
+
+    def save(self) -> None:
+        """Write the index atomically (temp file + rename)."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with self._lock:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
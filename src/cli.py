@@ -0,0 +1,568 @@
+"""
+Command-line entry point: one subcommand per pipeline stage.
+
+    python cli.py crawl --categories airdrop,defi -o data/sample_output.json
+    python cli.py crawl --pipeline --processes 4 --limit 100
+    python cli.py transform raw.json -o transformed.json
+    python cli.py validate transformed.json --score -o valid.ndjson
+    python cli.py quality data/export.ndjson.gz data/history -o data/quality.report.json
+    python cli.py export valid.ndjson -o data/export.ndjson.gz --store data/airdrops.sqlite
+    python cli.py diff yesterday.json data/sample_output.json -o data/changes.ndjson
+    python cli.py query --priority HIGH --expiring-hours 24 --limit 10
+    python cli.py history query --where "priority == HIGH" --since 2026-09-01 --columns project_name,reward
+    python cli.py replay data/archive --processes 4 -o replayed.json
+    python cli.py schedule --categories airdrop,defi     # long-running refresher
+
+Inputs and outputs are JSON arrays or NDJSON (chosen by file extension,
+.gz/.zst compressed NDJSON included); '-' means stdin/stdout, so stages can
+be chained in a shell pipeline. Summaries go to stderr.
+
+Only this module's standard-library imports run at startup. Each subcommand
+imports what it needs when it runs, so offline stages never load requests,
+BeautifulSoup or tqdm (`python benchmarks/bench_startup.py` measures this).
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+DEFAULT_OUTPUT = 'data/sample_output.json'
+DEFAULT_STORE = 'data/airdrops.sqlite'
+DEFAULT_ARCHIVE = 'data/archive'
+DEFAULT_CHANGES = 'data/changes.ndjson'
+DEFAULT_HISTORY = 'data/history'
+# Records per change-feed append / store upsert, and per history part, while a crawl streams
+SINK_BATCH = 500
+HISTORY_BATCH = 10000
+
+PREDICATE_OPERATORS = ('==', '!=', '<', '<=', '>', '>=', 'in')
+
+
+# ---------- Record I/O ----------
+
+def read_records(path: str) -> List[Dict[str, Any]]:
+    """Records from a JSON array or NDJSON file; '-' reads stdin (either format)."""
+    if path == '-':
+        text = sys.stdin.read()
+        if text.lstrip().startswith('['):
+            return json.loads(text)
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    import exporters
+    if exporters.is_ndjson_path(path):
+        return list(exporters.iter_ndjson(path))
+    with open(path) as f:
+        return json.load(f)
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Like read_records, but streams NDJSON (files and stdin) one record at a
+    time; a directory is read as a columnar history archive.
+    """
+    if os.path.isdir(path):
+        import columnar
+        yield from columnar.ColumnarArchive(path).scan()
+        return
+    if path == '-':
+        first = sys.stdin.readline()
+        if first.lstrip().startswith('['):
+            yield from json.loads(first + sys.stdin.read())
+            return
+        for line in itertools.chain([first], sys.stdin):
+            if line.strip():
+                yield json.loads(line)
+        return
+
+    import exporters
+    if exporters.is_ndjson_path(path):
+        yield from exporters.iter_ndjson(path)
+    else:
+        yield from read_records(path)
+
+
+def write_records(records: Iterable[Dict[str, Any]], path: str) -> int:
+    """Write records as a JSON array, or NDJSON for .ndjson/.jsonl[.gz|.zst]; '-' is stdout as NDJSON."""
+    if path == '-':
+        count = 0
+        for record in records:
+            sys.stdout.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+        sys.stdout.flush()
+        return count
+
+    import exporters
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if exporters.is_ndjson_path(path):
+        with exporters.NDJSONWriter(path, compression=exporters.compression_for(path),
+                                    overwrite=True) as writer:
+            return writer.write_many(records)
+    records = list(records)
+    with open(path, 'w') as f:
+        json.dump(records, f, indent=2)
+    return len(records)
+
+
+def _log(message: str) -> None:
+    print(message, file=sys.stderr)
+
+
+def _finalize(valid: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop the transformer's marker fields and add priority/effort/urgency scores."""
+    import records
+    import scoring
+
+    for airdrop in valid:
+        for field, _ in records.MARKER_FIELDS:
+            airdrop.pop(field, None)
+    return scoring.score_airdrops(valid)
+
+
+def _validate(airdrops: List[Dict[str, Any]], processes: Optional[int]) -> Dict[str, Any]:
+    import validators
+
+    validation = validators.validate_and_partition(airdrops, processes=processes)
+    _log(validators.format_validation_summary(validation['summary']))
+    return validation
+
+
+def _upsert(airdrops: List[Dict[str, Any]], store_path: str) -> None:
+    import storage
+
+    with storage.AirdropStore(store_path) as store:
+        store.upsert_many(airdrops)
+        _log(f"Upserted {len(airdrops)} airdrops into {store.path} ({store.count()} total)")
+
+
+def _add_history(airdrops: List[Dict[str, Any]], history_path: str) -> None:
+    import columnar
+
+    parts = columnar.ColumnarArchive(history_path).write(airdrops)
+    _log(f"Archived {len(airdrops)} airdrops into {len(parts)} history part(s) under {history_path}")
+
+
+def parse_predicate(text: str):
+    """'column op value' -> (column, op, value); values are JSON when they parse as JSON, else strings."""
+    column, op, raw = (text.split(None, 2) + ['', ''])[:3]
+    if not raw:
+        raise argparse.ArgumentTypeError(f"expected 'column op value', got {text!r}")
+    if op not in PREDICATE_OPERATORS:  # Mirrors columnar.OPERATORS
+        raise argparse.ArgumentTypeError(f"unknown operator {op!r}, expected one of {', '.join(PREDICATE_OPERATORS)}")
+    if op == 'in':
+        values = [item.strip() for item in raw.split(',')]
+        return column, op, [_predicate_value(item) for item in values]
+    return column, op, _predicate_value(raw)
+
+
+def _predicate_value(raw: str):
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+# ---------- Subcommands ----------
+
+def _crawl_source(scraper, args) -> Iterator[Dict[str, Any]]:
+    """Enriched airdrops, each yielded as soon as its detail page is in."""
+    categories = args.categories.split(',')
+    limit = args.limit or None
+    if args.pipeline:
+        import pipeline
+        listed, detail_urls = scraper.list_categories(categories, limit_per_category=limit)
+        return pipeline.DetailPipeline(scraper, parse_processes=args.processes).iter_enriched(listed, detail_urls)
+    if len(categories) == 1:
+        # Page by page: the first records do not wait for the rest of the listing
+        return scraper.iter_airdrops(limit=limit, category=categories[0])
+    # Cards are merged across category listings first, so each detail page is fetched once
+    airdrops, detail_urls = scraper.list_categories(categories, limit_per_category=limit)
+    return scraper.iter_enriched(airdrops, detail_urls)
+
+
+def _tee_crawl_outputs(records: Iterable[Dict[str, Any]], args) -> Iterator[Dict[str, Any]]:
+    """Pass records through, feeding the change feed, store and history archive in batches."""
+    import diff
+
+    tracker = None
+    if args.changes and args.output != '-':
+        tracker = diff.ChangeTracker(diff.load_snapshot(args.output))
+    store = None
+    if args.store:
+        import storage
+        store = storage.AirdropStore(args.store)
+    history = None
+    if args.history:
+        import columnar
+        history = columnar.ColumnarArchive(args.history)
+
+    events: List[Dict[str, Any]] = []
+    event_counts = dict.fromkeys(diff.EVENTS, 0)
+    upserts: List[Dict[str, Any]] = []
+    archived: List[Dict[str, Any]] = []
+    saved = parts = 0
+
+    def flush(final: bool = False) -> None:
+        nonlocal events, upserts, archived, parts
+        if tracker is not None and (final or len(events) >= SINK_BATCH):
+            if final:
+                events.extend(tracker.finish())
+            for event in events:
+                event_counts[event['event']] += 1
+            diff.append_feed(events, args.changes)
+            events = []
+        if store is not None and (final or len(upserts) >= SINK_BATCH):
+            store.upsert_many(upserts)
+            upserts = []
+        if history is not None and archived and (final or len(archived) >= HISTORY_BATCH):
+            parts += len(history.write(archived))
+            archived = []
+
+    try:
+        for record in records:
+            yield record
+            saved += 1
+            if tracker is not None:
+                event = tracker.add(record)
+                if event is not None:
+                    events.append(event)
+            if store is not None:
+                upserts.append(record)
+            if history is not None:
+                archived.append(record)
+            flush()
+        flush(final=True)
+        if tracker is not None:
+            _log(f"Changes since the last snapshot: {diff.format_summary(event_counts)} (-> {args.changes})")
+        if store is not None:
+            _log(f"Upserted {saved} airdrops into {store.path} ({store.count()} total)")
+        if history is not None:
+            _log(f"Archived {saved} airdrops into {parts} history part(s) under {args.history}")
+    finally:
+        if store is not None:
+            store.close()
+
+
+def cmd_crawl(args) -> int:
+    import archive
+    import card_index
+    import http_cache
+    import metrics
+    import transformers
+    import validators
+    from scraper import SimpleCointelegraphScraper
+
+    html_archive = None if args.no_archive else archive.HtmlArchive(args.archive)
+    scraper = SimpleCointelegraphScraper(
+        cache=None if args.no_cache else http_cache.ResponseCache(),
+        index=card_index.CardIndex(max_age=24 * 60 * 60),
+        archive=html_archive,
+        parser_backend=args.backend,
+        categories=args.categories.split(','),
+        stream_listings=args.stream,
+    )
+    counts = {'crawled': 0}
+
+    def crawled():
+        for airdrop in _crawl_source(scraper, args):
+            counts['crawled'] += 1
+            yield airdrop
+
+    # crawl -> transform -> validate -> score -> outputs, one record at a time
+    # (a JSON array output is the only stage that holds the whole run)
+    valid = validators.iter_valid_airdrops(transformers.iter_transform_airdrop_data(crawled()))
+    scored = (_finalize([airdrop])[0] for airdrop in valid)
+    try:
+        with metrics.profile(args.profile):
+            saved = write_records(_tee_crawl_outputs(scored, args), args.output)
+    finally:
+        if html_archive is not None:
+            html_archive.close()
+    _log(f"Saved {saved} valid of {counts['crawled']} crawled airdrops to {args.output}")
+    metrics.METRICS.write('data/metrics.json', 'data/metrics.prom')
+    return 0
+
+
+def cmd_transform(args) -> int:
+    import memo
+    import transformers
+
+    if args.cache:
+        memo.load_caches(args.cache)
+    transformed = transformers.transform_airdrop_data(read_records(args.input))
+    if args.cache:
+        memo.save_caches(args.cache)
+    _log(f"Transformed {write_records(transformed, args.output)} airdrops")
+    return 0
+
+
+def cmd_validate(args) -> int:
+    validation = _validate(read_records(args.input), args.processes)
+    valid = _finalize(validation['valid']) if args.score else validation['valid']
+    if args.output:
+        write_records(valid, args.output)
+    if args.rejected:
+        write_records(validation['invalid'], args.rejected)
+    return 1 if args.strict and validation['invalid'] else 0
+
+
+def cmd_quality(args) -> int:
+    import validators
+
+    report = validators.QualityReport()
+    for path in args.inputs:
+        if path.endswith('.report.json'):
+            with open(path) as f:
+                report.merge(validators.QualityReport.from_dict(json.load(f)))
+        else:
+            report.merge(validators.quality_report(iter_records(path), args.processes))
+    _log(report.format())
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+    return 0
+
+
+def cmd_export(args) -> int:
+    airdrops = read_records(args.input)
+    if args.output:
+        _log(f"Exported {write_records(airdrops, args.output)} airdrops to {args.output}")
+    if args.store:
+        _upsert(airdrops, args.store)
+    return 0
+
+
+def cmd_diff(args) -> int:
+    import diff
+
+    events = list(diff.diff_snapshots(read_records(args.previous), read_records(args.current)))
+    if args.output == '-':
+        write_records(events, '-')
+    else:
+        diff.append_feed(events, args.output)
+    _log(diff.format_summary(diff.summarize(events)))
+    return 1 if args.exit_code and events else 0
+
+
+def cmd_query(args) -> int:
+    import storage
+
+    now = None if args.expiring_hours is None else time.time()
+    with storage.AirdropStore(args.store) as store:
+        results = store.query(
+            project_name=args.project,
+            priority=args.priority,
+            risk_level=args.risk,
+            ends_after=now,
+            ends_before=None if now is None else now + args.expiring_hours * 3600,
+            order_by=args.order_by,
+            limit=args.limit,
+        )
+    write_records(results, args.output)
+    return 0
+
+
+def cmd_history(args) -> int:
+    import columnar
+
+    history = columnar.ColumnarArchive(args.history)
+    if args.action == 'add':
+        for path in args.inputs:
+            _add_history(read_records(path), args.history)
+        return 0
+
+    columns = args.columns.split(',') if args.columns else None
+    rows = history.scan(columns=columns, where=args.where, since=args.since, until=args.until)
+    _log(f"Matched {write_records(rows, args.output)} rows")
+    scan = history.last_scan
+    _log(f"Read {scan['parts'] - scan['parts_skipped']}/{scan['parts']} parts in {scan['partitions']} partitions, "
+         f"{scan['columns_read']} column files")
+    return 0
+
+
+def cmd_replay(args) -> int:
+    import archive
+    import validators
+
+    validation = archive.replay(args.archive, processes=args.processes, backend=args.backend,
+                                latest=not args.all_snapshots, transform_cache=args.transform_cache)
+    _log(validators.format_validation_summary(validation['summary']))
+    valid = _finalize(validation['valid'])
+    _log(f"Replayed {write_records(valid, args.output)} airdrops")
+    return 0
+
+
+def cmd_schedule(args) -> int:
+    import http_cache
+    import metrics
+    import scheduler
+    import storage
+    from scraper import SimpleCointelegraphScraper
+
+    scraper = SimpleCointelegraphScraper(
+        # No TTLs: every refresh revalidates (ETag/Last-Modified), so unchanged pages cost a 304
+        cache=None if args.no_cache else http_cache.ResponseCache(ttls=[]),
+        parser_backend=args.backend,
+        categories=args.categories.split(','),
+    )
+
+    def report(summary):
+        _log(f"{summary['listing_polls']} listing polls, {summary['new']} new, "
+             f"{summary['changed']} changed / {summary['unchanged']} unchanged / {summary['failed']} failed, "
+             f"{summary['tracked']} tracked")
+        metrics.METRICS.write('data/metrics.json', 'data/metrics.prom')
+
+    with storage.AirdropStore(args.store) as store:
+        refresher = scheduler.RefreshScheduler(
+            scraper, store=store,
+            listing_interval=args.listing_interval * 60,
+            limit_per_category=args.limit,
+            min_interval=args.min_interval * 60,
+            max_interval=args.max_interval * 3600,
+        )
+        _log(f"Tracking {refresher.seed_from_store()} airdrops from {store.path}")
+        until = None if args.hours is None else time.time() + args.hours * 3600
+        try:
+            refresher.run(until=until, after_pass=report)
+        except KeyboardInterrupt:
+            _log("Stopped")
+    return 0
+
+
+# ---------- Parser ----------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='cli.py', description='Airdrop scraper pipeline stages.')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    # Mirrors parsing.BACKENDS and storage.ORDERABLE_COLUMNS, which are not
+    # imported here because that would load bs4 / sqlite3 for every command
+    backends = ('html.parser', 'lxml', 'lxml-strained', 'lxml-raw')
+    orderable = ('end_timestamp', 'project_name', 'priority', 'risk_level', 'scraped_at', 'updated_at')
+
+    crawl = commands.add_parser('crawl', help='fetch listings + detail pages, transform, validate, score, save')
+    crawl.add_argument('--categories', default=os.environ.get('SCRAPER_CATEGORIES', 'airdrop'),
+                       help='comma-separated bonus categories (default: airdrop)')
+    crawl.add_argument('--limit', type=int, default=5, help='airdrops per category (default: 5, 0 for every listing page)')
+    crawl.add_argument('--backend', choices=backends, default='lxml')
+    crawl.add_argument('-o', '--output', default=DEFAULT_OUTPUT)
+    crawl.add_argument('--store', default=DEFAULT_STORE, help="SQLite store to upsert into ('' to skip)")
+    crawl.add_argument('--changes', default=DEFAULT_CHANGES,
+                       help="append a change feed vs the previous --output snapshot here ('' to skip)")
+    crawl.add_argument('--history', default=DEFAULT_HISTORY,
+                       help="date-partitioned columnar archive to add this run to ('' to skip)")
+    crawl.add_argument('--archive', default=DEFAULT_ARCHIVE)
+    crawl.add_argument('--no-archive', action='store_true', help='do not keep fetched HTML')
+    crawl.add_argument('--no-cache', action='store_true', help='bypass the HTTP response cache')
+    crawl.add_argument('--stream', action='store_true',
+                       help='parse listing pages while they download, hanging up once --limit cards are in')
+    crawl.add_argument('--pipeline', action='store_true',
+                       help='enrich through the staged pipeline: fetch threads feeding a detail-parsing process pool')
+    crawl.add_argument('--processes', type=int,
+                       help='detail-parsing worker processes with --pipeline (default: one per CPU)')
+    crawl.add_argument('--profile', default=os.environ.get('SCRAPER_PROFILE'), help='write a cProfile dump here')
+    crawl.set_defaults(func=cmd_crawl)
+
+    transform = commands.add_parser('transform', help='clean and normalize raw scraped records')
+    transform.add_argument('input', nargs='?', default='-')
+    transform.add_argument('-o', '--output', default='-')
+    transform.add_argument('--cache', help='memo cache file to warm-start from and update')
+    transform.set_defaults(func=cmd_transform)
+
+    validate = commands.add_parser('validate', help='validate transformed records, print the summary')
+    validate.add_argument('input', nargs='?', default='-')
+    validate.add_argument('-o', '--output', help='write the valid records here')
+    validate.add_argument('--rejected', help='write invalid records (with their errors) here')
+    validate.add_argument('--score', action='store_true', help='add priority/effort/urgency to valid records')
+    validate.add_argument('--strict', action='store_true', help='exit 1 if any record is invalid')
+    validate.add_argument('--processes', type=int)
+    validate.set_defaults(func=cmd_validate)
+
+    quality = commands.add_parser('quality', help='streaming data-quality report (constant memory) over record files')
+    quality.add_argument('inputs', nargs='*', default=['-'],
+                         help='record files, history directories, or *.report.json shard reports to merge')
+    quality.add_argument('-o', '--output', help='save the report as JSON (name it *.report.json to merge it later)')
+    quality.add_argument('--processes', type=int, help='score chunks in this many worker processes')
+    quality.set_defaults(func=cmd_quality)
+
+    export = commands.add_parser('export', help='convert records to JSON/NDJSON and/or upsert them into SQLite')
+    export.add_argument('input', nargs='?', default='-')
+    export.add_argument('-o', '--output', help='.json, .ndjson, .jsonl (optionally .gz/.zst)')
+    export.add_argument('--store', help='SQLite store to upsert into')
+    export.set_defaults(func=cmd_export)
+
+    diff = commands.add_parser('diff', help='change events (added/modified/removed/expired) between two snapshots')
+    diff.add_argument('previous')
+    diff.add_argument('current', nargs='?', default='-')
+    diff.add_argument('-o', '--output', default='-', help='NDJSON feed to append to (default: stdout)')
+    diff.add_argument('--exit-code', action='store_true', help='exit 1 if anything changed')
+    diff.set_defaults(func=cmd_diff)
+
+    query = commands.add_parser('query', help='query the SQLite store')
+    query.add_argument('--store', default=DEFAULT_STORE)
+    query.add_argument('--project')
+    query.add_argument('--priority', choices=('HIGH', 'MEDIUM', 'LOW'))
+    query.add_argument('--risk')
+    query.add_argument('--expiring-hours', type=float, help='only airdrops ending within this many hours')
+    query.add_argument('--order-by', default='end_timestamp', choices=orderable)
+    query.add_argument('--limit', type=int)
+    query.add_argument('-o', '--output', default='-')
+    query.set_defaults(func=cmd_query)
+
+    history = commands.add_parser('history', help='add records to / query the date-partitioned columnar archive')
+    history.add_argument('--history', default=DEFAULT_HISTORY)
+    history_actions = history.add_subparsers(dest='action', metavar='action')
+    history_actions.required = True
+    history_add = history_actions.add_parser('add', help='archive record files, partitioned by scraped_at date')
+    history_add.add_argument('inputs', nargs='*', default=['-'])
+    history_query = history_actions.add_parser('query', help='filter and project archived records')
+    history_query.add_argument('--where', type=parse_predicate, action='append', default=[],
+                               help="'column op value' with op in == != < <= > >= in (repeatable, ANDed)")
+    history_query.add_argument('--columns', help='comma-separated columns to output (default: all)')
+    history_query.add_argument('--since', help='first scrape date, YYYY-MM-DD')
+    history_query.add_argument('--until', help='last scrape date, YYYY-MM-DD')
+    history_query.add_argument('-o', '--output', default='-')
+    history.set_defaults(func=cmd_history)
+
+    replay = commands.add_parser('replay', help='rebuild records from the HTML archive, offline')
+    replay.add_argument('archive', nargs='?', default=DEFAULT_ARCHIVE)
+    replay.add_argument('--processes', type=int)
+    replay.add_argument('--backend', choices=backends, default='lxml')
+    replay.add_argument('--all-snapshots', action='store_true', help='keep every archived snapshot, not just the latest')
+    replay.add_argument('--transform-cache', help='memo cache file to warm-start from and update')
+    replay.add_argument('-o', '--output', default='-')
+    replay.set_defaults(func=cmd_replay)
+
+    schedule = commands.add_parser('schedule', help='keep the store fresh, refreshing airdrops more often near expiry')
+    schedule.add_argument('--categories', default=os.environ.get('SCRAPER_CATEGORIES', 'airdrop'))
+    schedule.add_argument('--limit', type=int, help='cards per category listing poll (default: all)')
+    schedule.add_argument('--backend', choices=backends, default='lxml')
+    schedule.add_argument('--store', default=DEFAULT_STORE)
+    schedule.add_argument('--listing-interval', type=float, default=30, help='minutes between listing polls')
+    schedule.add_argument('--min-interval', type=float, default=5, help='minimum minutes between refreshes')
+    schedule.add_argument('--max-interval', type=float, default=24, help='maximum hours between refreshes')
+    schedule.add_argument('--hours', type=float, help='run this long, then exit (default: until interrupted)')
+    schedule.add_argument('--no-cache', action='store_true', help='skip conditional revalidation')
+    schedule.set_defaults(func=cmd_schedule)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # Downstream closed early (e.g. `| head`); silence the flush at interpreter exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+Date-partitioned columnar archive of validated records, for queries over history.
+
+Every write lands in a Hive-style partition per scrape date, as one
+immutable part per run (the layout Arrow/Parquet datasets use, without
+needing pyarrow):
+
+    data/history/scraped_date=2026-10-17/part-20261017T080000-1a2b3c4d/
+        _meta.json      rows, column -> file, per-column stats
+        c000.json.gz    one gzip'd JSON column each: {"missing": [rows], "values": [...]}
+        ...
+
+Column stats are min/max (for all-number or all-string columns), null
+counts and, for low-cardinality columns such as priority or risk_level,
+the distinct values. Rows always carry end_timestamp and reward_amount
+(derived like storage/scoring do when the scraper did not set them), so
+those have stats too.
+
+scan() pushes predicates down at three levels: partitions outside
+since/until are never listed, parts whose stats rule a predicate out are
+never opened, and only the predicate columns are read until some row
+matches, then only the projected columns:
+
+    history = ColumnarArchive('data/history')
+    history.write(valid_airdrops)
+    rows = history.scan(columns=['project_name', 'reward'],
+                        where=[('priority', '==', 'HIGH'), ('end_timestamp', '>=', time.time())],
+                        since='2026-09-01')
+    history.last_scan   # partitions/parts skipped, columns read
+"""
+
+import gzip
+import json
+import operator
+import os
+import time
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import transformers
+from metrics import METRICS
+from storage import end_timestamp_of
+
+PARTITION_KEY = 'scraped_date'
+META_FILE = '_meta.json'
+
+# Columns with at most this many distinct values keep them in their stats
+MAX_DISTINCT = 32
+
+# Fields every row carries for filtering, filled in when a record lacks them
+DERIVED_FIELDS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'end_timestamp': end_timestamp_of,
+    'reward_amount': lambda airdrop: transformers.extract_reward_amount(airdrop.get('reward')),
+}
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, options: value in options,
+}
+
+Predicate = Tuple[str, str, Any]
+
+_ABSENT = object()
+
+
+def _kind(value) -> Optional[str]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'str'
+    return None
+
+
+def column_stats(values: Sequence[Any]) -> Dict[str, Any]:
+    """Null count, plus min/max and distinct values where the column is all numbers or all strings."""
+    present = [value for value in values if value is not None]
+    stats: Dict[str, Any] = {'nulls': len(values) - len(present)}
+    if not present:
+        stats['values'] = []
+        return stats
+    kinds = {_kind(value) for value in present}
+    if len(kinds) != 1 or None in kinds:
+        return stats
+    stats['min'] = min(present)
+    stats['max'] = max(present)
+    distinct = set(present)
+    if len(distinct) <= MAX_DISTINCT:
+        stats['values'] = sorted(distinct)
+    return stats
+
+
+def _matches(value, op: str, operand) -> bool:
+    """SQL-like: a null or missing value never matches."""
+    if value is None or value is _ABSENT:
+        return False
+    try:
+        return OPERATORS[op](value, operand)
+    except TypeError:  # e.g. comparing a string column with a number
+        return False
+
+
+def may_match(stats: Optional[Dict[str, Any]], op: str, operand) -> bool:
+    """False only when a column's stats prove no row can satisfy `op operand`."""
+    if stats is None:
+        return False  # Column absent from the part: every value is missing
+    if 'values' in stats:
+        return any(_matches(value, op, operand) for value in stats['values'])
+    if 'min' not in stats:
+        return True  # Mixed or non-scalar values: no stats to prune on
+    low, high = stats['min'], stats['max']
+    operands = operand if op == 'in' else [operand]
+    if any(_kind(item) != _kind(low) for item in operands):
+        return True  # Not comparable with the stats; let the rows decide
+    if op == '==':
+        return low <= operand <= high
+    if op == '!=':
+        return not low == high == operand
+    if op == '<':
+        return low < operand
+    if op == '<=':
+        return low <= operand
+    if op == '>':
+        return high > operand
+    if op == '>=':
+        return high >= operand
+    return any(low <= item <= high for item in operands)
+
+
+def scrape_date(airdrop: Dict[str, Any]) -> str:
+    """YYYY-MM-DD of a record's scraped_at (today when it has none)."""
+    try:
+        return datetime.fromisoformat(airdrop['scraped_at']).date().isoformat()
+    except (KeyError, TypeError, ValueError):
+        return date.today().isoformat()
+
+
+class ColumnarArchive:
+    """Append-only, date-partitioned column files with stats-based pruning."""
+
+    def __init__(self, path: str = 'data/history', compresslevel: int = 6):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.compresslevel = compresslevel
+        self.last_scan: Dict[str, int] = {}
+
+    # ---------- Writes ----------
+
+    def write(self, airdrops: Iterable[Dict[str, Any]]) -> List[str]:
+        """Add one part per scrape date found in `airdrops`; returns the new part directories."""
+        by_date: Dict[str, List[Dict[str, Any]]] = {}
+        for airdrop in airdrops:
+            row = dict(airdrop)
+            for field, derive in DERIVED_FIELDS.items():
+                if field not in row:
+                    row[field] = derive(airdrop)
+            by_date.setdefault(scrape_date(airdrop), []).append(row)
+        return [self._write_part(day, rows) for day, rows in sorted(by_date.items())]
+
+    def _write_part(self, day: str, rows: List[Dict[str, Any]]) -> str:
+        partition = os.path.join(self.path, f'{PARTITION_KEY}={day}')
+        os.makedirs(partition, exist_ok=True)
+        name = f"part-{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        # Built under a dot name, then renamed: readers never see a half-written part
+        staging = os.path.join(partition, '.' + name)
+        os.makedirs(staging)
+
+        names: Dict[str, None] = {}
+        for row in rows:
+            names.update(dict.fromkeys(row))
+        columns = {}
+        for number, column in enumerate(names):
+            missing, values = [], []
+            for index, row in enumerate(rows):
+                if column in row:
+                    values.append(row[column])
+                else:
+                    missing.append(index)
+            filename = f'c{number:03d}.json.gz'
+            with gzip.open(os.path.join(staging, filename), 'wt', encoding='utf-8',
+                           compresslevel=self.compresslevel) as f:
+                json.dump({'missing': missing, 'values': values}, f, ensure_ascii=False)
+            columns[column] = {'file': filename, **column_stats(values)}
+
+        meta = {'rows': len(rows), PARTITION_KEY: day, 'written_at': time.time(), 'columns': columns}
+        with open(os.path.join(staging, META_FILE), 'w') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        final = os.path.join(partition, name)
+        os.replace(staging, final)
+        return final
+
+    # ---------- Layout ----------
+
+    def partitions(self, since: Optional[str] = None, until: Optional[str] = None) -> List[str]:
+        """Scrape dates (YYYY-MM-DD) with data, within [since, until] when given."""
+        prefix = PARTITION_KEY + '='
+        days = sorted(name[len(prefix):] for name in os.listdir(self.path) if name.startswith(prefix))
+        return [day for day in days if (since is None or day >= since) and (until is None or day <= until)]
+
+    def parts(self, day: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(part directory, metadata) for each complete part of one partition."""
+        partition = os.path.join(self.path, f'{PARTITION_KEY}={day}')
+        for name in sorted(os.listdir(partition)):
+            if name.startswith('part-'):
+                part = os.path.join(partition, name)
+                with open(os.path.join(part, META_FILE)) as f:
+                    yield part, json.load(f)
+
+    # ---------- Reads ----------
+
+    @staticmethod
+    def _read_column(part: str, meta: Dict[str, Any], column: str) -> List[Any]:
+        """Every row's value of `column` (_ABSENT where a record did not have the field)."""
+        info = meta['columns'].get(column)
+        if info is None:
+            return [_ABSENT] * meta['rows']
+        with gzip.open(os.path.join(part, info['file']), 'rt', encoding='utf-8') as f:
+            stored = json.load(f)
+        if not stored['missing']:
+            return stored['values']
+        cells: List[Any] = [_ABSENT] * meta['rows']
+        missing = set(stored['missing'])
+        values = iter(stored['values'])
+        for index in range(meta['rows']):
+            if index not in missing:
+                cells[index] = next(values)
+        return cells
+
+    def scan(self, columns: Optional[Sequence[str]] = None, where: Sequence[Predicate] = (),
+             since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Rows matching every predicate in `where` (column, op, value), with op one
+        of OPERATORS ('in' takes a list). `columns` projects the rows (default:
+        all). since/until bound the scrape date, inclusive. Partitions come
+        oldest first. Pruning counts end up in last_scan.
+        """
+        for column, op, _ in where:
+            if op not in OPERATORS:
+                raise ValueError(f"Unknown operator {op!r}, expected one of {tuple(OPERATORS)}")
+        scan = self.last_scan = dict.fromkeys(
+            ('partitions', 'parts', 'parts_skipped', 'columns_read', 'rows_scanned', 'rows_matched'), 0)
+
+        for day in self.partitions(since, until):
+            scan['partitions'] += 1
+            for part, meta in self.parts(day):
+                scan['parts'] += 1
+                if not all(may_match(meta['columns'].get(column), op, value) for column, op, value in where):
+                    scan['parts_skipped'] += 1
+                    continue
+
+                cache: Dict[str, List[Any]] = {}
+                for column, _, _ in where:
+                    if column not in cache:
+                        cache[column] = self._read_column(part, meta, column)
+                selected = [
+                    index for index in range(meta['rows'])
+                    if all(_matches(cache[column][index], op, value) for column, op, value in where)
+                ]
+                scan['rows_scanned'] += meta['rows']
+                if selected:
+                    projection = list(meta['columns']) if columns is None else list(columns)
+                    for column in projection:
+                        if column not in cache:
+                            cache[column] = self._read_column(part, meta, column)
+                    for index in selected:
+                        row = {}
+                        for column in projection:
+                            value = cache[column][index]
+                            if value is not _ABSENT:
+                                row[column] = value
+                        yield row
+                    scan['rows_matched'] += len(selected)
+                scan['columns_read'] += sum(1 for column in cache if column in meta['columns'])
+
+        METRICS.inc('history_parts_scanned_total', scan['parts'] - scan['parts_skipped'])
+        METRICS.inc('history_parts_skipped_total', scan['parts_skipped'])
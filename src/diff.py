@@ -0,0 +1,158 @@
+"""
+Keyed snapshot diff: turns two runs' validated records into a change feed.
+
+Records are matched on storage.record_key (detail URL, else project|task)
+through one dict index per snapshot, so a diff is linear in snapshot size.
+Only records whose comparable fields differ are compared field by field.
+
+Events, one JSON object per line in the feed:
+
+    {"event": "added",    "key": ..., "at": ..., "record": {...}}
+    {"event": "modified", "key": ..., "at": ..., "changes": {"reward": ["10 USDT", "20 USDT"]}}
+    {"event": "removed",  "key": ..., "at": ..., "record": {identity fields}}
+    {"event": "expired",  "key": ..., "at": ..., "record": {identity fields}}
+
+"removed" means the airdrop left the listing before its end time, "expired"
+that it left after it. The feed file is append-only, so consumers can tail
+it (exporters.iter_ndjson(path, follow=True)) instead of reloading snapshots:
+
+    previous = diff.load_snapshot('data/sample_output.json')
+    events = list(diff.diff_snapshots(previous, valid_airdrops))
+    diff.append_feed(events, 'data/changes.ndjson')
+
+ChangeTracker does the same for records that arrive one at a time (the
+streamed crawl emits each added/modified event as its record is saved).
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import exporters
+from storage import end_timestamp_of, record_key
+
+EVENTS = ('added', 'modified', 'removed', 'expired')
+
+# Recomputed on every run without the airdrop changing; end time is compared
+# separately as an absolute timestamp (see END_TOLERANCE)
+IGNORED_FIELDS = frozenset(('scraped_at', 'time_left', 'urgency_score', 'end_timestamp'))
+
+# Seconds; end times derived from scraped_at + minute-resolution time_left drift by this much
+END_TOLERANCE = 120
+
+# Enough for a consumer to identify a removed airdrop
+IDENTITY_FIELDS = ('project_name', 'task_name', 'detail_url')
+
+
+def index_snapshot(records: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """record_key -> record; a key seen twice keeps its last record, like AirdropStore.upsert."""
+    return {record_key(record): record for record in records}
+
+
+def field_changes(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """{field: [old, new]} for every comparable field that differs (missing fields are None)."""
+    changes = {}
+    for field in old.keys() | new.keys():
+        if field in IGNORED_FIELDS:
+            continue
+        before, after = old.get(field), new.get(field)
+        if before != after:
+            changes[field] = [before, after]
+
+    old_end, new_end = end_timestamp_of(old), end_timestamp_of(new)
+    if (old_end is None) != (new_end is None) or \
+            (old_end is not None and abs(new_end - old_end) > END_TOLERANCE):
+        changes['end_timestamp'] = [old_end, new_end]
+    return changes
+
+
+class ChangeTracker:
+    """
+    Push-style diff against a previous snapshot, for records that arrive one
+    at a time: add() returns the record's added/modified event (or None) right
+    away, finish() the removed/expired events once the run is over. Each key
+    should be added once.
+    """
+
+    def __init__(self, previous: Iterable[Dict[str, Any]], now: Optional[float] = None):
+        self.now = time.time() if now is None else now
+        self.at = datetime.fromtimestamp(self.now).isoformat()
+        self._remaining = index_snapshot(previous)
+
+    def add(self, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = record_key(record)
+        old = self._remaining.pop(key, None)
+        if old is None:
+            return {'event': 'added', 'key': key, 'at': self.at, 'record': record}
+        changes = field_changes(old, record)
+        if changes:
+            return {'event': 'modified', 'key': key, 'at': self.at, 'changes': changes}
+        return None
+
+    def finish(self) -> Iterator[Dict[str, Any]]:
+        """Events for previous records that were never added, in previous-snapshot order."""
+        for key, record in self._remaining.items():
+            end = end_timestamp_of(record)
+            yield {
+                'event': 'expired' if end is not None and end <= self.now else 'removed',
+                'key': key,
+                'at': self.at,
+                'record': {field: record[field] for field in IDENTITY_FIELDS if field in record},
+            }
+        self._remaining = {}
+
+
+def diff_snapshots(previous: Iterable[Dict[str, Any]], current: Iterable[Dict[str, Any]],
+                   now: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Change events turning `previous` into `current`.
+
+    Added and modified events come in current-snapshot order, then removed
+    and expired ones in previous-snapshot order. `now` (default: time.time())
+    decides whether a vanished airdrop had already ended.
+    """
+    tracker = ChangeTracker(previous, now)
+    for record in index_snapshot(current).values():
+        event = tracker.add(record)
+        if event is not None:
+            yield event
+    yield from tracker.finish()
+
+
+def summarize(events: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    counts = dict.fromkeys(EVENTS, 0)
+    for event in events:
+        counts[event['event']] += 1
+    return counts
+
+
+def format_summary(counts: Dict[str, int]) -> str:
+    return ", ".join(f"{counts[name]} {name}" for name in EVENTS)
+
+
+def load_snapshot(path: str) -> List[Dict[str, Any]]:
+    """Records of a previous run's output (JSON array or NDJSON); [] if there is none yet."""
+    if not os.path.exists(path):
+        return []
+    if exporters.is_ndjson_path(path):
+        return list(exporters.iter_ndjson(path))
+    with open(path) as f:
+        return json.load(f)
+
+
+def append_feed(events: Iterable[Dict[str, Any]], path: str) -> int:
+    """Append events to an uncompressed NDJSON feed; returns how many were written."""
+    if exporters.compression_for(path):
+        raise ValueError("The change feed is appended to, so it cannot be compressed")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    count = 0
+    with open(path, 'a', encoding='utf-8') as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+            count += 1
+        f.flush()
+    return count
@@ -0,0 +1,291 @@
+"""
+Streaming NDJSON exporter and reader.
+
+Records are appended one JSON object per line as they are produced, so a
+crash only loses what was not yet flushed. Output can be gzip or zstd
+compressed (appending adds a new gzip member / zstd frame) and rotated by
+size or age.
+
+Without rotation the writer appends to the file in place, so it can be
+tailed live (iter_ndjson(path, follow=True)). Rotated segments are written
+under a '.part' suffix and renamed when closed, so downstream jobs only
+ever pick up complete segments; a segment never replaces an existing file.
+
+zstd support needs the optional `zstandard` package.
+"""
+
+import gzip
+import io
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+COMPRESSION_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+PART_SUFFIX = '.part'
+
+
+def _require_zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd compression needs the 'zstandard' package (pip install zstandard)") from e
+    return zstandard
+
+
+def compression_for(path: str) -> Optional[str]:
+    """Guess compression from the file name."""
+    if path.endswith(PART_SUFFIX):
+        path = path[:-len(PART_SUFFIX)]
+    if path.endswith('.gz'):
+        return 'gzip'
+    if path.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def is_ndjson_path(path: str) -> bool:
+    """True for .ndjson / .jsonl names, optionally with a compression suffix."""
+    for suffix in ('.gz', '.zst'):
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+    return path.endswith(('.ndjson', '.jsonl'))
+
+
+def _drop_partial_line(path: str) -> None:
+    """Truncate a half-written last line (from a crashed writer) so appends start on a fresh line."""
+    try:
+        f = open(path, 'r+b')
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            step = min(4096, position)
+            f.seek(position - step)
+            block = f.read(step)
+            newline = block.rfind(b'\n')
+            if newline != -1:
+                position = position - step + newline + 1
+                break
+            position -= step
+        if position != end:
+            f.truncate(position)
+
+
+def _open_write(path: str, compression: Optional[str]):
+    raw = open(path, 'ab')
+    if compression == 'gzip':
+        return raw, gzip.GzipFile(fileobj=raw, mode='ab')
+    if compression == 'zstd':
+        return raw, _require_zstd().ZstdCompressor().stream_writer(raw)
+    return raw, raw
+
+
+class NDJSONWriter:
+    """
+    Append-only NDJSON writer with optional compression and rotation.
+
+    Without rotation records are appended to `path`, keeping what earlier runs
+    wrote there; overwrite=True instead stages the output in '<path>.part' and
+    atomically replaces `path` on close (for snapshots such as CLI outputs).
+    With rotate_bytes/rotate_seconds each segment is named
+    '<stem>-<timestamp>-<n>.ndjson[.gz|.zst]' next to `path`, with <n> bumped
+    past any segment that already exists.
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None,
+                 rotate_bytes: Optional[int] = None, rotate_seconds: Optional[float] = None,
+                 flush_every: int = 1, overwrite: bool = False):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression {compression!r}")
+        if compression == 'zstd':
+            _require_zstd()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.compression = compression
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.flush_every = max(1, flush_every)
+        self.overwrite = overwrite
+        self.completed: List[str] = []
+        self.records_written = 0
+        self._segment = 0
+        self._raw = None
+        self._stream = None
+        self._final_path = None
+        self._staged = False
+        self._opened_at = 0.0
+        self._bytes = 0
+        self._unflushed = 0
+
+    # ---------- Public API ----------
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._stream is None:
+            self._open_segment()
+        elif self._should_rotate():
+            self.rotate()
+            self._open_segment()
+
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        self._stream.write(line)
+        self._bytes += len(line)
+        self.records_written += 1
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def write_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+    def flush(self) -> None:
+        if self._stream is None:
+            return
+        self._stream.flush()
+        if self._raw is not self._stream:
+            self._raw.flush()
+        self._unflushed = 0
+
+    def rotate(self) -> Optional[str]:
+        """Close the current segment (publishing it if it was staged); returns its final path."""
+        if self._stream is None:
+            return None
+        if self.compression == 'zstd':
+            self._stream.close()  # also closes the underlying file
+        else:
+            self._stream.close()
+            if self._raw is not self._stream:
+                self._raw.close()
+        if self._staged:
+            os.replace(self._final_path + PART_SUFFIX, self._final_path)
+        self.completed.append(self._final_path)
+        published = self._final_path
+        self._raw = self._stream = self._final_path = None
+        return published
+
+    def close(self) -> None:
+        if self.overwrite and self._stream is None and not self.completed and not self._rotating():
+            # Nothing written: publish an empty file so the previous snapshot is still replaced
+            self._open_segment()
+        self.rotate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # ---------- Internals ----------
+
+    def _rotating(self) -> bool:
+        return self.rotate_bytes is not None or self.rotate_seconds is not None
+
+    def _should_rotate(self) -> bool:
+        if self.rotate_bytes is not None and self._bytes >= self.rotate_bytes:
+            return True
+        if self.rotate_seconds is not None and time.time() - self._opened_at >= self.rotate_seconds:
+            return True
+        return False
+
+    def _segment_path(self) -> str:
+        suffix = COMPRESSION_SUFFIXES[self.compression]
+        if not self._rotating():
+            return self.path if self.path.endswith(suffix) else self.path + suffix
+        stem = self.path
+        for ext in ('.gz', '.zst', '.ndjson', '.jsonl'):
+            if stem.endswith(ext):
+                stem = stem[:-len(ext)]
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+        while True:
+            self._segment += 1
+            candidate = f"{stem}-{stamp}-{self._segment:04d}.ndjson{suffix}"
+            if not os.path.exists(candidate) and not os.path.exists(candidate + PART_SUFFIX):
+                return candidate
+
+    def _open_segment(self) -> None:
+        self._final_path = self._segment_path()
+        self._staged = self.overwrite or self._rotating()
+        if self._staged:
+            target = self._final_path + PART_SUFFIX
+            if os.path.exists(target):
+                os.remove(target)  # Left over by a crashed run
+        else:
+            target = self._final_path
+            if not self.compression:
+                _drop_partial_line(target)
+        self._raw, self._stream = _open_write(target, self.compression)
+        self._opened_at = time.time()
+        self._bytes = 0
+
+
+# ---------- Reading ----------
+
+def _open_read(path: str):
+    compression = compression_for(path)
+    if compression == 'gzip':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if compression == 'zstd':
+        raw = open(path, 'rb')
+        reader = _require_zstd().ZstdDecompressor().stream_reader(raw, closefd=True, read_across_frames=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_ndjson(path: str, follow: bool = False, poll_interval: float = 1.0) -> Iterator[Dict[str, Any]]:
+    """
+    Yield records from an NDJSON file without loading it whole.
+
+    A trailing partial line (e.g. from a crashed writer) is skipped. With
+    follow=True (uncompressed files only) keep tailing the file for new lines;
+    a segment still being written is read from its '.part' file (the open
+    handle survives the rename when the writer publishes it).
+    """
+    if follow and compression_for(path):
+        raise ValueError("follow=True only works on uncompressed files")
+
+    f = None
+    while f is None:
+        for candidate in (path, path + PART_SUFFIX) if follow else (path,):
+            try:
+                f = _open_read(candidate)
+                break
+            except FileNotFoundError:
+                if not follow:
+                    raise
+        else:
+            time.sleep(poll_interval)
+
+    with f:
+        pending = ''
+        while True:
+            try:
+                line = f.readline()
+            except EOFError:
+                break  # Truncated compressed stream
+            if line:
+                pending += line
+                if not pending.endswith('\n'):
+                    continue  # Half-written line; wait for the rest (or drop it at EOF)
+                text, pending = pending.strip(), ''
+                if text:
+                    yield json.loads(text)
+                continue
+            if not follow:
+                break
+            time.sleep(poll_interval)
+
+
+def iter_ndjson_files(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Chain several NDJSON segments (e.g. NDJSONWriter.completed) into one stream."""
+    for path in paths:
+        yield from iter_ndjson(path)
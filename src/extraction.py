@@ -0,0 +1,245 @@
+"""
+Declarative, single-pass field extraction over an HTML tree.
+
+A page is described as a list of Field specs (name, selector, attribute or
+text, post-processor). CompiledExtractor walks the tree exactly once and
+fills every field as it goes, so adding a field does not add another pass.
+
+Selectors are a small CSS subset: descendant chains of simple steps such as
+'.social-container a', 'div.card', '[data-timestamp]' or '.timer-btn a span'.
+Both BeautifulSoup trees and lxml.html trees are supported.
+"""
+
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4.element import Comment, Declaration, Doctype, ProcessingInstruction
+
+from metrics import METRICS
+
+
+_STEP_RE = re.compile(r'^(?P<tag>[a-zA-Z][\w-]*)?(?P<rest>(?:\.[\w-]+|\[[\w-]+\])*)$')
+_NON_TEXT = (Comment, Declaration, Doctype, ProcessingInstruction)
+
+
+class Field:
+    """
+    One extracted field:
+      - selector: descendant chain, e.g. '.timer-btn a span'
+      - attr: read this attribute from the matched element
+      - text: True for get_text(), 'strip' for get_text(strip=True)
+      - many: collect every match (list) instead of only the first
+      - scoped: only search inside the first element matching each step but the
+        last, e.g. the first <a> of the first .timer-btn for '.timer-btn a span'
+      - post: converts the raw value; returning None drops the field
+    Without attr/text the raw value is just True (presence), handy for counting.
+    """
+
+    def __init__(self, name: str, selector: str, attr: Optional[str] = None, text=False,
+                 many: bool = False, scoped: bool = False, post: Optional[Callable] = None):
+        self.name = name
+        self.selector = selector
+        self.attr = attr
+        self.text = text
+        self.many = many
+        self.scoped = scoped
+        self.post = post
+
+
+class _Step:
+    """One simple selector step: optional tag, classes and required attributes."""
+
+    def __init__(self, source: str):
+        match = _STEP_RE.match(source)
+        if not match:
+            raise ValueError(f"Unsupported selector step: {source!r}")
+        self.tag = match.group('tag')
+        rest = match.group('rest')
+        self.classes = frozenset(re.findall(r'\.([\w-]+)', rest))
+        self.attrs = tuple(re.findall(r'\[([\w-]+)\]', rest))
+
+    def index_key(self) -> Tuple[str, str]:
+        if self.classes:
+            return ('class', sorted(self.classes)[0])
+        if self.attrs:
+            return ('attr', self.attrs[0])
+        if self.tag:
+            return ('tag', self.tag)
+        raise ValueError("Empty selector step")
+
+    def matches(self, tag: str, classes, attrs) -> bool:
+        return ((self.tag is None or self.tag == tag)
+                and self.classes <= classes
+                and all(attr in attrs for attr in self.attrs))
+
+
+class CompiledExtractor:
+    """Extracts every field of a spec in a single depth-first traversal."""
+
+    def __init__(self, fields: List[Field]):
+        self.fields = fields
+        self._steps = [[_Step(part) for part in field.selector.split()] for field in fields]
+        # (kind, value) -> [(field index, step index)] so each node only checks relevant steps
+        self._index: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+        for field_idx, steps in enumerate(self._steps):
+            for step_idx, step in enumerate(steps):
+                self._index.setdefault(step.index_key(), []).append((field_idx, step_idx))
+        self._collects_lists = any(field.many for field in fields)
+
+    def extract(self, root) -> Dict[str, Any]:
+        """Return {field name: post-processed value}; fields with no value are left out."""
+        with METRICS.timer('extraction_walk_seconds'):
+            raw = self.extract_raw(root)
+        values: Dict[str, Any] = {}
+        for field in self.fields:
+            value = raw[field.name]
+            if field.post is not None:
+                # Matching happens in the shared walk; per-field cost is the post-processing
+                start = time.perf_counter()
+                value = field.post(value)
+                METRICS.observe('extraction_field_seconds', time.perf_counter() - start, field=field.name)
+            if value is not None:
+                values[field.name] = value
+                METRICS.inc('extraction_field_hits_total', field=field.name)
+        return values
+
+    def extract_raw(self, root) -> Dict[str, Any]:
+        """Single traversal; returns raw values (first match, or list if many)."""
+        if isinstance(root, Tag):
+            return self._walk(root, _bs4_node)
+        return self._walk(root, _lxml_node)
+
+    # ---------- Traversal ----------
+
+    def _candidates(self, tag: str, classes, attrs):
+        index = self._index
+        for cls in classes:
+            yield from index.get(('class', cls), ())
+        for attr in attrs:
+            yield from index.get(('attr', attr), ())
+        yield from index.get(('tag', tag), ())
+
+    def _walk(self, root, adapt) -> Dict[str, Any]:
+        fields = self.fields
+        steps = self._steps
+        results: List[Any] = [[] if field.many else None for field in fields]
+        found = [False] * len(fields)
+        scope_used = set()  # (field, step) pairs whose one scoped element was entered
+        pending = sum(1 for field in fields if not field.many)
+        captures: List[Tuple[int, List[str], bool]] = []
+
+        # Stack entries: ('enter', node, progress) or ('exit', capture count, tail text)
+        stack: List[Tuple] = [('enter', root, {})]
+        while stack:
+            event = stack.pop()
+            if event[0] == 'exit':
+                _, capture_count, tail = event
+                while len(captures) > capture_count:
+                    field_idx, buffer, _ = captures.pop()
+                    self._store(results, found, field_idx, ''.join(buffer))
+                if tail:
+                    _append_text(captures, tail)
+                continue
+
+            _, node, progress = event
+            kind, tag, classes, attrs, text, children, tail = adapt(node)
+            if kind == 'text':
+                _append_text(captures, text)
+                continue
+            if kind != 'element':
+                if tail:
+                    _append_text(captures, tail)
+                continue
+
+            own_progress = progress
+            capture_count = len(captures)
+            for field_idx, step_idx in self._candidates(tag, classes, attrs):
+                field_steps = steps[field_idx]
+                done = progress.get(field_idx, 0)
+                if done != step_idx or not field_steps[step_idx].matches(tag, classes, attrs):
+                    continue
+                if fields[field_idx].scoped and (step_idx == 0 or step_idx < len(field_steps) - 1):
+                    if (field_idx, step_idx) in scope_used:
+                        continue
+                    scope_used.add((field_idx, step_idx))
+                if step_idx < len(field_steps) - 1:
+                    if own_progress is progress:
+                        own_progress = dict(progress)
+                    own_progress[field_idx] = step_idx + 1
+                    continue
+                # Last step matched: this node is a hit for the field
+                field = fields[field_idx]
+                if found[field_idx] and not field.many:
+                    continue
+                if field.text:
+                    captures.append((field_idx, [], field.text == 'strip'))
+                    if not field.many:
+                        found[field_idx] = True
+                        pending -= 1
+                else:
+                    value = attrs.get(field.attr) if field.attr else True
+                    if self._store(results, found, field_idx, value):
+                        pending -= 1
+
+            # Every first-only field is filled and nothing collects lists: stop early
+            if pending == 0 and not captures and not self._collects_lists:
+                break
+
+            if text:
+                _append_text(captures, text)
+            stack.append(('exit', capture_count, tail))
+            for child in reversed(children):
+                stack.append(('enter', child, own_progress))
+
+        return {field.name: results[idx] for idx, field in enumerate(fields)}
+
+    def _store(self, results, found, field_idx, value) -> bool:
+        """Record a value; returns True when a first-only field was just filled."""
+        field = self.fields[field_idx]
+        if field.many:
+            results[field_idx].append(value)
+            return False
+        if results[field_idx] is None:
+            results[field_idx] = value
+        if not found[field_idx]:
+            found[field_idx] = True
+            return True
+        return False
+
+
+def _append_text(captures, text: str) -> None:
+    """Feed a text piece to every open capture ('strip' captures strip each piece)."""
+    for _, buffer, strip in captures:
+        buffer.append(text.strip() if strip else text)
+
+
+# ---------- Tree adapters ----------
+# Each returns (kind, tag, classes, attrs, text, children, tail).
+
+_EMPTY = frozenset()
+
+
+def _bs4_node(node):
+    if isinstance(node, NavigableString):
+        if isinstance(node, _NON_TEXT):
+            return ('other', None, _EMPTY, {}, None, (), None)
+        return ('text', None, _EMPTY, {}, str(node), (), None)
+    if isinstance(node, BeautifulSoup):
+        return ('element', '[document]', _EMPTY, {}, None, node.contents, None)
+    classes = node.get('class') or ()
+    if isinstance(classes, str):
+        classes = classes.split()
+    return ('element', node.name, frozenset(classes), node.attrs, None, node.contents, None)
+
+
+def _lxml_node(node):
+    tag = node.tag
+    if not isinstance(tag, str):
+        # Comments / processing instructions: only their tail text belongs to the parent
+        return ('other', None, _EMPTY, {}, None, (), node.tail)
+    attrs = node.attrib
+    classes = attrs.get('class')
+    return ('element', tag, frozenset(classes.split()) if classes else _EMPTY, attrs,
+            node.text, list(node), node.tail)
@@ -0,0 +1,173 @@
+"""
+Persistent HTTP response cache for the scraper.
+
+Responses are stored on disk (SQLite) with their ETag / Last-Modified
+validators so repeat crawls can:
+- serve a page straight from disk while it is younger than its TTL
+- revalidate older pages with If-None-Match / If-Modified-Since (304 = reuse body)
+- stay under a total size budget by evicting least-recently-used entries
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+import requests
+
+
+# Listing pages change as cards rotate; detail pages are mostly static.
+DEFAULT_TTLS: List[Tuple[str, int]] = [
+    (r'/bonus-category/', 10 * 60),
+    (r'/bonus-page/', 6 * 60 * 60),
+]
+
+
+class ResponseCache:
+    """Size-bounded LRU response cache with conditional revalidation."""
+
+    def __init__(self, path: str = 'data/http_cache.sqlite',
+                 max_bytes: int = 50 * 1024 * 1024,
+                 ttls: Optional[List[Tuple[str, int]]] = None,
+                 default_ttl: int = 0):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (DEFAULT_TTLS if ttls is None else ttls)]
+        self.default_ttl = default_ttl
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                content_type TEXT,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    def ttl_for(self, url: str) -> int:
+        """First matching URL pattern wins; otherwise the default TTL."""
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def get(self, url: str, send: Callable[..., requests.Response]) -> requests.Response:
+        """
+        Return a response for `url`, calling `send(url, headers=...)` only when
+        the cached copy is missing or stale.
+        """
+        entry = self._lookup(url)
+        now = time.time()
+
+        if entry and now - entry['stored_at'] < self.ttl_for(url):
+            self._touch(url, now)
+            self.stats['hits'] += 1
+            return self._build_response(url, entry)
+
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        response = send(url, headers=headers or None)
+
+        if response.status_code == 304 and entry:
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?", (now, now, url)
+                )
+                self._conn.commit()
+            self.stats['revalidated'] += 1
+            return self._build_response(url, entry)
+
+        self.stats['misses'] += 1
+        if response.status_code == 200 and 'no-store' not in response.headers.get('Cache-Control', ''):
+            self._store(url, response, now)
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---------- Internals ----------
+
+    def _lookup(self, url: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, content_type, encoding, etag, last_modified, stored_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if not row:
+            return None
+        keys = ('body', 'content_type', 'encoding', 'etag', 'last_modified', 'stored_at')
+        return dict(zip(keys, row))
+
+    def _touch(self, url: str, now: float) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+
+    def _store(self, url: str, response: requests.Response, now: float) -> None:
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    url, body, len(body),
+                    response.headers.get('Content-Type'),
+                    response.encoding,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                    now, now,
+                ),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until the cache fits in max_bytes (lock held)."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            self.stats['evictions'] += 1
+
+    @staticmethod
+    def _build_response(url: str, entry) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = entry['body']
+        response.encoding = entry['encoding']
+        if entry['content_type']:
+            response.headers['Content-Type'] = entry['content_type']
+        response.from_cache = True
+        return response
@@ -0,0 +1,176 @@
+"""
+Bounded LRU memoization for the pure text-normalization functions.
+
+Project names, task names and reward strings repeat across daily snapshots,
+so transformers wraps its normalizers with @memoized: a repeated value costs
+one dict lookup instead of the regex work. Every cache is bounded (least
+recently used entries are evicted) and counts hits, misses and evictions.
+
+Caches can be persisted so batch reprocessing jobs start warm:
+
+    memo.load_caches('data/transform_cache.json')
+    ...  # transform
+    memo.save_caches('data/transform_cache.json')
+    memo.cache_stats()
+"""
+
+import functools
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_MAXSIZE = 65536
+
+_MISS = object()
+
+# Qualified function name -> its LRUCache, for stats and persistence
+CACHES: Dict[str, 'LRUCache'] = {}
+
+
+class LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used key."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: 'OrderedDict[Any, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=_MISS):
+        with self._lock:
+            value = self._data.get(key, _MISS)
+            if value is _MISS:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def items(self):
+        """Snapshot of (key, value) pairs, least recently used first."""
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def memoized(maxsize: int = DEFAULT_MAXSIZE) -> Callable:
+    """Decorator: cache a pure function's results by its (hashable) positional arguments."""
+    def decorate(func):
+        cache = LRUCache(maxsize)
+        CACHES[f'{func.__module__}.{func.__qualname__}'] = cache
+        data = cache._data
+
+        # Hits skip the lock: single OrderedDict operations are atomic under the
+        # GIL, so the worst a race can do is miscount a hit or re-run a miss.
+        def lookup(key, args):
+            try:
+                value = data[key]
+            except KeyError:
+                value = func(*args)
+                cache.misses += 1
+                cache.put(key, value)
+                return value
+            except TypeError:  # unhashable argument
+                return func(*args)
+            try:
+                data.move_to_end(key)
+            except KeyError:  # evicted by another thread meanwhile
+                pass
+            cache.hits += 1
+            return value
+
+        if func.__code__.co_argcount == 1:
+            # Single-argument functions key on the argument itself, with the
+            # hit path inlined: this is the per-field hot path of a transform
+            def wrapper(arg):
+                try:
+                    value = data[arg]
+                except (KeyError, TypeError):
+                    return lookup(arg, (arg,))
+                try:
+                    data.move_to_end(arg)
+                except KeyError:
+                    pass
+                cache.hits += 1
+                return value
+        else:
+            def wrapper(*args):
+                return lookup(args, args)
+
+        functools.update_wrapper(wrapper, func)
+        wrapper.cache = cache
+        wrapper.uncached = func
+        return wrapper
+    return decorate
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+def clear_caches() -> None:
+    for cache in CACHES.values():
+        cache.clear()
+
+
+def save_caches(path: str) -> None:
+    """Write every cache's entries (LRU order) to JSON, atomically."""
+    payload = {}
+    for name, cache in CACHES.items():
+        payload[name] = [[list(key) if isinstance(key, tuple) else key, value] for key, value in cache.items()]
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+
+
+def load_caches(path: str) -> Optional[int]:
+    """Warm the caches from save_caches() output; returns entries loaded (None if no file)."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        payload = json.load(f)
+    loaded = 0
+    for name, entries in payload.items():
+        cache = CACHES.get(name)
+        if cache is None:
+            continue  # function no longer memoized
+        for key, value in entries:
+            cache.put(tuple(key) if isinstance(key, list) else key, value)
+            loaded += 1
+    return loaded
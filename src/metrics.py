@@ -0,0 +1,226 @@
+"""
+Pipeline metrics: counters, latency histograms and stage timers.
+
+Everything records into the module-level METRICS registry, which can be
+dumped at the end of a run as a JSON summary and as a Prometheus text file
+(node_exporter textfile format). The JSON summary also splits wall time
+into network, sleep (rate limiting + backoff) and parse buckets so a slow
+crawl can be attributed at a glance.
+
+    with METRICS.timer('stage_seconds', stage='transform'):
+        ...
+    @METRICS.timed('stage_seconds', stage='validate')
+    def validate(...): ...
+    METRICS.inc('http_retries_total')
+    METRICS.write('data/metrics.json', 'data/metrics.prom')
+
+profile() wraps a block in cProfile when given an output path.
+"""
+
+import cProfile
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+# Seconds; suits both sub-millisecond parse steps and multi-second requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics) plus min/max."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (capped at the observed max)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            if running >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'min': round(self.min, 6) if self.count else 0.0,
+            'max': round(self.max, 6) if self.count else 0.0,
+            'p50': round(self.quantile(0.5), 6),
+            'p95': round(self.quantile(0.95), 6),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.started_at = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, **labels):
+        """Decorator form of timer()."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def counter_total(self, name: str) -> float:
+        with self._lock:
+            return sum(self.counters.get(name, {}).values())
+
+    def histogram_sum(self, name: str, **labels) -> float:
+        """Sum of a histogram across series whose labels include `labels`."""
+        wanted = set(_label_key(labels))
+        with self._lock:
+            return sum(h.sum for key, h in self.histograms.get(name, {}).items() if wanted <= set(key))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started_at = time.time()
+
+    # ---------- Export ----------
+
+    def to_dict(self) -> Dict[str, object]:
+        with self._lock:
+            counters = {
+                name: [{'labels': dict(key), 'value': value} for key, value in series.items()]
+                for name, series in self.counters.items()
+            }
+            histograms = {
+                name: [{'labels': dict(key), **hist.summary()} for key, hist in series.items()]
+                for name, series in self.histograms.items()
+            }
+        return {
+            'elapsed_seconds': round(time.time() - self.started_at, 3),
+            'time_breakdown_seconds': {
+                'network': round(self.histogram_sum('http_request_seconds'), 3),
+                'rate_limit_wait': round(self.histogram_sum('rate_limit_wait_seconds'), 3),
+                'backoff_sleep': round(self.counter_total('backoff_sleep_seconds_total'), 3),
+                'parse': round(self.histogram_sum('stage_seconds', stage='listing_parse')
+                               + self.histogram_sum('stage_seconds', stage='detail_parse'), 3),
+            },
+            'counters': counters,
+            'histograms': histograms,
+        }
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in series.items():
+                    running = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        running += count
+                        le = '+Inf' if bound == math.inf else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', le))} {running}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, json_path: Optional[str] = None, prometheus_path: Optional[str] = None) -> None:
+        """Write the JSON summary and/or Prometheus text file (atomically)."""
+        for path, content in ((json_path, lambda: json.dumps(self.to_dict(), indent=2)),
+                              (prometheus_path, self.to_prometheus)):
+            if not path:
+                continue
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path + '.tmp', 'w') as f:
+                f.write(content())
+            os.replace(path + '.tmp', path)
+
+
+METRICS = MetricsRegistry()
+
+
+@contextmanager
+def profile(output_path: Optional[str] = None) -> Iterator[Optional[cProfile.Profile]]:
+    """Run the block under cProfile and dump stats to `output_path`; no-op without a path."""
+    if not output_path:
+        yield None
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_path)
@@ -0,0 +1,223 @@
+"""
+Adaptive request pacing for the scraper.
+
+AdaptiveHostLimiter is a drop-in HostRateLimiter whose per-host rate is
+steered by response feedback (AIMD, as in TCP congestion control):
+- every healthy response raises the rate by a small additive step
+- a 429, a 5xx, a connection error or a latency spike cuts it multiplicatively
+- a Retry-After header pauses the whole host for the requested time
+- repeated failures open a per-host circuit breaker; requests fail fast
+  until a cooldown passes and a single probe request succeeds
+
+The rate therefore settles just below what the site tolerates, instead of
+a hard-coded worst case. backoff_delay() gives the retry sleep: exponential
+with full jitter, never shorter than Retry-After.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import metrics
+from ratelimit import HostRateLimiter
+
+# Statuses worth retrying (and slowing down for); any other 4xx is final
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while a host's circuit is open."""
+
+
+def retry_after_seconds(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds from now."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(0.0, when - now)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0,
+                  retry_after: Optional[float] = None) -> float:
+    """Sleep before retry number `attempt` (0-based): full-jitter exponential, floored at Retry-After."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive failures -> half-open after `cooldown`."""
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def admit(self) -> Optional[str]:
+        """'request', 'probe' (the one request half-open lets through) or None if rejected."""
+        with self._lock:
+            if self.state == 'closed':
+                return 'request'
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = 'half_open'
+                self._probing = False
+            if self.state == 'half_open' and not self._probing:
+                self._probing = True
+                return 'probe'
+            return None
+
+    def allow(self) -> bool:
+        """Whether a request may go out now (half-open lets exactly one probe through)."""
+        return self.admit() is not None
+
+    def abandon_probe(self) -> None:
+        """The probe ended without an outcome: let the next request probe instead."""
+        with self._lock:
+            if self.state == 'half_open':
+                self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; True when this one opened the circuit."""
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self.failures >= self.failure_threshold):
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+                self._probing = False
+                return True
+            return False
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease rate with latency spike detection."""
+
+    def __init__(self, rate: float, min_rate: float = 0.1, max_rate: float = 8.0,
+                 increase: float = 0.1, decrease: float = 0.5, latency_factor: float = 3.0,
+                 min_spike: float = 0.25, decrease_cooldown: float = 1.0):
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        # Jitter on fast responses is not congestion: a spike must also add this many seconds
+        self.min_spike = min_spike
+        # One burst of concurrent failures should count as a single congestion signal
+        self.decrease_cooldown = decrease_cooldown
+        self.latency_ewma: Optional[float] = None
+        self.samples = 0
+        self._last_decrease = -float('inf')
+
+    def is_spike(self, latency: float) -> bool:
+        return (self.samples >= 5 and self.latency_ewma is not None
+                and latency > max(self.latency_factor * self.latency_ewma, self.latency_ewma + self.min_spike))
+
+    def on_success(self, latency: float) -> float:
+        self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+        self.samples += 1
+        self.rate = min(self.max_rate, self.rate + self.increase)
+        return self.rate
+
+    def on_congestion(self) -> float:
+        now = time.monotonic()
+        if now - self._last_decrease >= self.decrease_cooldown:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._last_decrease = now
+        return self.rate
+
+
+class AdaptiveHostLimiter(HostRateLimiter):
+    """HostRateLimiter whose per-host rate follows AIMD feedback, plus a circuit breaker."""
+
+    def __init__(self, requests_per_second: float = 1.0, max_in_flight: int = 2, burst: float = 1.0,
+                 min_rate: float = 0.1, max_rate: float = 8.0, increase: float = 0.1,
+                 decrease: float = 0.5, latency_factor: float = 3.0,
+                 failure_threshold: int = 5, breaker_cooldown: float = 30.0):
+        super().__init__(requests_per_second, max_in_flight, burst)
+        self.controller_options = dict(min_rate=min_rate, max_rate=max_rate, increase=increase,
+                                       decrease=decrease, latency_factor=latency_factor)
+        self.failure_threshold = failure_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._controllers: Dict[str, AIMDController] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def _feedback_state(self, host: str):
+        with self._lock:
+            if host not in self._controllers:
+                self._controllers[host] = AIMDController(self.requests_per_second, **self.controller_options)
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.breaker_cooldown)
+            return self._controllers[host], self._breakers[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        host = urlsplit(url).netloc.lower()
+        _, breaker = self._feedback_state(host)
+        admitted = breaker.admit()
+        if admitted is None:
+            metrics.METRICS.inc('circuit_rejected_total', host=host)
+            raise CircuitOpenError(f"Circuit open for {host}; not sending {url}")
+        try:
+            with super().slot(url):
+                yield
+        except BaseException:
+            # Responses and connection errors are recorded; anything else (a bad URL,
+            # KeyboardInterrupt) must not leave the probe pending and the host blocked
+            if admitted == 'probe':
+                breaker.abandon_probe()
+            raise
+
+    def record(self, url: str, status: Optional[int], latency: float,
+               retry_after: Optional[float] = None) -> None:
+        """Feed back one response (status None = connection error) and retune the host's rate."""
+        host = urlsplit(url).netloc.lower()
+        controller, breaker = self._feedback_state(host)
+        bucket, _ = self._host_state(host)
+
+        failed = status is None or status >= 500 or status == 429
+        with self._lock:
+            if failed or controller.is_spike(latency):
+                rate = controller.on_congestion()
+                direction = 'down'
+            else:
+                rate = controller.on_success(latency)
+                direction = 'up'
+        bucket.set_rate(rate)
+        metrics.METRICS.inc('pacing_adjustments_total', host=host, direction=direction)
+
+        if retry_after is not None and status in THROTTLE_STATUSES:
+            bucket.pause(retry_after)
+        if failed:
+            if breaker.record_failure():
+                metrics.METRICS.inc('circuit_opened_total', host=host)
+                print(f"⛔ Circuit opened for {host} after {breaker.failures} failures; "
+                      f"cooling down {breaker.cooldown:.0f}s")
+        else:
+            breaker.record_success()
+
+    def rates(self) -> Dict[str, float]:
+        """Current requests/sec per host."""
+        with self._lock:
+            return {host: controller.rate for host, controller in self._controllers.items()}
@@ -0,0 +1,336 @@
+"""
+Selectable HTML parser backends for listing and detail pages.
+
+Backends:
+- 'html.parser'   — BeautifulSoup with the pure-Python stdlib parser (slowest)
+- 'lxml'          — BeautifulSoup with the lxml tree builder
+- 'lxml-strained' — BeautifulSoup + lxml, only materializing the subtrees we read
+- 'lxml-raw'      — plain lxml.html tree (XPath for listings), no BeautifulSoup objects at all
+
+Detail pages are described once in DETAIL_FIELDS and extracted in a single
+traversal by extraction.CompiledExtractor, whatever the backend.
+
+ListingStreamParser parses a listing page incrementally while it downloads,
+so a crawl that only wants the first few cards can stop reading early.
+"""
+
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from extraction import CompiledExtractor, Field
+
+
+BACKENDS = ('html.parser', 'lxml', 'lxml-strained', 'lxml-raw')
+
+# Subtrees each page type actually reads; everything else can be skipped.
+LISTING_CLASSES = frozenset(['card'])
+DETAIL_CLASSES = frozenset([
+    'single-card-container', 'social-container', 'task-description-block', 'step', 'timer-btn',
+])
+
+
+def _class_strainer(classes, tags=(), attrs=()) -> SoupStrainer:
+    """Match elements carrying any of `classes`, any tag in `tags` or any attribute in `attrs`."""
+    def matches(name, tag_attrs):
+        if name in tags:
+            return True
+        tag_attrs = tag_attrs or {}
+        if any(attr in tag_attrs for attr in attrs):
+            return True
+        class_value = tag_attrs.get('class') or ''
+        if not isinstance(class_value, str):
+            class_value = ' '.join(class_value)
+        return any(cls in classes for cls in class_value.split())
+    return SoupStrainer(matches)
+
+
+# Cards may sit inside <a> links, so the listing strainer keeps links too.
+LISTING_STRAINER = _class_strainer(LISTING_CLASSES, tags=('a',))
+DETAIL_STRAINER = _class_strainer(DETAIL_CLASSES, attrs=('data-timestamp',))
+
+
+def make_soup(html, backend: str = 'lxml', page: str = 'detail') -> BeautifulSoup:
+    """Build a BeautifulSoup tree for `html` with the given backend."""
+    if backend == 'html.parser':
+        return BeautifulSoup(html, 'html.parser')
+    if backend == 'lxml':
+        return BeautifulSoup(html, 'lxml')
+    if backend == 'lxml-strained':
+        strainer = LISTING_STRAINER if page == 'listing' else DETAIL_STRAINER
+        return BeautifulSoup(html, 'lxml', parse_only=strainer)
+    raise ValueError(f"Backend {backend!r} does not produce a BeautifulSoup tree")
+
+
+# ---------- Shared helpers ----------
+
+def absolute_url(href: str) -> str:
+    """Convert a site-relative link to an absolute cointelegraph.com URL."""
+    if href.startswith('/'):
+        return f"https://cointelegraph.com{href}"
+    return href
+
+
+# Query parameters that only track where a click came from (plus any utm_*)
+TRACKING_PARAMS = frozenset(['ref', 'fbclid', 'gclid'])
+
+CATEGORY_RE = re.compile(r'/bonus-category/([^/?#]+)')
+
+
+def canonical_url(url: str) -> str:
+    """One spelling per page: absolute https, lower-case host, no fragment/tracking params, trailing slash."""
+    parts = urlsplit(absolute_url(url.strip()))
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                       if not (k.lower().startswith('utm_') or k.lower() in TRACKING_PARAMS)])
+    path = parts.path or '/'
+    if not path.endswith('/') and '.' not in path.rsplit('/', 1)[-1]:
+        path += '/'
+    scheme = 'https' if parts.scheme in ('http', 'https', '') and parts.netloc.lower().endswith('cointelegraph.com') else parts.scheme
+    return urlunsplit((scheme, parts.netloc.lower(), path, query, ''))
+
+
+def category_slug(category: str) -> str:
+    """Bonus category slug of a slug or listing URL ('airdrop' for .../bonus-category/airdrop/)."""
+    match = CATEGORY_RE.search(category)
+    return match.group(1) if match else category
+
+
+def time_left_from_timer(timestamp, now: Optional[float] = None) -> Dict[str, str]:
+    """days/hours/minutes left until a `data-timer` epoch timestamp (as of `now`, default: current time)."""
+    seconds_remaining = int(timestamp) - int(time.time() if now is None else now)
+    if seconds_remaining <= 0:
+        return {'days': '0', 'hours': '0', 'minutes': '0'}
+    return {
+        'days': str(int(seconds_remaining // 86400)),
+        'hours': str(int((seconds_remaining % 86400) // 3600)),
+        'minutes': str(int((seconds_remaining % 3600) // 60)),
+    }
+
+
+def time_left_from_timestamp(timestamp, now: Optional[float] = None) -> Dict[str, str]:
+    """Day-only time left from a `data-timestamp` fallback (as of `now`); zero if unparseable."""
+    try:
+        seconds_remaining = int(timestamp) - int(time.time() if now is None else now)
+        days = max(0, int(seconds_remaining / 86400))
+    except (TypeError, ValueError):
+        days = 0
+    return {'days': str(days), 'hours': '0', 'minutes': '0'}
+
+
+def parse_task_description(text: str) -> Dict[str, str]:
+    """Pull 'Time to complete:' and 'Risk level:' values out of a description block."""
+    lines = text.split('\n')
+    found: Dict[str, str] = {}
+    for label, field in (('Time to complete:', 'time_to_complete'), ('Risk level:', 'risk_level')):
+        if label in text:
+            for line in lines:
+                if label in line:
+                    found[field] = line.split(label)[1].strip()
+                    break
+    return found
+
+
+# ---------- Detail page spec ----------
+
+def _merge_task_descriptions(blocks: List[str]) -> Optional[Dict[str, str]]:
+    merged: Dict[str, str] = {}
+    for text in blocks:
+        merged.update(parse_task_description(text))
+    return merged or None
+
+
+DETAIL_FIELDS = [
+    # Timer from data-timer attribute (more reliable than the JS countdown)
+    Field('data_timer', '.single-card-container', attr='data-timer', scoped=True),
+    Field('project_links', '.social-container a', attr='href', many=True, scoped=True,
+          post=lambda hrefs: [href for href in hrefs if href] or None),
+    Field('task_description', '.task-description-block', text=True, many=True,
+          post=_merge_task_descriptions),
+    Field('step_count', '.step', many=True, post=lambda hits: len(hits) or None),
+    Field('cta_link', '.timer-btn a', attr='href', scoped=True),
+    Field('cta_text', '.timer-btn a span', text='strip', scoped=True),
+    # Fallback when the timer is missing
+    Field('data_timestamp', '[data-timestamp]', attr='data-timestamp'),
+]
+
+DETAIL_EXTRACTOR = CompiledExtractor(DETAIL_FIELDS)
+
+
+def assemble_detail(values: Dict[str, Any], now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Turn raw extracted values into the scraper's detail-data dict, time_left
+    as of `now` (default: current time).
+
+    end_timestamp is only set from `data-timer`, so time_left_from_timer can
+    recompute time_left from it later; the `data-timestamp` fallback keeps its
+    day-only time_left.
+    """
+    detail_data: Dict[str, Any] = {}
+
+    if values.get('data_timer'):
+        try:
+            detail_data['time_left'] = time_left_from_timer(values['data_timer'], now=now)
+            detail_data['end_timestamp'] = int(values['data_timer'])
+        except ValueError as e:
+            print(f"Error calculating from timestamp: {e}")
+
+    if 'project_links' in values:
+        detail_data['project_links'] = values['project_links']
+    detail_data.update(values.get('task_description') or {})
+    if 'step_count' in values:
+        detail_data['step_count'] = values['step_count']
+    if values.get('cta_link'):
+        detail_data['cta_link'] = values['cta_link']
+        if 'cta_text' in values:
+            detail_data['cta_text'] = values['cta_text']
+
+    if 'time_left' not in detail_data and values.get('data_timestamp'):
+        detail_data['time_left'] = time_left_from_timestamp(values['data_timestamp'], now=now)
+
+    return detail_data
+
+
+def parse_detail(tree, now: Optional[float] = None) -> Dict[str, Any]:
+    """Extract detail fields from a BeautifulSoup or lxml tree in one traversal."""
+    return assemble_detail(DETAIL_EXTRACTOR.extract(tree), now=now)
+
+
+def parse_detail_html(html, backend: str = 'lxml', now: Optional[float] = None) -> Dict[str, Any]:
+    """Parse detail-page HTML with `backend` and extract its fields (time_left as of `now`)."""
+    if backend == 'lxml-raw':
+        return parse_detail(_lxml_tree(html), now=now)
+    return parse_detail(make_soup(html, backend, page='detail'), now=now)
+
+
+# ---------- Raw lxml backend ----------
+
+def _has_class(cls: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+
+def _stripped_text(element) -> str:
+    """Equivalent of BeautifulSoup's get_text(strip=True)."""
+    return ''.join(piece.strip() for piece in element.itertext())
+
+
+def _first(elements):
+    return elements[0] if elements else None
+
+
+def _lxml_tree(html):
+    import lxml.html
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    return lxml.html.fromstring(html)
+
+
+def _card_detail_url_lxml(card) -> Optional[str]:
+    for href in card.xpath('.//a/@href'):
+        if href:
+            return absolute_url(href)
+    for ancestor in card.iterancestors():
+        if ancestor.tag == 'body':
+            break
+        if ancestor.tag == 'a' and ancestor.get('href'):
+            return absolute_url(ancestor.get('href'))
+    return None
+
+
+def find_next_page_url(html, current_url: str) -> Optional[str]:
+    """Absolute URL of the listing's rel=next page, if the page advertises one."""
+    from urllib.parse import urljoin
+
+    root = _lxml_tree(html)
+    for href in root.xpath('//a[@rel="next"]/@href | //link[@rel="next"]/@href'):
+        if href:
+            return urljoin(current_url, href)
+    return None
+
+
+def _listing_card_lxml(card) -> Tuple[Dict[str, Any], Optional[str]]:
+    from datetime import datetime
+
+    fields = {}
+    for field, cls, default in (
+        ('project_name', 'project-name-title', 'Unknown'),
+        ('task_name', 'task-name', ''),
+        ('reward', 'reward', ''),
+    ):
+        elem = _first(card.xpath(f".//*[{_has_class(cls)}]"))
+        fields[field] = _stripped_text(elem) if elem is not None else default
+    fields['scraped_at'] = datetime.now().isoformat()
+    return fields, _card_detail_url_lxml(card)
+
+
+def parse_listing_lxml(html, limit: Optional[int] = None) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+    """Return (card fields, detail URL) pairs for the listing page via XPath."""
+    root = _lxml_tree(html)
+    cards = root.xpath(f"//div[{_has_class('card')}]")
+    if limit is not None:
+        cards = cards[:limit]
+    return [_listing_card_lxml(card) for card in cards]
+
+
+class ListingStreamParser:
+    """
+    Incremental listing parser: feed() the body as it downloads and get each
+    card's (fields, detail URL) as soon as its div.card closes.
+
+    Cards come out exactly as parse_listing_lxml would return them. Once
+    `limit` cards are out, `done` is set and the rest of the page can be
+    dropped unread.
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        from lxml import etree
+
+        self.limit = limit
+        self.cards = 0
+        self.next_href: Optional[str] = None
+        self._parser = etree.HTMLPullParser(events=('start', 'end'))
+        self._pending = b''
+
+    @property
+    def done(self) -> bool:
+        return self.limit is not None and self.cards >= self.limit
+
+    def feed(self, chunk: bytes) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+        # libxml2's HTML push parser can stop emitting events for good once a chunk
+        # ends inside a tag, so only whole tags are fed; the tail waits for more data
+        data = self._pending + chunk
+        cut = data.rfind(b'>') + 1
+        self._pending = data[cut:]
+        if cut:
+            self._parser.feed(data[:cut])
+        return self._drain()
+
+    def close(self) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+        """Flush the parser at the end of the body; returns any cards still pending."""
+        if self._pending:
+            self._parser.feed(self._pending)
+            self._pending = b''
+        self._parser.close()
+        return self._drain()
+
+    def next_page_url(self, current_url: str) -> Optional[str]:
+        """Absolute rel=next URL, if one has been seen (see find_next_page_url)."""
+        from urllib.parse import urljoin
+
+        return urljoin(current_url, self.next_href) if self.next_href else None
+
+    def _drain(self) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+        results = []
+        for event, element in self._parser.read_events():
+            if self.done:
+                break
+            if event == 'start':
+                if self.next_href is None and element.tag in ('a', 'link') \
+                        and element.get('rel') == 'next' and element.get('href'):
+                    self.next_href = element.get('href')
+            elif element.tag == 'div' and 'card' in (element.get('class') or '').split():
+                results.append(_listing_card_lxml(element))
+                self.cards += 1
+        return results
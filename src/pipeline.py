@@ -0,0 +1,222 @@
+"""
+Staged producer/consumer pipeline for large crawls.
+
+    cards -> fetch threads -> [html queue] -> parse processes -> [result queue] -> consumer
+
+Fetch threads do the network I/O (through the scraper's rate limiter, retries,
+cache and card index), a process pool runs the detail extraction on the raw
+HTML bytes, and the consumer transforms, validates and exports each record as
+soon as it is ready. Both queues are bounded: when parsing falls behind the
+fetchers block, and when the consumer falls behind parsing stops being
+submitted, so memory stays flat however long the crawl is.
+
+An exception in any stage stops every other stage and is re-raised from the
+consumer; closing the consumer early shuts the stages down the same way.
+
+Example:
+    pipeline = DetailPipeline(scraper)
+    airdrops, detail_urls = scraper.list_categories()
+    with exporters.NDJSONWriter('data/airdrops.ndjson.gz') as writer:
+        summary = pipeline.run(airdrops, detail_urls, writer.write)
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import card_index
+import parsing
+import transformers
+import validators
+from metrics import METRICS
+
+_DONE = object()
+
+# Not 'fork': the pool starts its workers from the dispatcher thread while fetch
+# threads may hold the metrics, rate-limiter or cache locks, and a forked child
+# that then takes one of those locks would deadlock
+_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+def _parse_detail(html: bytes, backend: str):
+    """Runs in a worker process: (detail fields, seconds spent parsing)."""
+    start = time.perf_counter()
+    try:
+        detail = parsing.parse_detail_html(html, backend)
+    except Exception as e:
+        print(f"Error getting detail data: {e}")
+        detail = {}
+    return detail, time.perf_counter() - start
+
+
+def _resolved(value) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class DetailPipeline:
+    """Fetch threads + parse process pool + streaming consumer, joined by bounded queues."""
+
+    def __init__(self, scraper, fetch_workers: Optional[int] = None, parse_processes: Optional[int] = None,
+                 queue_size: int = 64):
+        self.scraper = scraper
+        self.fetch_workers = fetch_workers or scraper.max_workers
+        # 0 parses on the dispatcher thread (no process pool)
+        self.parse_processes = (os.cpu_count() or 1) if parse_processes is None else parse_processes
+        self.queue_size = queue_size
+
+    # ---------- Stages ----------
+
+    def _put(self, q: queue.Queue, item, name: str) -> bool:
+        """Blocking put that gives up once the pipeline is stopping. False if it gave up."""
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            waited = time.perf_counter() - start
+            if waited > 0.001:
+                METRICS.observe('pipeline_put_wait_seconds', waited, queue=name)
+            return True
+        return False
+
+    def _run_stage(self, target, *args) -> threading.Thread:
+        def guarded():
+            try:
+                target(*args)
+            except BaseException as e:
+                self._errors.append(e)
+                self._stop.set()
+        thread = threading.Thread(target=guarded, daemon=True)
+        thread.start()
+        return thread
+
+    def _fetch(self, jobs: queue.Queue) -> None:
+        """Fetch stage: card index hits pass straight through, everything else as raw HTML."""
+        index = self.scraper.index
+        while not self._stop.is_set():
+            job = jobs.get()
+            if job is _DONE:
+                break
+            airdrop, url = job
+            fingerprint = detail = html = None
+            if url and index is not None:
+                fingerprint = card_index.card_fingerprint(airdrop)
+                detail = index.lookup(url, fingerprint)
+                if detail is not None:
+                    METRICS.inc('card_index_reused_total')
+            if url and detail is None:
+                html = self.scraper.fetch_detail_html(url)
+            if not self._put(self._html_queue, (airdrop, url, fingerprint, detail, html), 'html'):
+                return
+        self._put(self._html_queue, _DONE, 'html')
+
+    def _dispatch(self, pool: Optional[ProcessPoolExecutor]) -> None:
+        """Parse stage: hand raw HTML to the process pool, in arrival order, behind the result queue."""
+        backend = self.scraper.parser_backend
+        remaining = self.fetch_workers
+        while remaining and not self._stop.is_set():
+            try:
+                item = self._html_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                remaining -= 1
+                continue
+            airdrop, url, fingerprint, detail, html = item
+            if html is None:
+                future = _resolved((detail or {}, None))
+            elif pool is None:
+                future = _resolved(_parse_detail(html, backend))
+            else:
+                future = pool.submit(_parse_detail, html, backend)
+            # Blocks while the consumer is behind, which also caps in-flight parses
+            if not self._put(self._results, (airdrop, url, fingerprint, html is not None, future), 'result'):
+                future.cancel()
+                return
+        self._put(self._results, _DONE, 'result')
+
+    # ---------- Consumers ----------
+
+    def iter_enriched(self, airdrops: List[Dict[str, Any]],
+                      detail_urls: List[Optional[str]]) -> Iterator[Dict[str, Any]]:
+        """Yield each airdrop merged with its detail data, in completion order."""
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._html_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._results: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        jobs: queue.Queue = queue.Queue()
+        for job in zip(airdrops, detail_urls):
+            jobs.put(job)
+        for _ in range(self.fetch_workers):
+            jobs.put(_DONE)
+
+        pool = None
+        if self.parse_processes > 0:
+            pool = ProcessPoolExecutor(max_workers=self.parse_processes, mp_context=_MP_CONTEXT)
+        threads = [self._run_stage(self._fetch, jobs) for _ in range(self.fetch_workers)]
+        threads.append(self._run_stage(self._dispatch, pool))
+        index = self.scraper.index
+        try:
+            while True:
+                if self._errors:
+                    raise self._errors[0]
+                try:
+                    item = self._results.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    break
+                airdrop, url, fingerprint, fetched, future = item
+                detail, parse_seconds = future.result()
+                if parse_seconds is not None:
+                    METRICS.observe('stage_seconds', parse_seconds, stage='detail_parse')
+                if fetched and detail and index is not None:
+                    index.store(url, fingerprint, detail)
+                airdrop.update(detail)
+                yield airdrop
+            if self._errors:
+                raise self._errors[0]
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+            if index is not None:
+                index.save()
+
+    def run(self, airdrops: List[Dict[str, Any]], detail_urls: List[Optional[str]],
+            sink: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """Enrich, transform, validate and hand each valid record to `sink`; returns the validation counters."""
+        transformer = transformers.AirdropDataTransformer()
+        summary = {'total_records': 0, 'valid_records': 0, 'invalid_records': 0,
+                   'total_errors': 0, 'total_warnings': 0, 'overall_quality_score': 0}
+        score_total = 0
+        for airdrop in self.iter_enriched(airdrops, detail_urls):
+            with METRICS.timer('stage_seconds', stage='transform'):
+                record = transformer.transform_airdrop(airdrop)
+            with METRICS.timer('stage_seconds', stage='validate'):
+                validation = validators.validate_airdrop(record)
+            summary['total_records'] += 1
+            summary['total_errors'] += len(validation['errors'])
+            summary['total_warnings'] += len(validation['warnings'])
+            score_total += validation['score']
+            if not validation['valid']:
+                summary['invalid_records'] += 1
+                continue
+            summary['valid_records'] += 1
+            if sink is not None:
+                with METRICS.timer('stage_seconds', stage='export'):
+                    sink(record)
+        if summary['total_records']:
+            summary['overall_quality_score'] = score_total / summary['total_records']
+        return summary
@@ -0,0 +1,94 @@
+"""
+Per-host politeness limits for the scraper.
+
+Every outgoing request goes through a HostRateLimiter, which enforces two
+budgets per host:
+- a token bucket (requests per second, with a small burst allowance)
+- a cap on the number of requests in flight at the same time
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """Classic token bucket: refills at `rate` tokens/sec up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        # No tokens are handed out before this (monotonic) time, e.g. after a Retry-After
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate; tokens earned so far are kept."""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for the next `seconds` (extends, never shortens, a pause)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    wait_time = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                else:
+                    wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+            waited += wait_time
+
+
+class HostRateLimiter:
+    """Token bucket + in-flight cap, kept separately for each host."""
+
+    def __init__(self, requests_per_second: float = 1.0, max_in_flight: int = 2, burst: float = 1.0):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.requests_per_second = requests_per_second
+        self.max_in_flight = max_in_flight
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_state(self, host: str):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+                self._slots[host] = threading.BoundedSemaphore(self.max_in_flight)
+            return self._buckets[host], self._slots[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold an in-flight slot and one token for the URL's host while the request runs."""
+        host = urlsplit(url).netloc.lower()
+        bucket, in_flight = self._host_state(host)
+        with in_flight:
+            bucket.acquire()
+            yield
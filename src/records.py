@@ -0,0 +1,345 @@
+"""
+Compact in-memory representations of airdrop records.
+
+The pipeline passes records around as plain dicts, with numbers kept as
+strings (time_left = {'days': '15', ...}) and ISO timestamps. That is fine
+for one crawl but expensive for months of snapshots. This module offers:
+
+- AirdropRecord: one record in __slots__, with epoch/integer fields, tuples
+  instead of lists and interned low-cardinality strings
+- AirdropColumns: a column store for bulk collections (array-backed numbers,
+  dictionary-encoded repetitive strings, UTF-8 buffers for unique text such
+  as URLs, one presence byte per field)
+
+Both convert losslessly to and from the dict/JSON format:
+AirdropRecord.from_dict(d).to_dict() == d for any record. Keys follow the
+schema order, and anything a field codec cannot reproduce exactly (an unknown
+key, an unusual time format) is kept verbatim in `extra`.
+Measure with `python benchmarks/bench_records.py`.
+"""
+
+import sys
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+_MISSING = object()
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Constant-valued fields added by AirdropDataTransformer, stored as one bit each
+MARKER_FIELDS = (
+    ('TRIPLE_CHECK_TRANSFORMER', 'LOCAL_FILE_USED'),
+    ('CHECK_10TH_TIME', 'YES_LOCAL_TRANSFORMERS_PY'),
+)
+
+
+# ---------- Field codecs (encode returns _MISSING when it cannot represent a value) ----------
+
+def _encode_str(value):
+    return sys.intern(value) if isinstance(value, str) else _MISSING
+
+
+def _encode_text(value):
+    """High-cardinality strings are not interned: each value is usually unique."""
+    return value if isinstance(value, str) else _MISSING
+
+
+def _encode_int(value):
+    return value if type(value) is int else _MISSING
+
+
+def _encode_float(value):
+    return value if type(value) is float else _MISSING
+
+
+def _encode_str_tuple(value):
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        return _MISSING
+    return tuple(sys.intern(item) for item in value)
+
+
+def _decode_list(value):
+    return list(value)
+
+
+def _encode_iso_time(value):
+    """Naive ISO timestamp -> integer microseconds since the epoch."""
+    if not isinstance(value, str):
+        return _MISSING
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return _MISSING
+    if parsed.tzinfo is not None:
+        return _MISSING
+    return (parsed - _EPOCH) // _MICROSECOND
+
+
+def _decode_iso_time(value):
+    return (_EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+def _encode_time_left(value):
+    """{'days', 'hours', 'minutes'} digit strings -> total minutes."""
+    if not isinstance(value, dict) or list(value) != ['days', 'hours', 'minutes']:
+        return _MISSING
+    try:
+        days, hours, minutes = (int(value[key]) for key in ('days', 'hours', 'minutes'))
+    except (TypeError, ValueError):
+        return _MISSING
+    return days * 1440 + hours * 60 + minutes
+
+
+def _decode_time_left(value):
+    days, rest = divmod(value, 1440)
+    hours, minutes = divmod(rest, 60)
+    return {'days': str(days), 'hours': str(hours), 'minutes': str(minutes)}
+
+
+def _identity(value):
+    return value
+
+
+# (dict key, column kind, encode, decode) in the order records are rebuilt,
+# which is the order the scraper produces them in (so JSON text round-trips too)
+SCHEMA: Tuple[Tuple[str, str, Callable, Callable], ...] = (
+    ('project_name', 'str', _encode_str, _identity),
+    ('task_name', 'text', _encode_text, _identity),
+    ('reward', 'str', _encode_str, _identity),
+    ('scraped_at', 'int', _encode_iso_time, _decode_iso_time),
+    ('detail_url', 'text', _encode_text, _identity),
+    ('bonus_categories', 'strs', _encode_str_tuple, _decode_list),
+    ('time_left', 'int', _encode_time_left, _decode_time_left),
+    ('end_timestamp', 'int', _encode_int, _identity),
+    ('project_links', 'strs', _encode_str_tuple, _decode_list),
+    ('time_to_complete', 'str', _encode_str, _identity),
+    ('risk_level', 'str', _encode_str, _identity),
+    ('step_count', 'int', _encode_int, _identity),
+    ('cta_link', 'str', _encode_str, _identity),
+    ('cta_text', 'str', _encode_str, _identity),
+    ('priority', 'str', _encode_str, _identity),
+    ('effort', 'str', _encode_str, _identity),
+    ('urgency_score', 'float', _encode_float, _identity),
+    ('reward_amount', 'float', _encode_float, _identity),
+)
+FIELD_NAMES = tuple(name for name, _, _, _ in SCHEMA)
+_CODECS = {name: (encode, decode) for name, _, encode, decode in SCHEMA}
+_KINDS = {name: kind for name, kind, _, _ in SCHEMA}
+_MARKERS = dict(MARKER_FIELDS)
+
+
+def _encode_field(name: str, value):
+    """Encoded value, or _MISSING unless it decodes back to exactly `value`."""
+    if value is None:
+        return None
+    encode, decode = _CODECS[name]
+    encoded = encode(value)
+    if encoded is _MISSING:
+        return _MISSING
+    decoded = decode(encoded)
+    if type(decoded) is not type(value) or decoded != value:
+        return _MISSING
+    return encoded
+
+
+class AirdropRecord:
+    """One airdrop in __slots__; unset slots are keys the source dict did not have."""
+
+    __slots__ = FIELD_NAMES + ('markers', 'extra')
+
+    def __init__(self, **fields):
+        self.markers = 0
+        self.extra = None
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AirdropRecord':
+        record = cls()
+        for bit, (name, marker) in enumerate(MARKER_FIELDS):
+            if data.get(name, _MISSING) == marker:
+                record.markers |= 1 << bit
+        for key, value in data.items():
+            if key in _CODECS:
+                encoded = _encode_field(key, value)
+                if encoded is not _MISSING:
+                    setattr(record, key, encoded)
+                    continue
+            elif _MARKERS.get(key, _MISSING) == value:
+                continue
+            if record.extra is None:
+                record.extra = {}
+            record.extra[key] = value
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        for name, (_, decode) in _CODECS.items():
+            value = getattr(self, name, _MISSING)
+            if value is not _MISSING:
+                data[name] = None if value is None else decode(value)
+        for bit, (name, marker) in enumerate(MARKER_FIELDS):
+            if self.markers & (1 << bit):
+                data[name] = marker
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def get(self, name: str, default=None):
+        """Raw (encoded) slot value, e.g. scraped_at in epoch microseconds."""
+        return getattr(self, name, default)
+
+    def __eq__(self, other):
+        return isinstance(other, AirdropRecord) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"AirdropRecord({self.to_dict()!r})"
+
+
+# ---------- Column store ----------
+
+# Presence byte per field and row
+_ABSENT, _NONE, _PRESENT = 0, 1, 2
+
+
+class _Strings:
+    """Dictionary encoding shared by every string column."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class AirdropColumns:
+    """
+    Append-only column store of airdrop records.
+
+    Numbers live in typed arrays, repetitive strings as uint32 codes into one
+    shared dictionary, string lists as codes plus offsets, and mostly-unique
+    text as one UTF-8 buffer plus offsets. Rows come back as dicts
+    (or AirdropRecords) identical to what went in.
+    """
+
+    def __init__(self, records: Iterable[Any] = ()):
+        self._strings = _Strings()
+        self._presence = {name: bytearray() for name in FIELD_NAMES}
+        self._values: Dict[str, array] = {}
+        self._offsets: Dict[str, array] = {}
+        for name, kind, _, _ in SCHEMA:
+            if kind == 'text':
+                self._values[name] = bytearray()
+            else:
+                self._values[name] = array({'int': 'q', 'float': 'd', 'str': 'I', 'strs': 'I'}[kind])
+            if kind in ('strs', 'text'):
+                self._offsets[name] = array('Q', [0])
+        self._markers = bytearray()
+        self._extra: Dict[int, Dict[str, Any]] = {}
+        self._length = 0
+        self.extend(records)
+
+    def append(self, record: Any) -> None:
+        """Add a dict or an AirdropRecord."""
+        if not isinstance(record, AirdropRecord):
+            record = AirdropRecord.from_dict(record)
+        for name, kind, _, _ in SCHEMA:
+            value = getattr(record, name, _MISSING)
+            values = self._values[name]
+            if value is _MISSING or value is None:
+                self._presence[name].append(_ABSENT if value is _MISSING else _NONE)
+                if kind in ('strs', 'text'):
+                    self._offsets[name].append(len(values))
+                else:
+                    values.append(0)
+                continue
+            self._presence[name].append(_PRESENT)
+            if kind == 'str':
+                values.append(self._strings.code(value))
+            elif kind == 'strs':
+                values.extend(self._strings.code(item) for item in value)
+                self._offsets[name].append(len(values))
+            elif kind == 'text':
+                values.extend(value.encode('utf-8', 'surrogatepass'))
+                self._offsets[name].append(len(values))
+            else:
+                values.append(value)
+        self._markers.append(record.markers)
+        if record.extra:
+            self._extra[self._length] = record.extra
+        self._length += 1
+
+    def extend(self, records: Iterable[Any]) -> None:
+        for record in records:
+            self.append(record)
+
+    def _encoded(self, name: str, kind: str, index: int):
+        """Slot value of one cell: _MISSING, None or the encoded value."""
+        state = self._presence[name][index]
+        if state != _PRESENT:
+            return _MISSING if state == _ABSENT else None
+        values = self._values[name]
+        if kind == 'str':
+            return self._strings.values[values[index]]
+        if kind in ('strs', 'text'):
+            offsets = self._offsets[name]
+            cell = values[offsets[index]:offsets[index + 1]]
+            if kind == 'text':
+                return cell.decode('utf-8', 'surrogatepass')
+            return tuple(self._strings.values[code] for code in cell)
+        return values[index]
+
+    def record(self, index: int) -> AirdropRecord:
+        if not -self._length <= index < self._length:
+            raise IndexError(index)
+        index %= self._length
+        record = AirdropRecord()
+        for name, kind, _, _ in SCHEMA:
+            value = self._encoded(name, kind, index)
+            if value is not _MISSING:
+                setattr(record, name, value)
+        record.markers = self._markers[index]
+        record.extra = self._extra.get(index)
+        return record
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self.record(index).to_dict()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self._length):
+            yield self[index]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def column(self, name: str) -> List[Any]:
+        """Decoded values of one field for every row (None where absent or null)."""
+        kind = _KINDS[name]
+        decode = _CODECS[name][1]
+        column = []
+        for index in range(self._length):
+            value = self._encoded(name, kind, index)
+            column.append(None if value is _MISSING or value is None else decode(value))
+        return column
+
+    def nbytes(self) -> int:
+        """Approximate bytes held by the arrays and the string dictionary."""
+        total = sum(len(p) for p in self._presence.values()) + len(self._markers)
+        total += sum(memoryview(v).nbytes for v in self._values.values())
+        total += sum(memoryview(o).nbytes for o in self._offsets.values())
+        total += sum(sys.getsizeof(s) for s in self._strings.values)
+        return total
+
+
+def to_records(airdrops: Iterable[Dict[str, Any]]) -> List[AirdropRecord]:
+    return [AirdropRecord.from_dict(airdrop) for airdrop in airdrops]
+
+
+def to_dicts(records: Iterable[AirdropRecord]) -> List[Dict[str, Any]]:
+    return [record.to_dict() for record in records]
@@ -0,0 +1,316 @@
+"""
+Expiry-aware refresh scheduler: a long-running alternative to one-shot crawls.
+
+Every known airdrop sits in a priority queue keyed by its next refresh time,
+so fetches go where the data is actually changing:
+
+- the interval is a fraction (REFRESH_FRACTION) of the time left before the
+  airdrop ends, so checks get denser as expiry approaches; HIGH priority
+  airdrops are refreshed at least every `high_priority_interval`
+- a refresh that finds the detail data unchanged doubles the interval (up to
+  2**MAX_STABLE_DOUBLINGS times); any change resets it
+- everything is clamped to [min_interval, max_interval], and ended airdrops
+  are dropped after their last refresh
+- each category's listing is polled every `listing_interval` to discover new
+  cards (fetched right away) and notice edited ones
+
+Refreshed records go through transform -> validate -> scoring and are
+upserted into the SQLite store.
+
+    scheduler = RefreshScheduler(scraper, store=storage.AirdropStore())
+    scheduler.seed_from_store()
+    scheduler.run()            # until stop() / KeyboardInterrupt
+"""
+
+import hashlib
+import heapq
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import card_index
+import parsing
+import records
+import scoring
+import transformers
+import validators
+from metrics import METRICS
+from storage import end_timestamp_of, record_key
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+
+REFRESH_FRACTION = 0.1
+MAX_STABLE_DOUBLINGS = 3
+# Airdrops without a known end time
+UNKNOWN_END_INTERVAL = 6 * HOUR
+
+# Detail fields that change on every fetch without the page changing
+VOLATILE_DETAIL_FIELDS = ('time_left',)
+
+
+def detail_fingerprint(detail: Dict[str, Any]) -> str:
+    """Content hash of detail data, ignoring fields recomputed at fetch time."""
+    stable = {k: v for k, v in detail.items() if k not in VOLATILE_DETAIL_FIELDS}
+    payload = json.dumps(stable, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def refresh_interval(seconds_left: Optional[float], stable: int = 0, min_interval: float = 5 * MINUTE,
+                     max_interval: float = 24 * HOUR,
+                     high_priority_interval: float = 15 * MINUTE) -> Optional[float]:
+    """Seconds until an airdrop's next refresh, or None once it has ended."""
+    if seconds_left is None:
+        interval = UNKNOWN_END_INTERVAL
+    elif seconds_left <= 0:
+        return None
+    else:
+        interval = seconds_left * REFRESH_FRACTION
+    interval *= 2 ** min(stable, MAX_STABLE_DOUBLINGS)
+    if scoring.priority_for(seconds_left) == 'HIGH':
+        interval = min(interval, high_priority_interval)
+    if seconds_left is not None:
+        # Never skip past the end: the last refresh sees the final state
+        interval = min(interval, seconds_left)
+    return max(min_interval, min(interval, max_interval))
+
+
+class _Tracked:
+    """Scheduler state for one airdrop."""
+
+    __slots__ = ('airdrop', 'card_fingerprint', 'detail_fingerprint', 'stable', 'failures')
+
+    def __init__(self, airdrop: Dict[str, Any], card_fingerprint: Optional[str] = None):
+        self.airdrop = airdrop
+        self.card_fingerprint = card_fingerprint
+        self.detail_fingerprint: Optional[str] = None
+        self.stable = 0
+        self.failures = 0
+
+
+class RefreshScheduler:
+    """Priority queue of listing polls and detail refreshes, run by due time."""
+
+    def __init__(self, scraper, store=None, categories=None, listing_interval: float = 30 * MINUTE,
+                 limit_per_category: Optional[int] = None, max_pages: Optional[int] = None,
+                 min_interval: float = 5 * MINUTE, max_interval: float = 24 * HOUR,
+                 high_priority_interval: float = 15 * MINUTE,
+                 sink: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        self.scraper = scraper
+        # Optional storage.AirdropStore that refreshed records are upserted into
+        self.store = store
+        self.categories = list(categories or scraper.categories)
+        self.listing_interval = listing_interval
+        self.limit_per_category = limit_per_category
+        self.max_pages = max_pages
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.high_priority_interval = high_priority_interval
+        # Optional callback receiving each batch of published (validated, scored) records
+        self.sink = sink
+        self._tracked: Dict[str, _Tracked] = {}
+        # Ended airdrops -> card fingerprint, so cards still listed are not re-tracked
+        self._ended: Dict[str, Optional[str]] = {}
+        self._due: Dict[Tuple[str, str], float] = {}
+        self._heap: List = []  # (due, seq, task); stale when _due[task] no longer matches
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+        for category in self.categories:
+            self._schedule(('listing', category), 0)
+
+    # ---------- Queue ----------
+
+    def _schedule(self, task: Tuple[str, str], due: float) -> None:
+        self._due[task] = due
+        heapq.heappush(self._heap, (due, next(self._seq), task))
+        if len(self._heap) > 2 * len(self._due) + 64:
+            # Mostly stale entries from rescheduled tasks: rebuild from the live ones
+            self._heap = [(due, next(self._seq), task) for task, due in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_due(self, now: float) -> List[Tuple[str, str]]:
+        tasks = []
+        while self._heap and self._heap[0][0] <= now:
+            due, _, task = heapq.heappop(self._heap)
+            if self._due.get(task) == due:
+                del self._due[task]
+                tasks.append(task)
+        return tasks
+
+    def next_due(self) -> Optional[float]:
+        """When the earliest pending task is due (None if nothing is scheduled)."""
+        while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def __len__(self) -> int:
+        """Airdrops currently tracked."""
+        return len(self._tracked)
+
+    def _interval(self, tracked: _Tracked, now: float) -> Optional[float]:
+        end = end_timestamp_of(tracked.airdrop)
+        return refresh_interval(None if end is None else end - now, tracked.stable,
+                                self.min_interval, self.max_interval, self.high_priority_interval)
+
+    def _reschedule(self, key: str, tracked: _Tracked, now: float, since: Optional[float] = None) -> bool:
+        interval = self._interval(tracked, now)
+        if interval is None:
+            self._ended[key] = self._tracked.pop(key).card_fingerprint
+            METRICS.inc('scheduler_expired_total')
+            return False
+        self._schedule(('detail', key), (now if since is None else since) + interval)
+        return True
+
+    # ---------- Seeding ----------
+
+    def track(self, airdrop: Dict[str, Any], last_refresh: Optional[float] = None,
+              now: Optional[float] = None) -> bool:
+        """Start tracking an airdrop; without last_refresh it is refreshed right away."""
+        now = time.time() if now is None else now
+        key = record_key(airdrop)
+        if not airdrop.get('detail_url') or key in self._tracked or key in self._ended:
+            return False
+        tracked = self._tracked[key] = _Tracked(airdrop)
+        if last_refresh is None:
+            self._schedule(('detail', key), now)
+            return True
+        return self._reschedule(key, tracked, now, since=min(last_refresh, now))
+
+    def seed_from_store(self, now: Optional[float] = None) -> int:
+        """Track every still-open airdrop in the store, due relative to when it was scraped."""
+        if self.store is None:
+            return 0
+        now = time.time() if now is None else now
+        seeded = 0
+        for airdrop in self.store.query():
+            try:
+                scraped = datetime.fromisoformat(airdrop['scraped_at']).timestamp()
+            except (KeyError, TypeError, ValueError):
+                scraped = None
+            seeded += self.track(airdrop, last_refresh=scraped, now=now)
+        return seeded
+
+    # ---------- Work ----------
+
+    def _poll_listing(self, category: str, now: float) -> int:
+        """Discover new cards (due now) and re-queue edited ones; returns how many are new."""
+        airdrops, detail_urls = self.scraper.collect_listing(
+            self.scraper.category_url(category), self.limit_per_category, self.max_pages)
+        METRICS.inc('scheduler_listing_polls_total')
+        new = 0
+        for airdrop, url in zip(airdrops, detail_urls):
+            if not url:
+                continue
+            url = airdrop['detail_url'] = parsing.canonical_url(url)
+            fingerprint = card_index.card_fingerprint(airdrop)
+            tracked = self._tracked.get(url)
+            if url in self._ended:
+                if self._ended[url] in (None, fingerprint):
+                    continue
+                del self._ended[url]  # Edited since it ended (e.g. extended): track it again
+            if tracked is None:
+                airdrop['bonus_categories'] = [parsing.category_slug(category)]
+                self._tracked[url] = _Tracked(airdrop, fingerprint)
+                self._schedule(('detail', url), now)
+                new += 1
+                continue
+            slug = parsing.category_slug(category)
+            if slug not in tracked.airdrop.setdefault('bonus_categories', []):
+                tracked.airdrop['bonus_categories'].append(slug)
+            if tracked.card_fingerprint is None:
+                tracked.card_fingerprint = fingerprint  # Seeded from the store: nothing to compare yet
+            elif fingerprint != tracked.card_fingerprint:
+                # Card edited (reward, title, ...): keep its detail data, refresh it now
+                tracked.airdrop.update(airdrop, bonus_categories=tracked.airdrop['bonus_categories'])
+                tracked.card_fingerprint = fingerprint
+                self._schedule(('detail', url), now)
+        METRICS.inc('scheduler_new_airdrops_total', new)
+        self._schedule(('listing', category), now + self.listing_interval)
+        return new
+
+    def _refresh(self, keys: List[str], now: float) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Fetch detail pages concurrently; returns (refreshed raw records, outcome counts)."""
+        outcomes = {'changed': 0, 'unchanged': 0, 'failed': 0, 'expired': 0}
+        if not keys:
+            return [], outcomes
+        urls = [self._tracked[key].airdrop['detail_url'] for key in keys]
+        with ThreadPoolExecutor(max_workers=max(1, min(len(urls), self.scraper.max_workers))) as pool:
+            details = list(pool.map(self.scraper.get_detail_data, urls))
+
+        refreshed = []
+        for key, detail in zip(keys, details):
+            tracked = self._tracked[key]
+            if not detail:
+                tracked.failures += 1
+                outcomes['failed'] += 1
+                METRICS.inc('scheduler_refreshes_total', outcome='failed')
+                backoff = self.min_interval * 2 ** min(tracked.failures - 1, MAX_STABLE_DOUBLINGS)
+                self._schedule(('detail', key), now + min(backoff, self.max_interval))
+                continue
+
+            fingerprint = detail_fingerprint(detail)
+            outcome = 'unchanged' if fingerprint == tracked.detail_fingerprint else 'changed'
+            tracked.stable = min(tracked.stable + 1, MAX_STABLE_DOUBLINGS) if outcome == 'unchanged' else 0
+            tracked.detail_fingerprint = fingerprint
+            tracked.failures = 0
+            tracked.airdrop.update(detail)
+            tracked.airdrop['scraped_at'] = datetime.fromtimestamp(now).isoformat()
+            outcomes[outcome] += 1
+            METRICS.inc('scheduler_refreshes_total', outcome=outcome)
+            refreshed.append(dict(tracked.airdrop))
+            if not self._reschedule(key, tracked, now):
+                outcomes['expired'] += 1
+        return refreshed, outcomes
+
+    def _publish(self, raw: List[Dict[str, Any]], now: float) -> int:
+        """Transform, validate and score refreshed records, then hand them to the store/sink."""
+        valid = validators.validate_and_partition(transformers.transform_airdrop_data(raw))['valid']
+        for airdrop in valid:
+            for field, _ in records.MARKER_FIELDS:
+                airdrop.pop(field, None)
+        scoring.score_airdrops(valid, now=now)
+        if self.store is not None and valid:
+            self.store.upsert_many(valid)
+        if self.sink is not None and valid:
+            self.sink(valid)
+        return len(valid)
+
+    def run_pending(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Run every task due at `now`: listing polls first, then detail refreshes."""
+        now = time.time() if now is None else now
+        tasks = self._pop_due(now)
+        new = sum(self._poll_listing(name, now) for kind, name in tasks if kind == 'listing')
+        # Cards found by the polls above are due now too
+        keys = [name for kind, name in tasks + self._pop_due(now) if kind == 'detail' and name in self._tracked]
+        refreshed, outcomes = self._refresh(keys, now)
+        return {
+            'listing_polls': sum(1 for kind, _ in tasks if kind == 'listing'),
+            'new': new,
+            'refreshed': len(refreshed),
+            'published': self._publish(refreshed, now) if refreshed else 0,
+            'tracked': len(self._tracked),
+            'next_due': self.next_due(),
+            **outcomes,
+        }
+
+    def run(self, until: Optional[float] = None,
+            after_pass: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
+        """Process tasks as they come due until stop() is called (or the clock reaches `until`)."""
+        self._stop.clear()
+        while not self._stop.is_set():
+            now = time.time()
+            if until is not None and now >= until:
+                break
+            summary = self.run_pending(now)
+            if after_pass is not None and (summary['listing_polls'] or summary['refreshed'] or summary['failed']):
+                after_pass(summary)
+            next_due = self.next_due()
+            wake = until if next_due is None else next_due if until is None else min(next_due, until)
+            self._stop.wait(None if wake is None else max(0.0, wake - time.time()))
+
+    def stop(self) -> None:
+        self._stop.set()
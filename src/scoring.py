@@ -0,0 +1,163 @@
+"""
+Business scoring for airdrops: priority, effort and urgency-vs-reward.
+
+score_airdrops() annotates a batch of records in place:
+- priority        HIGH (<= 1 day left) / MEDIUM (<= 7 days) / LOW
+- effort          Easy (<= 3 steps) / Medium (<= 6) / Hard
+- urgency_score   higher = more valuable and ending sooner; 0 once expired
+
+Everything is computed from the absolute end time (storage.end_timestamp_of),
+so scores stay correct however long ago the record was scraped.
+
+UrgencyIndex keeps records in heaps as they arrive and answers "top K most
+urgent/valuable" and "expiring within N hours" without sorting everything:
+
+    index = UrgencyIndex()
+    index.add_many(valid_airdrops)
+    index.top_k(10)
+    index.expiring_within(hours=24)
+"""
+
+import heapq
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import transformers
+from storage import end_timestamp_of, record_key
+
+DAY = 24 * 60 * 60
+
+
+def priority_for(seconds_left: Optional[float]) -> Optional[str]:
+    """HIGH / MEDIUM / LOW from the whole days left (None when the end is unknown)."""
+    if seconds_left is None:
+        return None
+    days = max(0, int(seconds_left // DAY))
+    if days <= 1:
+        return 'HIGH'
+    if days <= 7:
+        return 'MEDIUM'
+    return 'LOW'
+
+
+def effort_for(step_count: Optional[int]) -> str:
+    steps = step_count or 0
+    if steps <= 3:
+        return 'Easy'
+    if steps <= 6:
+        return 'Medium'
+    return 'Hard'
+
+
+def urgency_score(reward_amount: Optional[float], seconds_left: Optional[float]) -> float:
+    """Reward weight (1 + log10(1 + amount)) divided by (1 + days left), scaled to ~0-100."""
+    if seconds_left is None or seconds_left <= 0:
+        return 0.0
+    value = 1 + math.log10(1 + reward_amount) if reward_amount and reward_amount > 0 else 1.0
+    return round(100 * value / (1 + seconds_left / DAY), 3)
+
+
+def _reward_amounts(airdrops: List[Dict[str, Any]]) -> List[Optional[float]]:
+    """Parsed reward amounts, using the columnar parser for large batches."""
+    if len(airdrops) < transformers.BATCH_THRESHOLD:
+        return [transformers.extract_reward_amount(airdrop.get('reward')) for airdrop in airdrops]
+    amounts = transformers.extract_reward_amounts([airdrop.get('reward') for airdrop in airdrops])
+    return [None if math.isnan(amount) else float(amount) for amount in amounts]
+
+
+def score_airdrops(airdrops: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Add priority, effort and urgency_score to each record (in place); returns the list."""
+    now = time.time() if now is None else now
+    for airdrop, amount in zip(airdrops, _reward_amounts(airdrops)):
+        end = end_timestamp_of(airdrop)
+        seconds_left = None if end is None else end - now
+        priority = priority_for(seconds_left)
+        if priority is not None:
+            airdrop['priority'] = priority
+        airdrop['effort'] = effort_for(airdrop.get('step_count'))
+        airdrop['urgency_score'] = urgency_score(amount, seconds_left)
+    return airdrops
+
+
+class UrgencyIndex:
+    """
+    Incrementally built index over airdrops keyed by storage.record_key.
+
+    A min-heap on end time serves expiry queries (pruned traversal, so only
+    matching entries are visited); top_k() keeps a K-sized heap over current
+    scores. Re-adding a key replaces the old entry; stale heap entries are
+    skipped and dropped lazily.
+    """
+
+    def __init__(self):
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._rewards: Dict[str, Optional[float]] = {}
+        self._ends: Dict[str, int] = {}
+        self._end_heap: List = []  # (end_timestamp, key)
+
+    def add(self, airdrop: Dict[str, Any]) -> None:
+        self._add(airdrop, transformers.extract_reward_amount(airdrop.get('reward')))
+
+    def add_many(self, airdrops: Iterable[Dict[str, Any]]) -> None:
+        airdrops = list(airdrops)
+        for airdrop, amount in zip(airdrops, _reward_amounts(airdrops)):
+            self._add(airdrop, amount)
+
+    def _add(self, airdrop: Dict[str, Any], reward_amount: Optional[float]) -> None:
+        key = record_key(airdrop)
+        self._records[key] = airdrop
+        self._rewards[key] = reward_amount
+        end = end_timestamp_of(airdrop)
+        if end is None:
+            self._ends.pop(key, None)
+        else:
+            self._ends[key] = end
+            heapq.heappush(self._end_heap, (end, key))
+        if len(self._end_heap) > 2 * len(self._ends) + 64:
+            # Mostly stale entries from re-added keys: rebuild from the live ones
+            self._end_heap = [(end, key) for key, end in self._ends.items()]
+            heapq.heapify(self._end_heap)
+
+    def _current(self, end: int, key: str) -> bool:
+        return self._ends.get(key) == end
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop records that have already ended; returns how many were removed."""
+        now = time.time() if now is None else now
+        removed = 0
+        while self._end_heap and self._end_heap[0][0] < now:
+            end, key = heapq.heappop(self._end_heap)
+            if self._current(end, key):
+                del self._ends[key], self._records[key], self._rewards[key]
+                removed += 1
+        return removed
+
+    def top_k(self, k: int, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """The k records with the highest urgency_score right now, best first."""
+        now = time.time() if now is None else now
+        scored = (
+            (urgency_score(self._rewards[key], end - now), key)
+            for key, end in self._ends.items() if end > now
+        )
+        return [self._records[key] for _, key in heapq.nlargest(k, scored)]
+
+    def expiring_within(self, hours: float, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Still-open records ending in the next `hours`, soonest first."""
+        now = time.time() if now is None else now
+        deadline = now + hours * 3600
+        matches = set()
+        # Walk the heap from the root; a node past the deadline has no matching descendants
+        stack = [0] if self._end_heap else []
+        while stack:
+            i = stack.pop()
+            end, key = self._end_heap[i]
+            if end > deadline:
+                continue
+            if end >= now and self._current(end, key):
+                matches.add((end, key))
+            stack.extend(child for child in (2 * i + 1, 2 * i + 2) if child < len(self._end_heap))
+        return [self._records[key] for _, key in sorted(matches)]
+
+    def __len__(self) -> int:
+        return len(self._records)
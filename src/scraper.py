@@ -1,18 +1,70 @@
 import requests
-from bs4 import BeautifulSoup
 import json
+import os
 from datetime import datetime
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+import archive
+import card_index
+import columnar
+import diff
+import exporters
+import http_cache
+import metrics
+import pacing
+import parsing
+import pipeline
+import scoring
+import storage
 import transformers
 import validators
 
+CATEGORY_URL_TEMPLATE = "https://cointelegraph.com/crypto-bonus/bonus-category/{category}/"
+
+# Bytes read per step when streaming a listing page
+STREAM_CHUNK_BYTES = 16 * 1024
+
 class SimpleCointelegraphScraper:
     """Simplified scraper for Cointelegraph airdrop data."""
     
-    def __init__(self):
+    def __init__(self, max_workers=4, requests_per_second=1.0, max_in_flight=2, cache=None,
+                 parser_backend='lxml', index=None, max_requests_per_second=4.0, categories=('airdrop',),
+                 archive=None, stream_listings=False):
+        if parser_backend not in parsing.BACKENDS:
+            raise ValueError(f"Unknown parser backend {parser_backend!r}, expected one of {parsing.BACKENDS}")
+        self.parser_backend = parser_backend
+        # Politeness budget per host: starts at requests_per_second and adapts (AIMD)
+        # to how the site responds, never exceeding max_requests_per_second
+        self.rate_limiter = pacing.AdaptiveHostLimiter(
+            requests_per_second=requests_per_second,
+            max_in_flight=max_in_flight,
+            max_rate=max_requests_per_second,
+        )
+        self.max_retries = 3
+        self.max_workers = max_workers
+        # Optional http_cache.ResponseCache; None means always hit the network
+        self.cache = cache
+        # Optional card_index.CardIndex; unchanged cards reuse their stored detail data
+        self.index = index
+        # Optional archive.HtmlArchive; every page fetched over the network is kept for replay
+        self.archive = archive
+        # Parse listing pages while they download and hang up once enough cards are in
+        # (bypasses the response cache for listing pages; only complete pages are archived)
+        self.stream_listings = stream_listings
         self.base_url = "https://cointelegraph.com/crypto-bonus/bonus-category/airdrop/"
+        # Bonus categories walked by crawl_categories()
+        self.categories = list(categories)
+        # Fallback when a listing page has no rel=next link
+        self.page_url_template = "{base_url}page/{page}/"
         self.session = requests.Session()
+        # One keep-alive pool shared by every category and worker thread. Sized so
+        # no worker waits for a connection; retries are handled by _fetch_with_retries.
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(max_workers, max_in_flight), max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -22,56 +74,400 @@ class SimpleCointelegraphScraper:
             'Upgrade-Insecure-Requests': '1',
         })
     
-    def scrape_basic_info(self, limit=10):
-        """Scrape basic airdrop info from the main page with detail page enhancement"""
-        # Retry with exponential backoff for main page
-        max_retries = 3
-        for attempt in range(max_retries):
+    def _get(self, url):
+        """GET a URL, serving from the response cache when one is configured"""
+        if self.cache is None:
+            return self._send(url)
+        response = self.cache.get(url, self._send)
+        outcome = 'hit' if getattr(response, 'from_cache', False) else 'miss'
+        metrics.METRICS.inc('cache_lookups_total', outcome=outcome)
+        return response
+    
+    def _send(self, url, headers=None, stream=False):
+        """GET a URL over the network inside the per-host rate limit, feeding the pacer
+        
+        With stream=True the body is left unread (latency is time to headers) and the
+        caller counts the bytes it reads.
+        """
+        host = urlsplit(url).netloc
+        queued_at = time.perf_counter()
+        with self.rate_limiter.slot(url):
+            started_at = time.perf_counter()
+            metrics.METRICS.observe('rate_limit_wait_seconds', started_at - queued_at, host=host)
+            try:
+                response = self.session.get(url, headers=headers, stream=stream)
+            except requests.RequestException:
+                latency = time.perf_counter() - started_at
+                metrics.METRICS.inc('http_requests_total', host=host, status='error')
+                metrics.METRICS.observe('http_request_seconds', latency, host=host)
+                self.rate_limiter.record(url, None, latency)
+                raise
+            latency = time.perf_counter() - started_at
+        metrics.METRICS.observe('http_request_seconds', latency, host=host)
+        metrics.METRICS.inc('http_requests_total', host=host, status=response.status_code)
+        if not stream:
+            metrics.METRICS.inc('http_bytes_downloaded_total', len(response.content), host=host)
+        retry_after = pacing.retry_after_seconds(response.headers.get('Retry-After'))
+        self.rate_limiter.record(url, response.status_code, latency, retry_after)
+        return response
+    
+    def _fetch_with_retries(self, url, what='Request', stream=False):
+        """GET with jittered exponential backoff that honors Retry-After; None if it gives up"""
+        for attempt in range(self.max_retries):
+            retry_after = None
             try:
-                response = self.session.get(self.base_url)
-                response.raise_for_status()
-                break
-            except requests.RequestException as e:
-                wait_time = 2 ** attempt  # 1s, 2s, 4s
-                print(f"⚠️  Main page request failed (attempt {attempt + 1}/{max_retries}), waiting {wait_time}s...")
-                if attempt < max_retries - 1:
-                    time.sleep(wait_time)
-                else:
-                    print(f"❌ Failed to fetch main page after {max_retries} attempts")
-                    return []
+                response = self._send(url, stream=True) if stream else self._get(url)
+            except pacing.CircuitOpenError as e:
+                print(f"⛔ {e}")
+                return None
+            except requests.RequestException:
+                pass
+            else:
+                if response.status_code < 400:
+                    return response
+                if stream:
+                    response.close()
+                if response.status_code not in pacing.RETRYABLE_STATUSES:
+                    if response.status_code != 404:
+                        print(f"❌ {url} returned {response.status_code}; not retrying")
+                    return None
+                retry_after = pacing.retry_after_seconds(response.headers.get('Retry-After'))
+            
+            if attempt < self.max_retries - 1:
+                wait_time = pacing.backoff_delay(attempt, retry_after=retry_after)
+                print(f"⚠️  {what} failed (attempt {attempt + 1}/{self.max_retries}), waiting {wait_time:.1f}s...")
+                metrics.METRICS.inc('http_retries_total')
+                metrics.METRICS.inc('backoff_sleep_seconds_total', wait_time)
+                time.sleep(wait_time)
+        print(f"❌ Failed to fetch {url} after {self.max_retries} attempts")
+        return None
+    
+    def _archive_response(self, url, response, kind):
+        """Keep fresh network responses in the HTML archive (cache hits were archived when fetched)"""
+        if self.archive is not None and response is not None and not getattr(response, 'from_cache', False):
+            self.archive.add(url, response.content, kind=kind, status=response.status_code)
+    
+    def _archive_cards(self, url, airdrops):
+        """Record how many cards of the listing page at `url` the crawl took, so replay takes the same"""
+        if self.archive is not None:
+            self.archive.add_cards(url, len(airdrops))
+    
+    def fetch_listing_page(self, url):
+        """Fetch a listing page with retries; None past the last page or if every attempt fails"""
+        response = self._fetch_with_retries(url, 'Main page request')
+        self._archive_response(url, response, 'listing')
+        return response
+    
+    def stream_listing_page(self, url, limit=None):
+        """Parse a listing page as it downloads: (airdrops, detail_urls, next page URL), or None
+        
+        Cards are parsed as each div.card closes; once `limit` are in, the connection is
+        closed with the rest of the page unread.
+        """
+        response = self._fetch_with_retries(url, 'Main page request', stream=True)
+        if response is None:
+            return None
         
+        host = urlsplit(url).netloc
+        parser = parsing.ListingStreamParser(limit)
+        pairs = []
+        # A page cut short still holds every card taken, and replay takes only those
+        chunks = [] if self.archive is not None else None
+        received = 0
+        started_at = time.perf_counter()
         try:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find all airdrop cards - they might be inside links
-            cards = soup.find_all('div', class_='card')[:limit]
-            
-            # Also try finding link elements that contain cards
-            if not cards:
-                link_cards = soup.find_all('a')[:limit]
-                cards = [link for link in link_cards if link.find('div', class_='card')]
-            
-            airdrops = []
-            for card in tqdm(cards, desc="Scraping airdrops", unit="card"):
-                airdrop = self.parse_card_simple(card)
-                if airdrop:
-                    # Try to get more detailed data from detail page
-                    detail_url = self.get_detail_url_from_card(card)
-                    if detail_url:
-                        detail_data = self.get_detail_data(detail_url)
-                        if detail_data:
-                            # Add detail page data
-                            for key, value in detail_data.items():
-                                airdrop[key] = value
-                    
-                    airdrops.append(airdrop)
-            
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+                received += len(chunk)
+                if chunks is not None:
+                    chunks.append(chunk)
+                page_pairs = parser.feed(chunk)
+                if page_pairs and not pairs:
+                    metrics.METRICS.observe('listing_first_card_seconds', time.perf_counter() - started_at, host=host)
+                pairs.extend(page_pairs)
+                if parser.done:
+                    break
+            else:
+                pairs.extend(parser.close())
+        finally:
+            # Unread body: urllib3 drops the connection instead of returning it to the pool
+            response.close()
+        
+        metrics.METRICS.inc('http_bytes_downloaded_total', received, host=host)
+        if parser.done:
+            metrics.METRICS.inc('listing_streams_closed_early_total', host=host)
+        airdrops, detail_urls = [fields for fields, _ in pairs], [detail_url for _, detail_url in pairs]
+        if chunks is not None:
+            self.archive.add(url, b''.join(chunks), kind='listing', status=response.status_code)
+            self._archive_cards(url, airdrops)
+        
+        for airdrop, detail_url in zip(airdrops, detail_urls):
+            if detail_url:
+                airdrop['detail_url'] = detail_url
+        return airdrops, detail_urls, parser.next_page_url(url)
+    
+    def scrape_basic_info(self, limit=10, concurrent=True):
+        """Scrape basic airdrop info from the main page with detail page enhancement"""
+        if self.stream_listings:
+            streamed = self.stream_listing_page(self.base_url, limit)
+            if streamed is None:
+                return []
+            airdrops, detail_urls, _ = streamed
+            return self.enrich_with_details(airdrops, detail_urls, concurrent=concurrent)
+        
+        response = self.fetch_listing_page(self.base_url)
+        if response is None:
+            return []
+        
+        try:
+            # Parse cards first (cheap), then enrich from detail pages
+            airdrops, detail_urls = self.parse_listing_page(response.content, limit)
+            self._archive_cards(self.base_url, airdrops)
+            self.enrich_with_details(airdrops, detail_urls, concurrent=concurrent)
             return airdrops
             
         except Exception as e:
             print(f"Error scraping: {e}")
             return []
     
+    def iter_airdrops(self, limit=None, max_pages=None, concurrent=True, category=None):
+        """Crawl every listing page, yielding enriched airdrops one at a time
+        
+        With `category` the crawl walks that category's listing and tags records
+        like list_categories does (canonical detail_url, bonus_categories=[slug]).
+        """
+        base_url = self.category_url(category) if category else self.base_url
+        seen = set()
+        for airdrops, detail_urls in self.iter_listing_cards(base_url, limit, max_pages):
+            if category:
+                airdrops, detail_urls = self._tag_category(category, airdrops, detail_urls, seen)
+            yield from self.iter_enriched(airdrops, detail_urls, concurrent=concurrent)
+    
+    def _tag_category(self, category, airdrops, detail_urls, seen):
+        """Canonicalize detail URLs, drop cards already seen on earlier pages, tag the category"""
+        kept_airdrops, kept_urls = [], []
+        for airdrop, url in zip(airdrops, detail_urls):
+            if url:
+                url = parsing.canonical_url(url)
+                if url in seen:
+                    continue
+                seen.add(url)
+                airdrop['detail_url'] = url
+            airdrop['bonus_categories'] = [parsing.category_slug(category)]
+            kept_airdrops.append(airdrop)
+            kept_urls.append(url)
+        return kept_airdrops, kept_urls
+    
+    def iter_listing_pages(self, max_pages=None, base_url=None):
+        """Yield listing page HTML, following rel=next links (or the page URL template)"""
+        for _, html in self._iter_listing_responses(max_pages, base_url):
+            yield html
+    
+    def _iter_listing_responses(self, max_pages=None, base_url=None):
+        """iter_listing_pages as (page URL, HTML) pairs"""
+        base_url = base_url or self.base_url
+        url = base_url
+        page = 1
+        seen = set()
+        while url and url not in seen and (max_pages is None or page <= max_pages):
+            seen.add(url)
+            response = self.fetch_listing_page(url)
+            if response is None:
+                return
+            
+            html = response.content
+            yield url, html
+            
+            page += 1
+            url = (parsing.find_next_page_url(html, url)
+                   or self.page_url_template.format(base_url=base_url, page=page))
+    
+    def category_url(self, category):
+        """Listing URL for a bonus category slug (full URLs are used as-is)"""
+        if category.startswith(('http://', 'https://')):
+            return category
+        return CATEGORY_URL_TEMPLATE.format(category=category)
+    
+    def collect_listing(self, base_url, limit=None, max_pages=None):
+        """Cards (and their detail URLs) from a category's listing pages, up to `limit`"""
+        airdrops, detail_urls = [], []
+        for page_airdrops, page_urls in self.iter_listing_cards(base_url, limit, max_pages):
+            airdrops.extend(page_airdrops)
+            detail_urls.extend(page_urls)
+        return airdrops, detail_urls
+    
+    def iter_listing_cards(self, base_url, limit=None, max_pages=None):
+        """(airdrops, detail_urls) for each listing page in turn, `limit` cards in total"""
+        if self.stream_listings:
+            yield from self._iter_listing_cards_streamed(base_url, limit, max_pages)
+            return
+        produced = 0
+        for url, html in self._iter_listing_responses(max_pages, base_url=base_url):
+            remaining = None if limit is None else limit - produced
+            page_airdrops, page_urls = self.parse_listing_page(html, remaining)
+            self._archive_cards(url, page_airdrops)
+            if not page_airdrops:
+                return  # Ran past the last page
+            yield page_airdrops, page_urls
+            produced += len(page_airdrops)
+            if limit is not None and produced >= limit:
+                return
+    
+    def _iter_listing_cards_streamed(self, base_url, limit=None, max_pages=None):
+        """iter_listing_cards over streamed pages: stops downloading as soon as `limit` cards are in"""
+        produced = 0
+        url = base_url
+        page = 1
+        seen = set()
+        while url and url not in seen and (max_pages is None or page <= max_pages):
+            seen.add(url)
+            remaining = None if limit is None else limit - produced
+            streamed = self.stream_listing_page(url, remaining)
+            if streamed is None or not streamed[0]:
+                return
+            page_airdrops, page_urls, next_url = streamed
+            yield page_airdrops, page_urls
+            produced += len(page_airdrops)
+            if limit is not None and produced >= limit:
+                return
+            page += 1
+            url = next_url or self.page_url_template.format(base_url=base_url, page=page)
+    
+    def crawl_categories(self, categories=None, limit_per_category=None, max_pages=None, concurrent=True):
+        """Crawl several categories; each detail page is fetched once and tagged with every category listing it"""
+        airdrops, detail_urls = self.list_categories(categories, limit_per_category, max_pages, concurrent)
+        self.enrich_with_details(airdrops, detail_urls, concurrent=concurrent)
+        return airdrops
+    
+    def list_categories(self, categories=None, limit_per_category=None, max_pages=None, concurrent=True):
+        """Unique cards across categories as (airdrops, detail_urls), detail URLs canonicalized"""
+        categories = list(categories or self.categories)
+        
+        # Listing pages per category, concurrently (map keeps category order for a stable merge)
+        def collect(category):
+            return self.collect_listing(self.category_url(category), limit_per_category, max_pages)
+        
+        if concurrent and len(categories) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(categories), self.max_workers)) as pool:
+                listings = list(pool.map(collect, categories))
+        else:
+            listings = [collect(category) for category in categories]
+        
+        airdrops, detail_urls = [], []
+        by_url = {}
+        for category, (category_airdrops, category_urls) in zip(categories, listings):
+            slug = parsing.category_slug(category)
+            for airdrop, url in zip(category_airdrops, category_urls):
+                if url:
+                    url = parsing.canonical_url(url)
+                    if url in by_url:
+                        if slug not in by_url[url]['bonus_categories']:
+                            by_url[url]['bonus_categories'].append(slug)
+                        continue
+                    airdrop['detail_url'] = url
+                    by_url[url] = airdrop
+                airdrop['bonus_categories'] = [slug]
+                airdrops.append(airdrop)
+                detail_urls.append(url)
+        
+        listed = sum(len(category_airdrops) for category_airdrops, _ in listings)
+        metrics.METRICS.inc('detail_urls_deduplicated_total', listed - len(airdrops))
+        print(f"🗂️  {listed} cards across {len(categories)} categories, {len(airdrops)} unique")
+        return airdrops, detail_urls
+    
+    def iter_enriched(self, airdrops, detail_urls, concurrent=True):
+        """Yield each airdrop merged with its detail data, in listing order"""
+        if not concurrent or self.max_workers <= 1:
+            try:
+                for airdrop, url in zip(airdrops, detail_urls):
+                    if url:
+                        airdrop.update(self.get_card_detail(airdrop, url))
+                    yield airdrop
+            finally:
+                if self.index is not None:
+                    self.index.save()
+            return
+        
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = [pool.submit(self.get_card_detail, airdrop, url) if url else None
+                       for airdrop, url in zip(airdrops, detail_urls)]
+            for airdrop, future in zip(airdrops, futures):
+                if future is not None:
+                    airdrop.update(future.result())
+                yield airdrop
+        finally:
+            # Consumer may stop early: drop detail fetches that have not started yet
+            pool.shutdown(wait=True, cancel_futures=True)
+            if self.index is not None:
+                self.index.save()
+    
+    def get_card_detail(self, airdrop, detail_url):
+        """Detail data for a card, reused from the card index when the card is unchanged"""
+        if self.index is None:
+            return self.get_detail_data(detail_url)
+        
+        fingerprint = card_index.card_fingerprint(airdrop)
+        detail_data = self.index.lookup(detail_url, fingerprint)
+        if detail_data is not None:
+            metrics.METRICS.inc('card_index_reused_total')
+            return detail_data
+        
+        detail_data = self.get_detail_data(detail_url)
+        if detail_data:
+            self.index.store(detail_url, fingerprint, detail_data)
+        return detail_data
+    
+    @metrics.METRICS.timed('stage_seconds', stage='listing_parse')
+    def parse_listing_page(self, html, limit=None):
+        """Parse listing HTML into (airdrops, detail_urls) using the configured backend"""
+        if self.parser_backend == 'lxml-raw':
+            pairs = parsing.parse_listing_lxml(html, limit)
+            airdrops, detail_urls = [fields for fields, _ in pairs], [url for _, url in pairs]
+            for airdrop, url in zip(airdrops, detail_urls):
+                if url:
+                    airdrop['detail_url'] = url
+            return airdrops, detail_urls
+        
+        soup = parsing.make_soup(html, self.parser_backend, page='listing')
+        
+        # Find all airdrop cards - they might be inside links
+        cards = soup.find_all('div', class_='card')[:limit]
+        
+        # Also try finding link elements that contain cards
+        if not cards:
+            link_cards = soup.find_all('a')[:limit]
+            cards = [link for link in link_cards if link.find('div', class_='card')]
+        
+        airdrops = []
+        detail_urls = []
+        for card in cards:
+            airdrop = self.parse_card_simple(card)
+            if airdrop:
+                detail_url = self.get_detail_url_from_card(card)
+                if detail_url:
+                    airdrop['detail_url'] = detail_url
+                airdrops.append(airdrop)
+                detail_urls.append(detail_url)
+        return airdrops, detail_urls
+    
+    def enrich_with_details(self, airdrops, detail_urls, concurrent=True):
+        """Merge detail page data into each airdrop, fetching pages concurrently if enabled"""
+        jobs = [(airdrop, url) for airdrop, url in zip(airdrops, detail_urls) if url]
+        
+        if not concurrent or self.max_workers <= 1:
+            for airdrop, url in tqdm(jobs, desc="Scraping airdrops", unit="card"):
+                airdrop.update(self.get_card_detail(airdrop, url))
+        else:
+            # Concurrency is bounded by the rate limiter, not by the pool size
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {pool.submit(self.get_card_detail, airdrop, url): airdrop for airdrop, url in jobs}
+                for future in tqdm(as_completed(futures), total=len(futures), desc="Scraping airdrops", unit="card"):
+                    futures[future].update(future.result())
+        
+        if self.index is not None:
+            self.index.save()
+        return airdrops
+    
     def parse_card_simple(self, card):
         """Parse a single card with just the essentials"""
         try:
@@ -134,161 +530,63 @@ class SimpleCointelegraphScraper:
     
     def get_detail_data(self, detail_url):
         """Scrape detail page to get comprehensive data"""
-        detail_data = {}
-        
-        # Retry with exponential backoff
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                response = self.session.get(detail_url)
-                response.raise_for_status()
-                break
-            except requests.RequestException as e:
-                wait_time = 2 ** attempt  # 1s, 2s, 4s
-                print(f"⚠️  Request failed (attempt {attempt + 1}/{max_retries}), waiting {wait_time}s...")
-                if attempt < max_retries - 1:
-                    time.sleep(wait_time)
-                else:
-                    print(f"❌ Failed to fetch {detail_url} after {max_retries} attempts")
-                    return detail_data
-        
+        html = self.fetch_detail_html(detail_url)
+        if html is None:
+            return {}
+        return self.parse_detail_page(html)
+    
+    def fetch_detail_html(self, detail_url):
+        """Raw detail page bytes (with retries), or None if the page could not be fetched"""
+        response = self._fetch_with_retries(detail_url)
+        self._archive_response(detail_url, response, 'detail')
+        return None if response is None else response.content
+    
+    @metrics.METRICS.timed('stage_seconds', stage='detail_parse')
+    def parse_detail_page(self, html, now=None):
+        """Extract detail fields from a detail page's HTML using the configured backend (time_left as of `now`)"""
         try:
-            
-            # Add minimal delay and parse the page
-            time.sleep(2)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Calculate timer from data-timer attribute (more reliable than JS)
-            timer_container = soup.find(class_='single-card-container')
-            if timer_container and timer_container.get('data-timer'):
-                timestamp = timer_container.get('data-timer')
-                try:
-                    end_time = int(timestamp)
-                    current_time = int(time.time())
-                    seconds_remaining = end_time - current_time
-                    
-                    if seconds_remaining > 0:
-                        days = int(seconds_remaining // 86400)
-                        hours = int((seconds_remaining % 86400) // 3600) 
-                        minutes = int((seconds_remaining % 3600) // 60)
-                        
-                        detail_data['time_left'] = {
-                            'days': str(days),
-                            'hours': str(hours), 
-                            'minutes': str(minutes)
-                        }
-                    else:
-                        detail_data['time_left'] = {
-                            'days': '0',
-                            'hours': '0',
-                            'minutes': '0'
-                        }
-                except Exception as e:
-                    print(f"Error calculating from timestamp: {e}")
-            
-            # Project links from social-container
-            project_links = []
-            social_container = soup.find(class_='social-container')
-            if social_container:
-                links = social_container.find_all('a')
-                for link in links:
-                    href = link.get('href')
-                    if href:
-                        project_links.append(href)
-            if project_links:
-                detail_data['project_links'] = project_links
-            
-            # Time to complete and risk level
-            task_desc_blocks = soup.find_all(class_='task-description-block')
-            for block in task_desc_blocks:
-                text = block.get_text()
-                
-                # Extract time to complete
-                if 'Time to complete:' in text:
-                    try:
-                        lines = text.split('\n')
-                        for line in lines:
-                            if 'Time to complete:' in line:
-                                time_part = line.split('Time to complete:')[1].strip()
-                                detail_data['time_to_complete'] = time_part
-                                break
-                    except:
-                        pass
-                
-                # Extract risk level
-                if 'Risk level:' in text:
-                    try:
-                        lines = text.split('\n')
-                        for line in lines:
-                            if 'Risk level:' in line:
-                                risk_part = line.split('Risk level:')[1].strip()
-                                detail_data['risk_level'] = risk_part
-                                break
-                    except:
-                        pass
-            
-            # Count steps
-            step_elements = soup.find_all(class_='step')
-            if step_elements:
-                detail_data['step_count'] = len(step_elements)
-            
-            # Extract CTA link from timer button
-            timer_btn = soup.find(class_='timer-btn')
-            if timer_btn:
-                cta_link = timer_btn.find('a')
-                if cta_link and cta_link.get('href'):
-                    detail_data['cta_link'] = cta_link.get('href')
-                    # Also get the CTA text
-                    cta_span = cta_link.find('span')
-                    if cta_span:
-                        detail_data['cta_text'] = cta_span.get_text(strip=True)
-            
-            # Fallback to timestamp if timer not available
-            if 'time_left' not in detail_data:
-                timestamp_elem = soup.select_one('[data-timestamp]')
-                if timestamp_elem:
-                    timestamp = timestamp_elem.get('data-timestamp')
-                    if timestamp:
-                        try:
-                            end_time = int(timestamp)
-                            current_time = int(time.time())
-                            seconds_remaining = end_time - current_time
-                            days = max(0, int(seconds_remaining / 86400))
-                            detail_data['time_left'] = {
-                                'days': str(days),
-                                'hours': '0',
-                                'minutes': '0'
-                            }
-                        except:
-                            detail_data['time_left'] = {
-                                'days': '0',
-                                'hours': '0',
-                                'minutes': '0'
-                            }
-                        
+            return parsing.parse_detail_html(html, self.parser_backend, now=now)
         except Exception as e:
             print(f"Error getting detail data: {e}")
-        
-        # Add small delay between requests
-        time.sleep(1)
-        return detail_data
+            return {}
     
     def save_data(self, data, filename='data/sample_output.json'):
-        """Save data to JSON file"""
+        """Save data to JSON file (or stream it as NDJSON for .ndjson/.jsonl[.gz|.zst] names)"""
+        if exporters.is_ndjson_path(filename):
+            with exporters.NDJSONWriter(filename, compression=exporters.compression_for(filename),
+                                        overwrite=True) as writer:
+                count = writer.write_many(data)
+            print(f"Saved {count} airdrops to {filename}")
+            return
+        
         with open(filename, 'w') as f:
             json.dump(data, f, indent=2)
         print(f"Saved {len(data)} airdrops to {filename}")
 
 if __name__ == "__main__":
-    scraper = SimpleCointelegraphScraper()
-    airdrops = scraper.scrape_basic_info(limit=5)
+    scraper = SimpleCointelegraphScraper(
+        cache=http_cache.ResponseCache(),
+        index=card_index.CardIndex(max_age=24 * 60 * 60),
+        archive=archive.HtmlArchive(),
+        # e.g. SCRAPER_CATEGORIES=airdrop,defi
+        categories=os.environ.get('SCRAPER_CATEGORIES', 'airdrop').split(','),
+    )
+    # Set SCRAPER_PROFILE=crawl.prof to capture a cProfile of the crawl
+    with metrics.profile(os.environ.get('SCRAPER_PROFILE')):
+        if os.environ.get('SCRAPER_PIPELINE'):
+            # SCRAPER_PIPELINE=1: fetch threads feed a process pool that parses detail pages
+            airdrops, detail_urls = scraper.list_categories(limit_per_category=5)
+            airdrops = list(pipeline.DetailPipeline(scraper).iter_enriched(airdrops, detail_urls))
+        else:
+            airdrops = scraper.crawl_categories(limit_per_category=5)
     
     # Transform data first
     transformed_airdrops = transformers.transform_airdrop_data(airdrops)
     
-    # Validate transformed data and filter valid ones
-    valid_airdrops = validators.filter_valid_airdrops(transformed_airdrops)
-    validation_summary = validators.get_validation_summary(transformed_airdrops)
+    # Validate transformed data and filter valid ones (single validation pass)
+    validation = validators.validate_and_partition(transformed_airdrops)
+    valid_airdrops = validation['valid']
+    validation_summary = validators.format_validation_summary(validation['summary'])
     print(f"✅ {validation_summary}")
     
     # Add simple business calculations  
@@ -299,25 +597,10 @@ if __name__ == "__main__":
         if 'CHECK_10TH_TIME' in airdrop:
             del airdrop['CHECK_10TH_TIME']
     
-    for airdrop in valid_airdrops:
-        # Priority score (urgent = higher priority)
-        if 'time_left' in airdrop:
-            days = int(airdrop['time_left'].get('days', 0))
-            if days <= 1:
-                airdrop['priority'] = 'HIGH'
-            elif days <= 7:
-                airdrop['priority'] = 'MEDIUM' 
-            else:
-                airdrop['priority'] = 'LOW'
-        
-        # Effort vs reward estimate
-        steps = airdrop.get('step_count', 0)
-        if steps <= 3:
-            airdrop['effort'] = 'Easy'
-        elif steps <= 6:
-            airdrop['effort'] = 'Medium'
-        else:
-            airdrop['effort'] = 'Hard'
+    # Priority, effort and urgency-vs-reward from the absolute end time
+    scoring.score_airdrops(valid_airdrops)
+    urgency_index = scoring.UrgencyIndex()
+    urgency_index.add_many(valid_airdrops)
     
     print(f"\nScraped {len(valid_airdrops)} airdrops:")
     print("=" * 50)
@@ -353,5 +636,27 @@ if __name__ == "__main__":
         if 'effort' in airdrop:
             print(f"   💪 Effort: {airdrop['effort']}")
     
+    top = urgency_index.top_k(3)
+    if top:
+        print("\n🏁 Most urgent: " + ", ".join(f"{a['project_name']} ({a['urgency_score']})" for a in top))
+    print(f"⌛ Ending within 24h: {len(urgency_index.expiring_within(hours=24))}")
+    
+    # Deltas vs the previous snapshot, for consumers that should not reload the whole file
+    changes = list(diff.diff_snapshots(diff.load_snapshot('data/sample_output.json'), valid_airdrops))
+    diff.append_feed(changes, 'data/changes.ndjson')
+    print(f"🔁 Changes since last run: {diff.format_summary(diff.summarize(changes))}")
+    
     print(f"\n📁 Saved data to: data/sample_output.json")
-    scraper.save_data(valid_airdrops)
\ No newline at end of file
+    scraper.save_data(valid_airdrops)
+    
+    with storage.AirdropStore() as store:
+        store.upsert_many(valid_airdrops)
+        print(f"🗄️  Upserted {len(valid_airdrops)} airdrops into {store.path} ({store.count()} total)")
+    
+    # Every run's records, partitioned by scrape date, for queries over history
+    history = columnar.ColumnarArchive()
+    print(f"🗃️  Archived this run into {len(history.write(valid_airdrops))} history part(s) under {history.path}")
+    
+    scraper.archive.close()
+    metrics.METRICS.write('data/metrics.json', 'data/metrics.prom')
+    print(f"📊 Metrics: {metrics.METRICS.to_dict()['time_breakdown_seconds']} (data/metrics.json, data/metrics.prom)")
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+SQLite storage backend for scraped airdrops.
+
+Records from the pipeline are upserted (batched, one transaction per batch)
+into an `airdrops` table keyed by detail URL. The columns we filter on —
+project_name, end_timestamp, priority, risk_level — are indexed, and the
+full record is kept as JSON so nothing is lost.
+
+Example:
+    store = AirdropStore()
+    store.upsert_many(valid_airdrops)
+    urgent = store.query(priority='HIGH', ends_before=time.time() + 7 * 86400)
+"""
+
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS airdrops (
+    key TEXT PRIMARY KEY,
+    project_name TEXT NOT NULL,
+    task_name TEXT,
+    reward TEXT,
+    end_timestamp INTEGER,
+    priority TEXT,
+    effort TEXT,
+    risk_level TEXT,
+    step_count INTEGER,
+    scraped_at TEXT,
+    updated_at REAL NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_airdrops_project ON airdrops (project_name);
+CREATE INDEX IF NOT EXISTS idx_airdrops_end ON airdrops (end_timestamp);
+CREATE INDEX IF NOT EXISTS idx_airdrops_priority_end ON airdrops (priority, end_timestamp);
+CREATE INDEX IF NOT EXISTS idx_airdrops_risk ON airdrops (risk_level);
+"""
+
+UPSERT = """
+INSERT INTO airdrops (key, project_name, task_name, reward, end_timestamp, priority, effort,
+                      risk_level, step_count, scraped_at, updated_at, record)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    project_name = excluded.project_name,
+    task_name = excluded.task_name,
+    reward = excluded.reward,
+    end_timestamp = excluded.end_timestamp,
+    priority = excluded.priority,
+    effort = excluded.effort,
+    risk_level = excluded.risk_level,
+    step_count = excluded.step_count,
+    scraped_at = excluded.scraped_at,
+    updated_at = excluded.updated_at,
+    record = excluded.record
+"""
+
+ORDERABLE_COLUMNS = ('end_timestamp', 'project_name', 'priority', 'risk_level', 'scraped_at', 'updated_at')
+
+
+def record_key(airdrop: Dict[str, Any]) -> str:
+    """Detail URL when we have one, otherwise project + task."""
+    return airdrop.get('detail_url') or f"{airdrop.get('project_name', '')}|{airdrop.get('task_name', '')}"
+
+
+def end_timestamp_of(airdrop: Dict[str, Any]) -> Optional[int]:
+    """Absolute end time; older records only have scraped_at + relative time_left."""
+    if airdrop.get('end_timestamp') is not None:
+        return int(airdrop['end_timestamp'])
+    time_left = airdrop.get('time_left')
+    scraped_at = airdrop.get('scraped_at')
+    if not time_left or not scraped_at:
+        return None
+    try:
+        start = datetime.fromisoformat(scraped_at).timestamp()
+        seconds = (int(time_left.get('days', 0)) * 86400
+                   + int(time_left.get('hours', 0)) * 3600
+                   + int(time_left.get('minutes', 0)) * 60)
+    except (TypeError, ValueError):
+        return None
+    return int(start + seconds)
+
+
+class AirdropStore:
+    """Indexed SQLite store with a small query API."""
+
+    def __init__(self, path: str = 'data/airdrops.sqlite'):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    # ---------- Writes ----------
+
+    def upsert_many(self, airdrops: Iterable[Dict[str, Any]], batch_size: int = 500) -> int:
+        """Insert or update records, committing once per batch. Returns the number written."""
+        written = 0
+        batch = []
+        for airdrop in airdrops:
+            batch.append(self._row(airdrop))
+            if len(batch) >= batch_size:
+                written += self._write_batch(batch)
+                batch = []
+        if batch:
+            written += self._write_batch(batch)
+        return written
+
+    def upsert(self, airdrop: Dict[str, Any]) -> None:
+        self.upsert_many([airdrop])
+
+    def _write_batch(self, rows) -> int:
+        with self.conn:
+            self.conn.executemany(UPSERT, rows)
+        return len(rows)
+
+    @staticmethod
+    def _row(airdrop: Dict[str, Any]):
+        return (
+            record_key(airdrop),
+            airdrop.get('project_name', ''),
+            airdrop.get('task_name'),
+            airdrop.get('reward'),
+            end_timestamp_of(airdrop),
+            airdrop.get('priority'),
+            airdrop.get('effort'),
+            airdrop.get('risk_level'),
+            airdrop.get('step_count'),
+            airdrop.get('scraped_at'),
+            time.time(),
+            json.dumps(airdrop, ensure_ascii=False),
+        )
+
+    # ---------- Queries ----------
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT record FROM airdrops WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def query(self, project_name: Optional[str] = None, priority: Optional[str] = None,
+              risk_level: Optional[str] = None, ends_after: Optional[float] = None,
+              ends_before: Optional[float] = None, order_by: str = 'end_timestamp',
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Records matching every given filter (all optional), via the column indexes."""
+        if order_by not in ORDERABLE_COLUMNS:
+            raise ValueError(f"Cannot order by {order_by!r}")
+
+        clauses = []
+        params: List[Any] = []
+        for column, value in (('project_name', project_name), ('priority', priority), ('risk_level', risk_level)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if ends_after is not None:
+            clauses.append("end_timestamp >= ?")
+            params.append(int(ends_after))
+        if ends_before is not None:
+            clauses.append("end_timestamp <= ?")
+            params.append(int(ends_before))
+
+        sql = "SELECT record FROM airdrops"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [json.loads(row[0]) for row in self.conn.execute(sql, params)]
+
+    def expiring_within(self, seconds: float, priority: Optional[str] = None,
+                        now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Still-open airdrops ending in the next `seconds`, soonest first."""
+        now = time.time() if now is None else now
+        return self.query(priority=priority, ends_after=now, ends_before=now + seconds)
+
+    def by_project(self, project_name: str) -> List[Dict[str, Any]]:
+        return self.query(project_name=project_name)
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM airdrops").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -4,47 +4,70 @@ Simple data transformers for cleaning scraped airdrop data.
 
 import re
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Sequence
 
+from memo import memoized
+from metrics import METRICS
 
+
+# Precompiled once; shared by the per-record and batch paths
+WHITESPACE_RE = re.compile(r'\s+')
+PREFIX_RE = re.compile(r'^(Get|Earn|Claim|Join)\s+', re.IGNORECASE)
+TOKEN_SYMBOL_RE = re.compile(r'\$([A-Z]{2,10})')
+AMOUNT_RE = re.compile(r'(\d+(?:,\d{3})*(?:\.\d+)?)')
+DAYS_RE = re.compile(r'(\d+)\s*days?', re.IGNORECASE)
+HOURS_RE = re.compile(r'(\d+)\s*hours?', re.IGNORECASE)
+MINUTES_RE = re.compile(r'(\d+)\s*minutes?', re.IGNORECASE)
+
+# transform_batch switches to the columnar path at this many records
+BATCH_THRESHOLD = 1000
+
+# The normalizers below are pure, and the same names/tasks/rewards recur across
+# snapshots, so each is memoized in a bounded LRU cache (see memo.py).
+
+
+@memoized()
 def clean_text(text: str) -> str:
     """Clean text by removing extra spaces and common prefixes."""
     if not text:
         return ""
     
     # Remove extra whitespace
-    cleaned = re.sub(r'\s+', ' ', text.strip())
+    cleaned = WHITESPACE_RE.sub(' ', text.strip())
     
     # Remove common prefixes like "Get", "Earn", etc.
-    cleaned = re.sub(r'^(Get|Earn|Claim|Join)\s+', '', cleaned, flags=re.IGNORECASE)
+    cleaned = PREFIX_RE.sub('', cleaned)
     
     return cleaned
 
 
+@memoized()
 def clean_project_name(name: str) -> str:
     """Clean project names."""
     if not name:
         return "unknown_project"
     
-    return re.sub(r'\s+', ' ', name.strip())
+    return WHITESPACE_RE.sub(' ', name.strip())
 
 
+@memoized()
 def extract_token_symbol(reward_text: str) -> str:
     """Extract token symbol like $AITV from reward text."""
     if not reward_text:
         return ""
     
-    match = re.search(r'\$([A-Z]{2,10})', reward_text)
+    match = TOKEN_SYMBOL_RE.search(reward_text)
     return match.group(1) if match else ""
 
 
+@memoized()
 def extract_reward_amount(reward_text: str):
     """Extract USD amount from reward text. Returns None if not found."""
     if not reward_text:
         return None
     
     # Look for patterns like "120 USDT", "$1M", etc.
-    match = re.search(r'(\d+(?:,\d{3})*(?:\.\d+)?)', reward_text.replace('$', ''))
+    match = AMOUNT_RE.search(reward_text.replace('$', ''))
     
     if not match:
         return None
@@ -93,23 +116,24 @@ def parse_days_remaining(time_display: str) -> int:
         return 0
     
     # Look for patterns like "5 Days", "10 days", etc.
-    day_match = re.search(r'(\d+)\s*days?', time_display, re.IGNORECASE)
+    day_match = DAYS_RE.search(time_display)
     if day_match:
         return int(day_match.group(1))
     
     # If only hours are shown, assume 0 days
-    hour_match = re.search(r'(\d+)\s*hours?', time_display, re.IGNORECASE)
+    hour_match = HOURS_RE.search(time_display)
     if hour_match:
         return 0
     
     # If only minutes are shown, assume 0 days  
-    minute_match = re.search(r'(\d+)\s*minutes?', time_display, re.IGNORECASE)
+    minute_match = MINUTES_RE.search(time_display)
     if minute_match:
         return 0
     
     return 0
 
 
+@memoized()
 def get_action_type(task_description: str, task_name: str) -> str:
     """Determine what action is required for the airdrop."""
     text = (task_description + ' ' + task_name).lower()
@@ -132,6 +156,58 @@ def get_action_type(task_description: str, task_name: str) -> str:
         return 'other'
 
 
+# Columnar batch API: each distinct string is processed once and the results
+# are scattered back with a NumPy gather, so archives full of repeated values
+# cost O(unique values) regex work instead of O(records).
+
+def _factorize(texts: Sequence[Optional[str]]):
+    """Return (unique values, NumPy index of each input into them)."""
+    import numpy as np
+
+    positions: Dict[Optional[str], int] = {}
+    codes = np.fromiter(
+        (positions.setdefault(text, len(positions)) for text in texts),
+        dtype=np.int64, count=len(texts),
+    )
+    return list(positions), codes
+
+
+def _map_unique(func: Callable, texts: Sequence[Optional[str]], dtype):
+    import numpy as np
+
+    uniques, codes = _factorize(texts)
+    values = np.array([func(text) for text in uniques], dtype=dtype)
+    return values[codes] if len(codes) else values
+
+
+def extract_reward_amounts(reward_texts: Sequence[Optional[str]]):
+    """Batch extract_reward_amount: float64 array, NaN where no amount was found."""
+    def amount_or_nan(text):
+        amount = extract_reward_amount(text)
+        return float('nan') if amount is None else amount
+    return _map_unique(amount_or_nan, reward_texts, 'float64')
+
+
+def extract_token_symbols(reward_texts: Sequence[Optional[str]]):
+    """Batch extract_token_symbol: unicode array, '' where no symbol was found."""
+    return _map_unique(extract_token_symbol, reward_texts, 'U10')
+
+
+def parse_days_remaining_batch(time_displays: Sequence[Optional[str]]):
+    """Batch parse_days_remaining: int64 array of day counts."""
+    return _map_unique(parse_days_remaining, time_displays, 'int64')
+
+
+def clean_text_batch(texts: Sequence[Optional[str]]) -> List[str]:
+    """Batch clean_text, returned as a plain list for record building."""
+    return _map_unique(clean_text, texts, object).tolist()
+
+
+def clean_project_name_batch(names: Sequence[Optional[str]]) -> List[str]:
+    """Batch clean_project_name, returned as a plain list for record building."""
+    return _map_unique(clean_project_name, names, object).tolist()
+
+
 class AirdropDataTransformer:
     """Simple transformer for airdrop data."""
     
@@ -146,6 +222,10 @@ class AirdropDataTransformer:
         if 'task_name' in transformed:
             transformed['task_name'] = clean_text(transformed['task_name'])
         
+        return self._finalize(transformed)
+    
+    def _finalize(self, transformed: Dict[str, Any]) -> Dict[str, Any]:
+        """Steps shared by the per-record and columnar paths."""
         # TRIPLE CHECK: Add a unique field that proves we're using our transformer
         transformed['TRIPLE_CHECK_TRANSFORMER'] = 'LOCAL_FILE_USED'
         transformed['CHECK_10TH_TIME'] = 'YES_LOCAL_TRANSFORMERS_PY'
@@ -156,12 +236,34 @@ class AirdropDataTransformer:
         
         return transformed
     
+    @METRICS.timed('stage_seconds', stage='transform')
     def transform_batch(self, raw_data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Transform multiple airdrop records."""
-        return [self.transform_airdrop(item) for item in raw_data_list]
+        """Transform multiple airdrop records (columnar path for large batches)."""
+        if len(raw_data_list) < BATCH_THRESHOLD:
+            return [self.transform_airdrop(item) for item in raw_data_list]
+        
+        project_names = clean_project_name_batch([item.get('project_name') for item in raw_data_list])
+        task_names = clean_text_batch([item.get('task_name') for item in raw_data_list])
+        
+        results = []
+        for item, project_name, task_name in zip(raw_data_list, project_names, task_names):
+            transformed = item.copy()
+            if 'project_name' in transformed:
+                transformed['project_name'] = project_name
+            if 'task_name' in transformed:
+                transformed['task_name'] = task_name
+            results.append(self._finalize(transformed))
+        return results
 
 
 def transform_airdrop_data(raw_data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Simple function to transform a list of raw airdrop data."""
     transformer = AirdropDataTransformer()
-    return transformer.transform_batch(raw_data_list)
\ No newline at end of file
+    return transformer.transform_batch(raw_data_list)
+
+
+def iter_transform_airdrop_data(raw_records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Streaming version of transform_airdrop_data: transforms records one at a time."""
+    transformer = AirdropDataTransformer()
+    for item in raw_records:
+        yield transformer.transform_airdrop(item)
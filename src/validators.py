@@ -5,9 +5,14 @@ This module validates transformed airdrop records and produces:
 - Per-record validity (errors/warnings)
 - A numeric quality score (0–100)
 - Batch-level summary helpers
+- A constant-memory streaming QualityReport for auditing large archives
 """
 
-from typing import Dict, List, Any
+import math
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Any, Optional
+
+from metrics import METRICS
 
 
 # ---------- Primitive field checks ----------
@@ -38,65 +43,107 @@ def has_required_fields(airdrop: Dict[str, Any]) -> bool:
 
 # ---------- Record-level validation ----------
 
-def validate_airdrop(airdrop: Dict[str, Any]) -> Dict[str, Any]:
+def field_checks(airdrop: Dict[str, Any]) -> Dict[str, bool]:
     """
-    Validate a single airdrop record and return a dict with:
-      - valid: bool
-      - errors: List[str]
-      - warnings: List[str]
-      - score: int (0–100)
+    Evaluate every field rule exactly once. Both the error/warning rules and
+    the quality score read from this dict, so nothing is checked twice.
     """
+    reward_amount = airdrop.get('reward_amount')
+    categories = airdrop.get('categories', [])
+    step_count = airdrop.get('step_count')
+    return {
+        'has_required_fields': has_required_fields(airdrop),
+        'valid_project_name': is_valid_project_name(airdrop.get('project_name', '')),
+        'valid_image_url': is_valid_url(airdrop.get('image_url', '')),
+        'has_reward_amount': reward_amount is not None,
+        'positive_reward_amount': is_valid_reward_amount(reward_amount),
+        'has_reward_token': bool(airdrop.get('reward_token')),
+        'specific_categories': bool(categories) and categories != ['general'],
+        'multiple_categories': len(categories) > 1,
+        'vague_action': airdrop.get('action_required', '') == 'other',
+        'known_action': airdrop.get('action_required') != 'other',
+        'has_time_to_complete': bool(airdrop.get('time_to_complete')),
+        'has_project_links': bool(airdrop.get('project_links')),
+        'has_steps': bool(step_count) and step_count > 0,
+        'has_project_description': bool(airdrop.get('project_description')),
+    }
+
+
+def _issues_from_checks(checks: Dict[str, bool]):
     errors: List[str] = []
     warnings: List[str] = []
 
     # 1) Required fields
-    if not has_required_fields(airdrop):
+    if not checks['has_required_fields']:
         errors.append("Missing required fields: project_name or task_name")
 
     # 2) Project name sanity
-    if not is_valid_project_name(airdrop.get('project_name', '')):
+    if not checks['valid_project_name']:
         warnings.append("Invalid or missing project name")
 
     # 3) Image URL is optional; warn if missing/invalid
-    if not is_valid_url(airdrop.get('image_url', '')):
+    if not checks['valid_image_url']:
         warnings.append("Invalid or missing image URL")
 
     # 4) Reward amount is optional; if present, must be positive
-    reward_amount = airdrop.get('reward_amount')
-    if reward_amount is not None and not is_valid_reward_amount(reward_amount):
+    if checks['has_reward_amount'] and not checks['positive_reward_amount']:
         warnings.append("Invalid reward amount")
 
     # 5) Categories (optional); encourage having more specific categories
-    categories = airdrop.get('categories', [])
-    if not categories or categories == ['general']:
+    if not checks['specific_categories']:
         warnings.append("No specific categories found")
 
     # 6) Action type (optional); 'other' is too vague
-    action = airdrop.get('action_required', '')
-    if action == 'other':
+    if checks['vague_action']:
         warnings.append("Could not determine required action")
 
     # (Optional) You can warn if step_count is missing.
     # This is purely informational and not an error.
-    # if not airdrop.get('step_count'):
+    # if not checks['has_steps']:
     #     warnings.append("No step_count info found")
 
+    return errors, warnings
+
+
+def validate_airdrop(airdrop: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate a single airdrop record and return a dict with:
+      - valid: bool
+      - errors: List[str]
+      - warnings: List[str]
+      - score: int (0–100)
+    """
+    checks = field_checks(airdrop)
+    errors, warnings = _issues_from_checks(checks)
+
     return {
         'valid': len(errors) == 0,
         'errors': errors,
         'warnings': warnings,
-        'score': calculate_quality_score(airdrop, errors, warnings),
+        'score': _score_from_checks(checks, errors, warnings),
     }
 
 
 # ---------- Scoring ----------
 
-def calculate_quality_score(airdrop: Dict[str, Any], errors: List[str], warnings: List[str]) -> int:
-    """
-    Compute a simple quality score based on:
-      - Penalties for errors/warnings
-      - Bonuses for helpful fields
-    """
+# Bonus points per satisfied check
+SCORE_BONUSES = (
+    ('valid_project_name', 5),
+    ('valid_image_url', 5),
+    ('has_reward_token', 10),
+    ('positive_reward_amount', 10),
+    ('multiple_categories', 5),
+    ('known_action', 5),
+    # Bonus points for richer detail
+    ('has_time_to_complete', 5),
+    ('has_project_links', 5),
+    # IMPORTANT: use 'step_count' (matches scraper output), not 'steps'
+    ('has_steps', 10),
+    ('has_project_description', 5),
+)
+
+
+def _score_from_checks(checks: Dict[str, bool], errors: List[str], warnings: List[str]) -> int:
     score = 100
 
     # Penalties
@@ -104,44 +151,26 @@ def calculate_quality_score(airdrop: Dict[str, Any], errors: List[str], warnings
     score -= len(warnings) * 10
 
     # Bonuses for good signals
-    if is_valid_project_name(airdrop.get('project_name', '')):
-        score += 5
-
-    if is_valid_url(airdrop.get('image_url', '')):
-        score += 5
-
-    if airdrop.get('reward_token'):
-        score += 10
-
-    if airdrop.get('reward_amount') is not None and airdrop.get('reward_amount') > 0:
-        score += 10
-
-    if len(airdrop.get('categories', [])) > 1:
-        score += 5
-
-    if airdrop.get('action_required') != 'other':
-        score += 5
-
-    # Bonus points for richer detail
-    if airdrop.get('time_to_complete'):
-        score += 5
-
-    if airdrop.get('project_links') and len(airdrop.get('project_links', [])) > 0:
-        score += 5
-
-    # IMPORTANT: use 'step_count' (matches scraper output), not 'steps'
-    if airdrop.get('step_count') and airdrop.get('step_count', 0) > 0:
-        score += 10
-
-    if airdrop.get('project_description'):
-        score += 5
+    for check, bonus in SCORE_BONUSES:
+        if checks[check]:
+            score += bonus
 
     # Final clamp
     return max(0, min(100, score))
 
 
+def calculate_quality_score(airdrop: Dict[str, Any], errors: List[str], warnings: List[str]) -> int:
+    """
+    Compute a simple quality score based on:
+      - Penalties for errors/warnings
+      - Bonuses for helpful fields
+    """
+    return _score_from_checks(field_checks(airdrop), errors, warnings)
+
+
 # ---------- Batch helpers ----------
 
+@METRICS.timed('stage_seconds', stage='validate')
 def validate_batch(airdrop_list: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Validate a list of airdrops and return aggregate statistics + per-record results.
@@ -186,10 +215,20 @@ def filter_valid_airdrops(airdrop_list: List[Dict[str, Any]]) -> List[Dict[str,
     return valid_airdrops
 
 
+def iter_valid_airdrops(airdrops: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Streaming version of filter_valid_airdrops: yields valid records as they arrive."""
+    for airdrop in airdrops:
+        if validate_airdrop(airdrop)['valid']:
+            yield airdrop
+
+
 def get_validation_summary(airdrop_list: List[Dict[str, Any]]) -> str:
     """Return a short human-readable summary for console logs."""
-    batch = validate_batch(airdrop_list)
+    return format_validation_summary(validate_batch(airdrop_list))
 
+
+def format_validation_summary(batch: Dict[str, Any]) -> str:
+    """Render the counters of validate_batch / validate_and_partition for console logs."""
     return f"""
 Validation Summary:
 - Total records: {batch['total_records']}
@@ -199,3 +238,267 @@ Validation Summary:
 - Total warnings: {batch['total_warnings']}
 - Overall quality score: {batch['overall_quality_score']:.1f}/100
 """.strip()
+
+
+# ---------- Single-pass engine ----------
+
+def _empty_partition() -> Dict[str, Any]:
+    return {
+        'valid': [],
+        'invalid': [],
+        'scores': [],
+        'summary': {
+            'total_records': 0,
+            'valid_records': 0,
+            'invalid_records': 0,
+            'total_errors': 0,
+            'total_warnings': 0,
+            'overall_quality_score': 0,
+        },
+    }
+
+
+def _partition_chunk(airdrop_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One sweep over the records: every rule is evaluated once per record."""
+    partition = _empty_partition()
+    summary = partition['summary']
+    score_total = 0
+
+    for airdrop in airdrop_list:
+        validation = validate_airdrop(airdrop)
+        partition['scores'].append(validation['score'])
+        score_total += validation['score']
+
+        if validation['valid']:
+            partition['valid'].append(airdrop)
+        else:
+            partition['invalid'].append({
+                'record': airdrop,
+                'errors': validation['errors'],
+                'warnings': validation['warnings'],
+            })
+
+        summary['total_errors'] += len(validation['errors'])
+        summary['total_warnings'] += len(validation['warnings'])
+
+    summary['total_records'] = len(airdrop_list)
+    summary['valid_records'] = len(partition['valid'])
+    summary['invalid_records'] = len(partition['invalid'])
+    summary['overall_quality_score'] = score_total / len(airdrop_list) if airdrop_list else 0
+    return partition
+
+
+def _merge_partitions(parts: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    merged = _empty_partition()
+    summary = merged['summary']
+    for part in parts:
+        merged['valid'].extend(part['valid'])
+        merged['invalid'].extend(part['invalid'])
+        merged['scores'].extend(part['scores'])
+        for key in ('total_records', 'valid_records', 'invalid_records', 'total_errors', 'total_warnings'):
+            summary[key] += part['summary'][key]
+    scores = merged['scores']
+    summary['overall_quality_score'] = sum(scores) / len(scores) if scores else 0
+    return merged
+
+
+@METRICS.timed('stage_seconds', stage='validate')
+def validate_and_partition(airdrop_list: List[Dict[str, Any]], processes: Optional[int] = None,
+                           chunksize: int = 10000) -> Dict[str, Any]:
+    """
+    Validate every record once and return, from that single pass:
+      - valid: records with no errors (input order)
+      - invalid: [{'record', 'errors', 'warnings'}] for records with errors
+      - scores: per-record quality scores (input order)
+      - summary: the same counters as validate_batch (minus per-record results)
+
+    processes > 1 opts into a process pool (chunks of `chunksize` records),
+    worthwhile only for very large archives where pickling cost is amortized.
+    """
+    if not processes or processes <= 1 or len(airdrop_list) <= chunksize:
+        return _partition_chunk(airdrop_list)
+
+    # Imported here: multiprocessing costs ~10ms of startup that single-process runs never need
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunks = [airdrop_list[i:i + chunksize] for i in range(0, len(airdrop_list), chunksize)]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return _merge_partitions(pool.map(_partition_chunk, chunks))
+
+
+# ---------- Streaming quality report ----------
+
+# Fields whose fill rate the report tracks (present and non-empty)
+FILL_FIELDS = (
+    'reward', 'reward_amount', 'detail_url', 'end_timestamp', 'bonus_categories',
+    'step_count', 'project_links', 'time_to_complete', 'risk_level', 'image_url', 'project_description',
+)
+
+REPORT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# A fill-rate field counts as filled unless it is missing or one of these
+_EMPTY = (None, '', [], {})
+
+_SCORE_BINS = 101  # Scores are integers 0-100: one bin each makes the quantiles exact
+
+
+class QualityReport:
+    """
+    Online data-quality statistics in constant memory: nothing per record is
+    kept, so it can audit an archive of any size from an iterator.
+
+        report = QualityReport()
+        report.update(exporters.iter_ndjson('data/export.ndjson.gz'))
+        print(report.format())
+
+    Reports built on separate shards combine with merge() (see quality_report
+    for the process-pool version) and round-trip through to_dict/from_dict.
+    """
+
+    def __init__(self, fill_fields: Iterable[str] = FILL_FIELDS):
+        self.fill_fields = tuple(fill_fields)
+        self.total_records = 0
+        self.valid_records = 0
+        self.score_sum = 0
+        self.score_histogram = [0] * _SCORE_BINS
+        self.errors: Counter = Counter()
+        self.warnings: Counter = Counter()
+        self.filled: Counter = Counter(dict.fromkeys(self.fill_fields, 0))
+
+    def add(self, airdrop: Dict[str, Any]) -> None:
+        checks = field_checks(airdrop)
+        errors, warnings = _issues_from_checks(checks)
+        score = _score_from_checks(checks, errors, warnings)
+
+        self.total_records += 1
+        if not errors:
+            self.valid_records += 1
+        self.score_sum += score
+        self.score_histogram[score] += 1
+        if errors:
+            self.errors.update(errors)
+        if warnings:
+            self.warnings.update(warnings)
+        self.filled.update(field for field in self.fill_fields if airdrop.get(field) not in _EMPTY)
+
+    def update(self, airdrops: Iterable[Dict[str, Any]]) -> 'QualityReport':
+        for airdrop in airdrops:
+            self.add(airdrop)
+        return self
+
+    def merge(self, other: 'QualityReport') -> 'QualityReport':
+        """Fold another shard's report into this one (fill fields are unioned)."""
+        self.total_records += other.total_records
+        self.valid_records += other.valid_records
+        self.score_sum += other.score_sum
+        self.score_histogram = [a + b for a, b in zip(self.score_histogram, other.score_histogram)]
+        self.errors.update(other.errors)
+        self.warnings.update(other.warnings)
+        self.fill_fields += tuple(field for field in other.fill_fields if field not in self.fill_fields)
+        self.filled.update(other.filled)
+        return self
+
+    # ---------- Derived statistics ----------
+
+    @property
+    def mean_score(self) -> float:
+        return self.score_sum / self.total_records if self.total_records else 0
+
+    def quantile(self, q: float) -> Optional[int]:
+        """Nearest-rank q-quantile of the scores (None for an empty report)."""
+        if not self.total_records:
+            return None
+        rank = max(1, math.ceil(round(q * self.total_records, 6)))  # round: 0.07 * 100 is 7.000000000000001
+        seen = 0
+        for score, count in enumerate(self.score_histogram):
+            seen += count
+            if seen >= rank:
+                return score
+        return _SCORE_BINS - 1
+
+    def fill_rates(self) -> Dict[str, float]:
+        total = self.total_records or 1
+        return {field: self.filled[field] / total for field in self.fill_fields}
+
+    # ---------- Output ----------
+
+    def summary(self) -> Dict[str, Any]:
+        """The counters of validate_batch, so format_validation_summary can render them."""
+        return {
+            'total_records': self.total_records,
+            'valid_records': self.valid_records,
+            'invalid_records': self.total_records - self.valid_records,
+            'total_errors': sum(self.errors.values()),
+            'total_warnings': sum(self.warnings.values()),
+            'overall_quality_score': self.mean_score,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.summary(),
+            'score_quantiles': {f"p{round(q * 100)}": self.quantile(q) for q in REPORT_QUANTILES},
+            'score_histogram': self.score_histogram,
+            'errors': dict(self.errors),
+            'warnings': dict(self.warnings),
+            'filled': {field: self.filled[field] for field in self.fill_fields},
+            'fill_rates': self.fill_rates(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QualityReport':
+        """Rebuild a report from to_dict() output, e.g. one saved by another shard."""
+        report = cls(fill_fields=data['filled'])
+        report.total_records = data['total_records']
+        report.valid_records = data['valid_records']
+        report.score_sum = data['overall_quality_score'] * data['total_records']
+        report.score_histogram = list(data['score_histogram'])
+        report.errors = Counter(data['errors'])
+        report.warnings = Counter(data['warnings'])
+        report.filled = Counter(data['filled'])
+        return report
+
+    def format(self) -> str:
+        quantiles = ", ".join(f"p{round(q * 100)}={self.quantile(q)}" for q in (0.05, 0.5, 0.95))
+        lines = [format_validation_summary(self.summary()), f"- Score quantiles: {quantiles}"]
+        for title, counts in (('Errors', self.errors), ('Warnings', self.warnings)):
+            if counts:
+                lines.append(f"{title}:")
+                lines += [f"- {message}: {count}" for message, count in counts.most_common()]
+        lines.append("Fill rates:")
+        lines += [f"- {field}: {rate:.1%}" for field, rate in self.fill_rates().items()]
+        return "\n".join(lines)
+
+
+def _report_chunk(airdrop_list: List[Dict[str, Any]]) -> QualityReport:
+    return QualityReport().update(airdrop_list)
+
+
+@METRICS.timed('stage_seconds', stage='quality_report')
+def quality_report(airdrops: Iterable[Dict[str, Any]], processes: Optional[int] = None,
+                   chunksize: int = 10000) -> QualityReport:
+    """
+    QualityReport over an iterable of records, in bounded memory either way.
+
+    processes > 1 hands chunks of `chunksize` records to a process pool and
+    merges the shard reports; at most two chunks per worker are in flight,
+    so the input is never materialized.
+    """
+    if not processes or processes <= 1:
+        return QualityReport().update(airdrops)
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import islice
+
+    report = QualityReport()
+    iterator = iter(airdrops)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = deque()
+        while True:
+            chunk = list(islice(iterator, chunksize))
+            if chunk:
+                pending.append(pool.submit(_report_chunk, chunk))
+            if pending and (not chunk or len(pending) >= processes * 2):
+                report.merge(pending.popleft().result())
+            if not chunk and not pending:
+                return report